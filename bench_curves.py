@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+"""
+Benchmark the live curve-update path: the original getData/concatenate/trim
+per tick against appending into preallocated CurveBuffers, with the new points
+smoothed into a temporary array or straight into the buffer tail.
+
+Reports time per tick and the bytes allocated per tick (tracemalloc peak,
+which numpy array data is reported to).
+
+Run: python bench_curves.py
+"""
+
+import time
+import tracemalloc
+
+import numpy as np
+
+from wifi_monitor.buffers import CurveBuffer
+from wifi_monitor.data import EmaSmoother
+
+
+def legacy_tick(curves, new_time, new_ys, cutoff):
+    """Original draw_charts update: rebuild every curve from getData() + new points."""
+    out = []
+    for (old_t, old_y), new_y in zip(curves, new_ys):
+        all_t = np.concatenate([old_t, new_time])
+        all_y = np.concatenate([old_y, new_y])
+        trim_idx = np.searchsorted(all_t, cutoff, side="left")
+        out.append((all_t[trim_idx:], all_y[trim_idx:]))
+    return out
+
+
+def buffer_tick(link_buffer, ping_buffers, smoothers, new_time, new_ys, cutoff):
+    """Smooth into temporaries, then copy them into the buffers."""
+    smoothed = [smoother.update(y) for smoother, y in zip(smoothers, new_ys)]
+    link_buffer.append(new_time, smoothed[:4])
+    link_buffer.trim_before(cutoff)
+    for buf, y in zip(ping_buffers, smoothed[4:]):
+        buf.append(new_time, [y])
+        buf.trim_before(cutoff)
+    return link_buffer.time(), ping_buffers[-1].series(0)
+
+
+def in_place_tick(link_buffer, ping_buffers, smoothers, new_time, new_ys, cutoff):
+    """Current draw_charts update: smooth straight into the buffer tails."""
+    n = len(new_time)
+    block = link_buffer.append_slots(n)
+    block[0] = new_time
+    for k in range(4):
+        smoothers[k].update(new_ys[k], out=block[k + 1])
+    link_buffer.trim_before(cutoff)
+    for buf, smoother, y in zip(ping_buffers, smoothers[4:], new_ys[4:]):
+        block = buf.append_slots(n)
+        block[0] = new_time
+        smoother.update(y, out=block[1])
+        buf.trim_before(cutoff)
+    return link_buffer.time(), ping_buffers[-1].series(0)
+
+
+def _measure(tick, ticks):
+    """(seconds per tick, max bytes allocated in one tick, mean bytes per tick)."""
+    tracemalloc.start()
+    peaks = []
+    for i in range(ticks):
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        tick(i)
+        peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for i in range(ticks):
+        tick(i)
+    return (time.perf_counter() - start) / ticks, max(peaks), sum(peaks) / ticks
+
+
+def run(window=600, ticks=20_000, n_hosts=2):
+    n_series = 4 + n_hosts
+    t0 = 1_700_000_000.0
+    rng = np.random.default_rng(0)
+    # Single-sample ticks, pre-made so the loop measures only the curve update.
+    samples = rng.normal(-55, 5, (2 * ticks, n_series, 1))
+    sample_t = t0 + window + np.arange(2 * ticks, dtype=float)
+
+    history_t = t0 + np.arange(window, dtype=float)
+    curves = [(history_t, rng.normal(-55, 5, window)) for _ in range(n_series)]
+    state = {"curves": curves}
+
+    def legacy(i):
+        cutoff = sample_t[i] - window
+        state["curves"] = legacy_tick(state["curves"], sample_t[i : i + 1], samples[i], cutoff)
+
+    def buffers():
+        link_buffer = CurveBuffer(4)
+        link_buffer.load(history_t, [y for _, y in curves[:4]])
+        ping_buffers = [CurveBuffer(1) for _ in range(n_hosts)]
+        for buf, (_, y) in zip(ping_buffers, curves[4:]):
+            buf.load(history_t, [y])
+        return link_buffer, ping_buffers, [EmaSmoother() for _ in range(n_series)]
+
+    def bind(update):
+        state = buffers()
+        return lambda i: update(*state, sample_t[i : i + 1], samples[i], sample_t[i] - window)
+
+    print(f"{window}-sample window, {n_series} curves, {ticks:,} single-sample ticks\n")
+    print(f"{'path':<22} {'per tick':>10} {'max bytes/tick':>15} {'mean bytes/tick':>16}")
+    paths = [
+        ("getData+concatenate", legacy),
+        ("CurveBuffer", bind(buffer_tick)),
+        ("CurveBuffer in place", bind(in_place_tick)),
+    ]
+    for name, tick in paths:
+        per_tick, max_bytes, mean_bytes = _measure(tick, ticks)
+        print(f"{name:<22} {per_tick * 1e6:>8.1f}us {max_bytes:>15,} {mean_bytes:>16,.0f}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,43 @@
+"""Scan records and a throwaway storage directory for the storage tests."""
+
+import tempfile
+from pathlib import Path
+
+from wifi_monitor import storage
+
+
+def make_scan(timestamp, band="2.4", counts=None, bss=True):
+    """A scan as `scanner.scan_channels` returns it, `counts` being {channel: networks}.
+
+    `bss=False` leaves out the per-AP list, as in scans saved before it was kept.
+    """
+    counts = counts or {1: 2}
+    scan = {
+        "timestamp": timestamp,
+        "band": band,
+        "channels": {str(ch): {"count": n, "networks": [f"net{ch}-{i}" for i in range(n)]} for ch, n in counts.items()},
+    }
+    if bss:
+        scan["bss"] = [
+            {"bssid": f"02:00:00:00:{ch:02x}:{i:02x}", "ssid": f"net{ch}-{i}", "channel": ch, "signal": -50.0 - i}
+            for ch, n in counts.items()
+            for i in range(n)
+        ]
+    return scan
+
+
+class TempStorage:
+    """Point the storage module at a fresh directory for one test."""
+
+    def __enter__(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self._old = storage.STORAGE_DIR
+        storage.STORAGE_DIR = Path(self._tmp.name)
+        storage._cache.clear()
+        return storage.STORAGE_DIR
+
+    def __exit__(self, *exc):
+        storage.close_archive()
+        storage.STORAGE_DIR = self._old
+        storage._cache.clear()
+        self._tmp.cleanup()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+"""Vectorized downsampling kernels against the original loop versions."""
+
+import numpy as np
+
+from bench_downsample import (
+    legacy_downsample_minmax,
+    legacy_downsample_minmax_timebucket,
+)
+from wifi_monitor import downsample
+from wifi_monitor.downsample import (
+    bucket_means,
+    bucket_percentiles,
+    downsample_minmax,
+    downsample_minmax_timebucket,
+    downsample_multi_timebucket,
+)
+
+
+def _same(a, b):
+    return len(a) == len(b) and np.array_equal(np.asarray(a), np.asarray(b), equal_nan=True)
+
+
+def _inputs(n, seed):
+    rng = np.random.default_rng(seed)
+    t = np.cumsum(rng.uniform(0.2, 2.0, n))
+    # Integer-valued data produces plenty of min/max ties.
+    y = rng.integers(-60, -40, n).astype(float)
+    y[rng.random(n) < 0.2] = np.nan
+    y[rng.random(n) < 0.01] = np.inf
+    y[rng.random(n) < 0.01] = -np.inf
+    y[n // 3 : n // 3 + 40] = np.nan
+    return t, y
+
+
+def test_minmax_matches_loop():
+    for seed, n, step in [(0, 1000, 7), (1, 997, 16), (2, 50, 64), (3, 3, 2)]:
+        t, y = _inputs(n, seed)
+        lt, ly = legacy_downsample_minmax(t, y, step)
+        ft, fy = downsample_minmax(t, y, step)
+        assert _same(lt, ft) and _same(ly, fy), (seed, n, step)
+
+
+def test_timebucket_matches_loop():
+    for seed, n, step in [(0, 1000, 7), (4, 2000, 3), (5, 10, 100)]:
+        t, y = _inputs(n, seed)
+        lt, ly = legacy_downsample_minmax_timebucket(t, y, step, t0=t[0], dt=1.0)
+        ft, fy = downsample_minmax_timebucket(t, y, step, t0=t[0], dt=1.0)
+        assert _same(lt, ft) and _same(ly, fy), (seed, n, step)
+
+
+def test_multi_timebucket_keeps_each_series_extrema():
+    """Each series keeps its own min/max, in the order the single-series kernel emits them."""
+    t, signal = _inputs(1500, 6)
+    _, rx = _inputs(1500, 7)
+    for step in (2, 9, 40):
+        ft, fys = downsample_multi_timebucket(t, [signal, rx], step, t0=0.0, dt=1.0)
+        assert all(len(y) == len(ft) for y in fys)
+        assert np.all(np.diff(ft) >= 0)
+        for y, fy in zip([signal, rx], fys):
+            _, ly = legacy_downsample_minmax_timebucket(t, y, step, t0=0.0, dt=1.0)
+            assert _same(ly[~np.isnan(ly)], fy[~np.isnan(fy)])
+
+
+def test_bucket_means_matches_nanmean_loop():
+    t, a = _inputs(800, 8)
+    _, b = _inputs(800, 9)
+    a[np.isinf(a)] = 5.0
+    b[np.isinf(b)] = 5.0
+    period = 6.0
+    out_t, means, complete = bucket_means(t, np.stack([a, b]), period)
+
+    idx = np.floor(t / period).astype(np.int64)
+    starts = np.flatnonzero(np.diff(np.concatenate([[idx[0] - 1], idx])))
+    ends = np.concatenate([starts[1:], [len(t)]])
+    assert complete == len(starts) - 1
+    for k, (s, e) in enumerate(zip(starts, ends)):
+        assert out_t[k] == t[s + (e - s) // 2]
+        for row, y in zip(means, (a, b)):
+            chunk = y[s:e][np.isfinite(y[s:e])]
+            expected = chunk.mean() if len(chunk) else np.nan
+            assert np.isclose(row[k], expected, equal_nan=True)
+
+
+def test_bucket_percentiles_match_nanpercentile_loop():
+    t, a = _inputs(900, 10)
+    _, b = _inputs(900, 11)
+    a[np.isinf(a)] = np.nan
+    b[np.isinf(b)] = np.nan
+    a += np.random.default_rng(0).random(len(a))  # break integer ties
+    qs = (0.0, 0.25, 0.5, 0.75, 1.0)
+    period = 7.0
+    idx = np.floor(t / period).astype(np.int64)
+    starts = np.flatnonzero(np.diff(np.concatenate([[idx[0] - 1], idx])))
+    ends = np.concatenate([starts[1:], [len(t)]])
+
+    # Padded row-wise sort, and the lexsort it falls back to.
+    default_limit = downsample.PERCENTILE_PAD_LIMIT
+    for pad_limit in (default_limit, 0):
+        downsample.PERCENTILE_PAD_LIMIT = pad_limit
+        try:
+            out_t, pct, loss, complete = bucket_percentiles(t, np.stack([a, b]), period, qs)
+        finally:
+            downsample.PERCENTILE_PAD_LIMIT = default_limit
+
+        assert complete == len(starts) - 1 and pct.shape == (2, len(qs), len(starts))
+        for k, (s, e) in enumerate(zip(starts, ends)):
+            assert out_t[k] == t[s + (e - s) // 2]
+            for row, y in enumerate((a, b)):
+                chunk = y[s:e]
+                assert np.isclose(loss[row, k], np.isnan(chunk).mean())
+                if np.all(np.isnan(chunk)):
+                    assert np.all(np.isnan(pct[row, :, k]))
+                else:
+                    expected = np.nanpercentile(chunk, [100 * q for q in qs])
+                    assert np.allclose(pct[row, :, k], expected)
+
+
+if __name__ == "__main__":
+    test_minmax_matches_loop()
+    test_timebucket_matches_loop()
+    test_multi_timebucket_keeps_each_series_extrema()
+    test_bucket_means_matches_nanmean_loop()
+    test_bucket_percentiles_match_nanpercentile_loop()
+    print("All tests passed!")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+"""Tests for the incremental failure-run index."""
+
+import numpy as np
+
+from wifi_monitor.failures import FailureRuns
+
+
+def _mask(n, seed):
+    rng = np.random.default_rng(seed)
+    t = 1_700_000_000.0 + np.cumsum(rng.uniform(0.5, 1.5, n))
+    failed = np.zeros(n, dtype=bool)
+    for start in rng.integers(0, n, 40):
+        failed[start : start + rng.integers(1, 30)] = True
+    failed[:3] = True
+    return t, failed
+
+
+def _scan(t, failed, x_min, x_max, min_length):
+    """The per-draw mask scan the index replaces (over the whole mask)."""
+    padded = np.concatenate([[False], failed, [False]])
+    diff = np.diff(padded.astype(np.int8))
+    regions = []
+    for s, e in zip(np.where(diff == 1)[0], np.where(diff == -1)[0]):
+        if e - s < min_length:
+            continue
+        t_start = t[s - 1] if s > 0 else t[s]
+        t_end = t[e] if e < len(t) else t[e - 1]
+        if t_end > x_min and t_start < x_max:
+            regions.append((max(t_start, x_min), min(t_end, x_max)))
+    return regions
+
+
+def test_incremental_and_bulk_match_mask_scan():
+    for seed, n in [(0, 2000), (1, 5)]:
+        t, failed = _mask(n, seed)
+        incremental = FailureRuns()
+        for ts, f in zip(t, failed):
+            incremental.append(ts, f)
+        bulk = FailureRuns()
+        bulk.load(t, failed)
+
+        for x_min, x_max, min_length in [(t[0], t[-1], 1), (t[n // 3], t[n // 2], 5), (t[-1] - 50, t[-1], 1)]:
+            expected = _scan(t, failed, x_min, x_max, min_length)
+            for runs in (incremental, bulk):
+                starts, ends = runs.visible(x_min, x_max, min_length)
+                assert list(zip(starts, ends)) == expected, (seed, x_min, x_max)
+
+
+def test_open_run_extends_until_recovery():
+    runs = FailureRuns()
+    runs.append(1.0, False)
+    runs.append(2.0, True)
+    runs.append(3.0, True)
+    assert list(zip(*runs.visible(0, 10))) == [(1.0, 3.0)]
+    runs.append(4.0, False)
+    runs.append(5.0, True)
+    assert list(zip(*runs.visible(0, 10))) == [(1.0, 4.0), (4.0, 5.0)]
+    assert list(runs.length.view()) == [2, 1]
+
+
+if __name__ == "__main__":
+    test_incremental_and_bulk_match_mask_scan()
+    test_open_run_extends_until_recovery()
+    print("All tests passed!")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+"""Tests for the adaptive frame scheduler."""
+
+from wifi_monitor.frames import MAX_SKIP, QUALITY_LEVELS, RECOVER_FRAMES, FrameScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _frame(frames, clock, **phases):
+    """Run one frame whose phases take the given seconds; returns end_frame()."""
+    frames.begin_frame()
+    for name, seconds in phases.items():
+        with frames.phase(name):
+            clock.now += seconds
+    return frames.end_frame()
+
+
+def test_nested_phases_are_charged_exclusively():
+    clock = FakeClock()
+    frames = FrameScheduler(budget=lambda: 1.0, clock=clock)
+    frames.begin_frame()
+    with frames.phase("render"):
+        clock.now += 0.010
+        with frames.phase("downsample"):
+            clock.now += 0.005
+        with frames.phase("overlays"):
+            clock.now += 0.002
+    frames.end_frame()
+    assert {k: round(v, 6) for k, v in frames.last_phases.items()} == {
+        "render": 0.010,
+        "downsample": 0.005,
+        "overlays": 0.002,
+    }
+    assert abs(frames.cost - 0.017) < 1e-9
+
+
+def test_slow_frames_skip_ticks_and_degrade_quality():
+    clock = FakeClock()
+    frames = FrameScheduler(budget=lambda: 0.050, clock=clock)
+    assert frames.should_render()
+    changed = _frame(frames, clock, collect=0.001, render=0.139)
+
+    # A ~3x over-budget frame merges the next two ticks into the one after.
+    assert [frames.should_render() for _ in range(3)] == [False, False, True]
+    assert frames.dropped == 2
+    assert changed and frames.level == 1
+    assert frames.points_per_pixel < QUALITY_LEVELS[0][0]
+
+    _frame(frames, clock, render=10.0)
+    assert frames.level == len(QUALITY_LEVELS) - 1
+    assert not frames.antialias(True)
+    skipped = 0
+    while not frames.should_render():
+        skipped += 1
+    assert skipped == MAX_SKIP
+    assert "dropped" in frames.report() and "reduced quality" in frames.report()
+
+
+def test_quality_recovers_after_cheap_frames():
+    clock = FakeClock()
+    frames = FrameScheduler(budget=lambda: 0.050, clock=clock)
+    _frame(frames, clock, render=0.2)
+    assert frames.level == 1
+    changes = [_frame(frames, clock, render=0.001) for _ in range(60)]
+    assert frames.level == 0 and frames.antialias(True)
+    # One step per RECOVER_FRAMES calm frames, not all at once.
+    assert changes.count(True) == 1 and changes.index(True) >= RECOVER_FRAMES - 1
+
+
+if __name__ == "__main__":
+    test_nested_phases_are_charged_exclusively()
+    test_slow_frames_skip_ticks_and_degrade_quality()
+    test_quality_recovers_after_cheap_frames()
+    print("All tests passed!")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""Tests for the rolling per-host latency statistics."""
+
+import numpy as np
+
+from wifi_monitor.latency import LatencyStats, window_label
+
+
+def _probes(n, seed, loss=0.05, interval=0.3):
+    rng = np.random.default_rng(seed)
+    t = 1_700_000_000.0 + np.arange(n) * interval
+    rtt = rng.lognormal(np.log(20), 0.5, n)
+    lost = rng.random(n) < loss
+    return t, rtt, lost
+
+
+def _rfc3550(t, rtt, lost):
+    """(time, J) after every reply that has a previous one: J += (|D| - J) / 16."""
+    replies = ~lost
+    times, values, jitter = [], [], 0.0
+    for ts, d in zip(t[replies][1:], np.abs(np.diff(rtt[replies]))):
+        jitter += (d - jitter) / 16
+        times.append(ts)
+        values.append(jitter)
+    return np.array(times), np.array(values)
+
+
+def _feed(stats, t, rtt, lost):
+    for ts, r, l in zip(t, rtt, lost):
+        stats.add(ts, None if l else float(r))
+
+
+def test_percentiles_loss_and_jitter_match_exact_values():
+    t, rtt, lost = _probes(1500, 0)  # 450 s, inside the 10m window
+    lost[100:107] = True
+    stats = LatencyStats()
+    _feed(stats, t, rtt, lost)
+    s = stats.summary("10m", t[-1])
+
+    replies = rtt[~lost]
+    for q, value in [(50, s.p50), (95, s.p95), (99, s.p99)]:
+        assert abs(value / np.percentile(replies, q) - 1) < 0.05, (q, value)
+    assert s.sent == len(t) and s.lost == lost.sum()
+    assert s.max_burst >= 7
+
+    _, jitter = _rfc3550(t, rtt, lost)
+    assert np.isclose(s.jitter, jitter.mean())
+
+
+def test_windows_roll_old_probes_out():
+    t, rtt, lost = _probes(3000, 1, loss=0.0)  # 900 s
+    lost[:200] = True  # a loss burst in the first minute only
+    stats = LatencyStats()
+    _feed(stats, t, rtt, lost)
+
+    ten = stats.summary("10m", t[-1])
+    hour = stats.summary("60m", t[-1])
+    assert ten.lost == 0 and ten.max_burst == 0
+    assert 1900 <= ten.sent <= 2000
+    assert hour.sent == 3000 and hour.lost == 200 and hour.max_burst == 200
+
+    # Jitter covers the window too: a burst of jumpy RTTs only outside the 10m window.
+    stats = LatencyStats()
+    rtt[200:400] = np.where(np.arange(200) % 2, 10.0, 200.0)
+    _feed(stats, t, rtt, np.zeros_like(lost))
+    ten = stats.summary("10m", t[-1])
+    hour = stats.summary("60m", t[-1])
+    assert hour.jitter > 1.5 * ten.jitter
+    times, jitter = _rfc3550(t, rtt, np.zeros_like(lost))
+    assert np.isclose(hour.jitter, jitter.mean())
+    in_ten = times >= (t[-1] // 10 - 59) * 10  # the 60 slots of 10 s ending with t[-1]
+    assert np.isclose(ten.jitter, jitter[in_ten].mean())
+
+    # Nothing left after a long idle gap.
+    later = stats.summary("1D", t[-1] + 2 * 86400)
+    assert later.sent == 0 and later.p50 is None and later.loss is None and later.jitter is None
+
+
+def test_window_label():
+    assert window_label(600) == "10m"
+    assert window_label(1800) == "60m"
+    assert window_label(14400) == "1D"
+    assert window_label(None) == "1D"
+
+
+if __name__ == "__main__":
+    test_percentiles_loss_and_jitter_match_exact_values()
+    test_windows_roll_old_probes_out()
+    test_window_label()
+    print("All tests passed!")
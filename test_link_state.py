@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+"""Tests for the shared `iw link` snapshot."""
+
+import time
+
+from wifi_monitor import constants, net
+
+CONNECTED = """Connected to AA:BB:CC:DD:EE:FF (on wlan0)
+	SSID: Home Net
+	freq: 5180.0
+	RX: 123456 bytes (789 packets)
+	TX: 65432 bytes (321 packets)
+	signal: -52 dBm
+	rx bitrate: 866.7 MBit/s VHT-MCS 9 80MHz short GI VHT-NSS 2
+	tx bitrate: 650.0 MBit/s VHT-MCS 7 80MHz short GI VHT-NSS 2
+"""
+
+
+def test_parse_connected():
+    state = net.parse_link(CONNECTED, timestamp=1.0)
+    assert state.signal == -52
+    assert state.rx_rate == 866.7 and state.tx_rate == 650.0
+    assert state.width == 80
+    assert state.frequency == 5180.0 and state.band == "5"
+    assert state.bssid == "aa:bb:cc:dd:ee:ff"
+    assert state.ssid == "Home Net"
+
+
+def test_parse_not_connected():
+    state = net.parse_link("Not connected.\n", timestamp=1.0)
+    assert set(state[1:]) == {None}
+
+
+STATION_DUMP = """Station AA:BB:CC:DD:EE:FF (on wlan0)
+	inactive time:	12 ms
+	rx bytes:	123456
+	rx packets:	789
+	tx bytes:	65432
+	tx packets:	321
+	tx retries:	10
+	tx failed:	2
+	beacon loss:	1
+	beacon rx:	1234
+	rx drop misc:	5
+	signal:  	-52 [-54, -55] dBm
+	signal avg:	-53 [-55, -56] dBm
+	beacon signal avg:	-51 dBm
+	tx bitrate:	650.0 MBit/s VHT-MCS 7 80MHz short GI VHT-NSS 2
+	rx bitrate:	866.7 MBit/s VHT-MCS 9 40MHz short GI VHT-NSS 2
+	expected throughput:	300.5Mbps
+	authorized:	yes
+	connected time:	3600 seconds
+	associated at [boottime]:	1234.567s
+"""
+
+
+def test_parse_station_dump():
+    state = net.parse_station_dump(STATION_DUMP + STATION_DUMP.replace("-52 [", "-70 ["), timestamp=1.0)
+    assert state.bssid == "aa:bb:cc:dd:ee:ff"
+    # Only the first station; "signal avg" / "beacon signal avg" do not override "signal".
+    assert state.signal == -52 and state.beacon_signal == -51
+    assert state.rx_rate == 866.7 and state.tx_rate == 650.0 and state.width == 40
+    assert (state.tx_retries, state.tx_failed, state.beacon_loss) == (10, 2, 1)
+    assert state.expected_throughput == 300.5
+    assert state.inactive_time == 12 and state.connected_time == 3600
+    assert state.frequency is None and state.ssid is None
+
+
+def test_iw_backend_runs_link_only_on_association_change():
+    calls = []
+
+    def fake_iw(*args):
+        calls.append(args)
+        return STATION_DUMP if args == ("station", "dump") else CONNECTED
+
+    original = net._run_iw
+    net._run_iw = fake_iw
+    net._iw_association = (None, None, None, None)
+    try:
+        for _ in range(3):
+            state = net._read_iw_link()
+        assert calls.count(("station", "dump")) == 3 and calls.count(("link",)) == 1
+        assert state.frequency == 5180.0 and state.band == "5" and state.ssid == "Home Net"
+        assert state.tx_retries == 10
+    finally:
+        net._run_iw = original
+        net._iw_association = (None, None, None, None)
+
+
+PEER = "00:11:22:33:44:55"
+
+
+def test_station_dump_picks_the_associated_station():
+    # A TDLS peer listed before the AP.
+    dump = STATION_DUMP.replace("AA:BB:CC:DD:EE:FF", PEER).replace("-52 [", "-30 [") + STATION_DUMP
+    state = net.parse_station_dump(dump, timestamp=1.0, bssid="AA:BB:CC:DD:EE:FF")
+    assert state.bssid == "aa:bb:cc:dd:ee:ff" and state.signal == -52 and state.tx_retries == 10
+    assert net.parse_station_dump(dump, timestamp=1.0).bssid == PEER
+    assert set(net.parse_station_dump(dump, timestamp=1.0, bssid="02:00:00:00:00:01")[1:]) == {None}
+
+
+def test_iw_backend_follows_channel_switches_and_roams():
+    link = {"text": CONNECTED}
+    calls = []
+
+    def fake_iw(*args):
+        calls.append(args)
+        if args == ("station", "dump"):
+            return STATION_DUMP.replace("AA:BB:CC:DD:EE:FF", PEER).replace("-52 [", "-30 [") + STATION_DUMP
+        return link["text"]
+
+    original = net._run_iw
+    net._run_iw = fake_iw
+    net._iw_association = (None, None, None, None)
+    try:
+        state = net._read_iw_link()
+        assert state.signal == -52 and state.frequency == 5180.0
+
+        # The AP moves to another channel: picked up once the link read is due.
+        link["text"] = CONNECTED.replace("freq: 5180.0", "freq: 5500.0")
+        assert net._read_iw_link().frequency == 5180.0
+        assert calls.count(("link",)) == 1
+        bssid, frequency, ssid, checked = net._iw_association
+        net._iw_association = (bssid, frequency, ssid, checked - net.IW_LINK_MAX_AGE)
+        state = net._read_iw_link()
+        assert calls.count(("link",)) == 2
+        assert state.frequency == 5500.0 and state.band == "5" and state.signal == -52
+
+        # Roamed to an AP the dump does not list yet: `iw link` has the basics.
+        link["text"] = CONNECTED.replace("AA:BB:CC:DD:EE:FF", "02:00:00:00:00:01")
+        net._iw_association = (bssid, frequency, ssid, checked - net.IW_LINK_MAX_AGE)
+        state = net._read_iw_link()
+        assert state.bssid == "02:00:00:00:00:01" and state.signal == -52 and state.tx_retries is None
+    finally:
+        net._run_iw = original
+        net._iw_association = (None, None, None, None)
+
+
+def test_snapshot_shared_within_max_age():
+    reads = []
+
+    def fake_read():
+        reads.append(1)
+        return net.parse_link(CONNECTED)
+
+    original = net.read_link_state
+    net.read_link_state = fake_read
+    constants.INTERFACE = "wlan0"
+    try:
+        assert net.get_link_info() == (-52, 866.7, 650.0, 80)
+        assert len(reads) == 1
+        # Every other consumer reads the sampler's snapshot.
+        assert net.get_current_band() == "5"
+        assert net.get_current_frequency() == 5180.0
+        assert len(reads) == 1
+
+        time.sleep(0.02)
+        net.get_link_state(max_age=0.01)
+        assert len(reads) == 2
+
+        constants.INTERFACE = "wlan1"
+        net.get_current_band()
+        assert len(reads) == 3
+    finally:
+        net.read_link_state = original
+        constants.INTERFACE = None
+
+
+if __name__ == "__main__":
+    test_parse_connected()
+    test_parse_not_connected()
+    test_parse_station_dump()
+    test_iw_backend_runs_link_only_on_association_change()
+    test_station_dump_picks_the_associated_station()
+    test_iw_backend_follows_channel_switches_and_roams()
+    test_snapshot_shared_within_max_age()
+    print("All tests passed!")
@@ -0,0 +1,267 @@
+#!/usr/bin/env python
+"""Tests for the nl80211 netlink backend, replaying kernel reply datagrams."""
+
+import io
+import struct
+from contextlib import redirect_stdout
+
+from wifi_monitor import constants, net
+from wifi_monitor.nl80211 import (
+    CTRL_CMD_GETFAMILY,
+    GENL_ID_CTRL,
+    LINK_FIELDS,
+    NL80211_ATTR_BSS,
+    NL80211_ATTR_IFINDEX,
+    NL80211_BSS_BSSID,
+    NL80211_BSS_STATUS,
+    NL80211_BSS_STATUS_ASSOCIATED,
+    NL80211_CMD_GET_SCAN,
+    NL80211_CMD_GET_INTERFACE,
+    NL80211_CMD_GET_STATION,
+    NLM_F_DUMP,
+    NLM_F_MULTI,
+    NLMSG_DONE,
+    Nl80211,
+    pack_attr,
+    parse_messages,
+)
+
+# Replies to: GETFAMILY "nl80211" (seq 1), GET_INTERFACE wlan0 (seq 2) and a
+# GET_STATION dump (seq 3) while associated; then GET_INTERFACE (seq 4) and an
+# empty GET_STATION dump (seq 5) while not associated; then ENODEV (seq 6).
+FAMILY = bytes.fromhex(
+    "40000000100000000100000092100000010200000c0002006e6c383032313100"
+    "060001001c0000000800030001000000080004000000000008000500dc000000"
+)
+INTERFACE = bytes.fromhex(
+    "680000001c00000002000000921000000701000008000300030000000a000400"
+    "776c616e30000000080001000000000008000500020000000a0006000242ac11"
+    "00020000080026003c14000008009f00030000000800a0005a1400000c003400"
+    "486f6d65204e6574"
+)
+STATION_DUMP = bytes.fromhex(
+    "dc0000001c00020003000000921000001301000008000300030000000a000600"
+    "aabbccddeeff000008002e0001000000ac001580080001000c0000000c001700"
+    "40e201000000000005000700cc00000005000d00cb0000002c000e8008000500"
+    "db21000006000100db2100000500060009000000050007000200000004000800"
+    "0400040028000880080005006419000006000100641900000500060007000000"
+    "05000700020000000400080008000b000a00000008000c000200000008001000"
+    "100e0000080012000100000008001b00d495040005001e00cd00000014000000"
+    "03000200030000009210000000000000"
+)
+INTERFACE_IDLE = bytes.fromhex(
+    "300000001c00000004000000921000000701000008000300030000000a000400"
+    "776c616e300000000800050002000000"
+)
+STATION_DUMP_EMPTY = bytes.fromhex(
+    "1400000003000200050000009210000000000000"
+)
+NO_DEVICE = bytes.fromhex(
+    "24000000020000000600000092100000edffffff180000001c00010006000000"
+    "00000000"
+)
+
+
+class ReplaySocket:
+    """Stands in for the netlink socket: records requests, returns replies in order."""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.sent = []
+
+    def settimeout(self, timeout):
+        pass
+
+    def send(self, data):
+        self.sent.append(data)
+
+    def recv(self, size):
+        return self.replies.pop(0)
+
+
+def _request_header(data):
+    msg_type, flags, seq, payload = parse_messages(data)[0]
+    return msg_type, flags, seq, payload[0]
+
+
+def test_link_from_recorded_replies():
+    sock = ReplaySocket([FAMILY, INTERFACE, STATION_DUMP])
+    client = Nl80211(sock=sock)
+    assert client.family == 0x1C
+
+    fields = client.link(3)
+    assert fields == {
+        "signal": -52,
+        "rx_rate": 866.7,
+        "tx_rate": 650.0,
+        "width": 80,
+        "frequency": 5180.0,
+        "bssid": "aa:bb:cc:dd:ee:ff",
+        "ssid": "Home Net",
+        "tx_retries": 10,
+        "tx_failed": 2,
+        "beacon_loss": 1,
+        "beacon_signal": -51,
+        "expected_throughput": 300.5,
+        "inactive_time": 12,
+        "connected_time": 3600,
+    }
+
+    requests = [_request_header(data) for data in sock.sent]
+    assert requests[0][0] == GENL_ID_CTRL and requests[0][3] == CTRL_CMD_GETFAMILY
+    assert requests[1][0] == 0x1C and requests[1][3] == NL80211_CMD_GET_INTERFACE
+    assert requests[2][3] == NL80211_CMD_GET_STATION and requests[2][1] & NLM_F_DUMP == NLM_F_DUMP
+    assert [r[2] for r in requests] == [1, 2, 3]
+    # The interface index goes out as NL80211_ATTR_IFINDEX.
+    assert sock.sent[1][20:28] == struct.pack("=HHI", 8, 3, 3)
+
+
+def test_not_associated_and_errors():
+    sock = ReplaySocket([FAMILY, INTERFACE, STATION_DUMP, INTERFACE_IDLE, STATION_DUMP_EMPTY, NO_DEVICE])
+    client = Nl80211(sock=sock)
+    client.link(3)
+    assert set(client.link(3).values()) == {None}
+    try:
+        client.link(3)
+    except OSError as e:
+        assert e.errno == 19
+    else:
+        raise AssertionError("ENODEV not raised")
+
+
+def test_backend_fallback_to_iw():
+    original = (net.link_backend, net._nl80211, net.Nl80211, net.subprocess.check_output)
+
+    def no_netlink():
+        raise OSError(2, "nl80211 family not found")
+
+    net.link_backend = "auto"
+    net._nl80211 = None
+    net.Nl80211 = no_netlink
+    net.subprocess.check_output = lambda args, **k: (
+        "Station 00:11:22:33:44:55 (on wlan0)\n\tsignal:  \t-60 dBm\n"
+        if args[-2:] == ["station", "dump"]
+        else "Connected to 00:11:22:33:44:55 (on wlan0)\n\tfreq: 2412\n"
+    )
+    constants.INTERFACE = "wlan0"
+    try:
+        state = net.read_link_state()
+        assert net.link_backend == "iw"
+        assert state.signal == -60 and state.bssid == "00:11:22:33:44:55" and state.band == "2.4"
+    finally:
+        net._iw_association = (None, None, None, None)
+        net.link_backend, net._nl80211, net.Nl80211, net.subprocess.check_output = original
+        constants.INTERFACE = None
+
+
+class FlakyNl80211:
+    def __init__(self, results):
+        self.results = list(results)
+
+    def link(self, ifindex):
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def _dump(seq, payloads):
+    """One datagram of nl80211 dump replies to request `seq`, ending with NLMSG_DONE."""
+    messages = [struct.pack("=IHHII", 16 + len(p), 0x1C, NLM_F_MULTI, seq, 0) + p for p in payloads]
+    return b"".join(messages) + struct.pack("=IHHIIi", 20, NLMSG_DONE, NLM_F_MULTI, seq, 0, 0)
+
+
+def _station_payloads():
+    """(TDLS peer, AP) station replies: the recorded AP, and a copy at another MAC and signal."""
+    ap = parse_messages(STATION_DUMP)[0][3]
+    peer = ap.replace(bytes.fromhex("aabbccddeeff"), bytes.fromhex("021122334455"))
+    peer = peer.replace(bytes.fromhex("05000700cc"), bytes.fromhex("05000700e2"))  # signal -30
+    return [peer, ap]
+
+
+def _bss(mac, status=None):
+    attrs = pack_attr(NL80211_BSS_BSSID, bytes.fromhex(mac))
+    if status is not None:
+        attrs += pack_attr(NL80211_BSS_STATUS, struct.pack("=I", status))
+    genl = bytes([34, 1, 0, 0])  # NL80211_CMD_NEW_SCAN_RESULTS
+    return genl + pack_attr(NL80211_ATTR_IFINDEX, struct.pack("=I", 3)) + pack_attr(NL80211_ATTR_BSS | 0x8000, attrs)
+
+
+def test_ap_picked_among_several_stations():
+    scan = _dump(4, [_bss("021122334455"), _bss("aabbccddeeff", NL80211_BSS_STATUS_ASSOCIATED)])
+    interface_again = INTERFACE[:8] + struct.pack("=I", 5) + INTERFACE[12:]
+    sock = ReplaySocket(
+        [FAMILY, INTERFACE, _dump(3, _station_payloads()), scan, interface_again, _dump(6, _station_payloads())]
+    )
+    client = Nl80211(sock=sock)
+    for _ in range(2):
+        fields = client.link(3)
+        assert fields["bssid"] == "aa:bb:cc:dd:ee:ff" and fields["signal"] == -52
+        assert fields["tx_retries"] == 10 and fields["frequency"] == 5180.0
+
+    requests = [_request_header(data) for data in sock.sent]
+    # The scan results are only read while the BSSID is not known yet.
+    assert [r[3] for r in requests[1:]] == [
+        NL80211_CMD_GET_INTERFACE,
+        NL80211_CMD_GET_STATION,
+        NL80211_CMD_GET_SCAN,
+        NL80211_CMD_GET_INTERFACE,
+        NL80211_CMD_GET_STATION,
+    ]
+    assert requests[3][1] & NLM_F_DUMP == NLM_F_DUMP
+
+
+def test_failed_reads_fall_back_to_iw():
+    original = (
+        net.link_backend,
+        net._nl80211,
+        net._nl80211_failures,
+        net._nl80211_warned,
+        net._run_iw,
+        net.socket.if_nametoindex,
+    )
+    busy = OSError(16, "Device or resource busy")
+    fields = dict(dict.fromkeys(LINK_FIELDS), signal=-45, bssid="00:11:22:33:44:55", frequency=5180.0)
+    # One failure, a good read (which resets the count), then failures only.
+    net._nl80211 = FlakyNl80211([busy, fields] + [busy] * net.NL80211_MAX_FAILURES)
+    net.link_backend = "nl80211"
+    net._nl80211_failures = 0
+    net._nl80211_warned = False
+    net.socket.if_nametoindex = lambda name: 3
+    net._run_iw = lambda *args: (
+        "Station 00:11:22:33:44:55 (on wlan0)\n\tsignal:  \t-60 dBm\n"
+        if args == ("station", "dump")
+        else "Connected to 00:11:22:33:44:55 (on wlan0)\n\tfreq: 2412\n"
+    )
+    constants.INTERFACE = "wlan0"
+    log = io.StringIO()
+    try:
+        with redirect_stdout(log):
+            signals = [net.read_link_state().signal for _ in range(net.NL80211_MAX_FAILURES + 2)]
+            assert net._nl80211.results == []
+            assert net.read_link_state().signal == -60
+        # Each failed read was answered by iw, not reported as disconnected.
+        assert signals == [-60, -45] + [-60] * net.NL80211_MAX_FAILURES
+        assert net.link_backend == "iw"
+        lines = log.getvalue().splitlines()
+        assert len(lines) == 2 and "Device or resource busy" in lines[0] and "switching to iw" in lines[1]
+    finally:
+        net._iw_association = (None, None, None, None)
+        (
+            net.link_backend,
+            net._nl80211,
+            net._nl80211_failures,
+            net._nl80211_warned,
+            net._run_iw,
+            net.socket.if_nametoindex,
+        ) = original
+        constants.INTERFACE = None
+
+
+if __name__ == "__main__":
+    test_link_from_recorded_replies()
+    test_not_associated_and_errors()
+    test_backend_fallback_to_iw()
+    test_ap_picked_among_several_stations()
+    test_failed_reads_fall_back_to_iw()
+    print("All tests passed!")
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+"""Tests for the cached per-bucket ping statistics of the downsampled redraw."""
+
+from types import SimpleNamespace
+
+import numpy as np
+
+from wifi_monitor import constants
+from wifi_monitor.controllers.rendering import _ping_bucket_stats
+
+
+def _setup(n, seed=0):
+    rng = np.random.default_rng(seed)
+    constants.time_data = np.arange(n, dtype=float)
+    hosts = []
+    for _ in range(2):
+        data = rng.normal(20, 5, n)
+        data[rng.random(n) < 0.1] = np.nan
+        hosts.append({"data": data})
+    return hosts
+
+
+def _fresh(hosts, lo, hi, period, kind):
+    return _ping_bucket_stats(SimpleNamespace(), hosts, lo, hi, period, kind)
+
+
+def _same(a, b):
+    return np.array_equal(a[0], b[0]) and np.allclose(a[1], b[1], equal_nan=True)
+
+
+def test_cache_matches_fresh_when_range_grows_left():
+    hosts = _setup(2000)
+    for kind in ("mean", "bands"):
+        window = SimpleNamespace()
+        _ping_bucket_stats(window, hosts, 1000, 2000, 16.0, kind)
+        out = _ping_bucket_stats(window, hosts, 0, 2000, 16.0, kind)
+        assert out[0][0] == 8.0 and len(out[0]) == 125
+        assert _same(out, _fresh(hosts, 0, 2000, 16.0, kind))
+
+
+def test_cache_matches_fresh_over_sliding_ranges():
+    hosts = _setup(3000, seed=1)
+    for kind in ("mean", "bands"):
+        window = SimpleNamespace()
+        for lo, hi in [(500, 1500), (510, 1530), (700, 1800), (300, 1800), (0, 3000), (2990, 3000)]:
+            out = _ping_bucket_stats(window, hosts, lo, hi, 16.0, kind)
+            assert _same(out, _fresh(hosts, lo, hi, 16.0, kind)), (kind, lo, hi)
+
+
+if __name__ == "__main__":
+    test_cache_matches_fresh_when_range_grows_left()
+    test_cache_matches_fresh_over_sliding_ranges()
+    print("All tests passed!")
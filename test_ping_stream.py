@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+"""Tests for the streaming `ping -O -D` parser and worker."""
+
+import os
+import stat
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from wifi_monitor import constants, ping
+from wifi_monitor.latency import LatencyStats
+from wifi_monitor.ping import PingStreamParser, parse_ping_line
+from wifi_monitor.store import create_probe_store
+
+# iputils output with -D (timestamps) and -O (report missing replies).
+LINES = [
+    "PING 1.1.1.1 (1.1.1.1) 56(84) bytes of data.\n",
+    "[1700000000.100000] 64 bytes from 1.1.1.1: icmp_seq=1 ttl=57 time=12.3 ms\n",
+    "[1700000000.400000] 64 bytes from 1.1.1.1: icmp_seq=2 ttl=57 time=11.9 ms\n",
+    "[1700000000.700000] no answer yet for icmp_seq=3\n",
+    "[1700000001.300000] 64 bytes from 1.1.1.1: icmp_seq=6 ttl=57 time=13.0 ms\n",
+    "[1700000001.350000] 64 bytes from 1.1.1.1: icmp_seq=3 ttl=57 time=650 ms\n",
+    "[1700000001.600000] From 192.168.1.1 icmp_seq=7 Destination Host Unreachable\n",
+]
+
+
+def test_parse_lines():
+    assert parse_ping_line(LINES[0]) is None
+    assert parse_ping_line(LINES[1]) == (1700000000.1, 1, 12.3)
+    assert parse_ping_line(LINES[3]) == (1700000000.7, 3, None)
+    assert parse_ping_line(LINES[6]) == (1700000001.6, 7, None)
+
+
+def test_late_replies_replace_provisional_losses():
+    parser = PingStreamParser(interval=0.3, timeout=1.0)
+    results = [[(seq, rtt) for _, seq, rtt in parser.feed(line)] for line in LINES]
+    assert results == [
+        [],
+        [(1, 12.3)],
+        [(2, 11.9)],
+        [],  # seq 3 not answered yet, but it may still be
+        [(6, 13.0)],  # 4 and 5 skipped without a line: provisional too
+        [(3, 650.0)],  # within the 1 s timeout: a reply, not a loss
+        [(7, None)],  # ICMP errors are final at once
+    ]
+    assert sorted(parser.pending) == [4, 5]
+
+    later = [
+        "[1700000002.100000] 64 bytes from 1.1.1.1: icmp_seq=8 ttl=57 time=12.0 ms\n",
+        "[1700000002.400000] no answer yet for icmp_seq=9\n",
+        "[1700000002.500000] no answer yet for icmp_seq=9\n",
+        "[1700000003.200000] 64 bytes from 1.1.1.1: icmp_seq=11 ttl=57 time=12.0 ms\n",
+        "[1700000003.300000] 64 bytes from 1.1.1.1: icmp_seq=9 ttl=57 time=1300 ms\n",
+    ]
+    results = [[(seq, rtt) for _, seq, rtt in parser.feed(line)] for line in later]
+    assert results == [
+        [(4, None), (5, None), (8, 12.0)],  # 1 s after they were due
+        [],
+        [],
+        [(9, None), (11, 12.0)],  # 10 still provisional
+        [],  # 9 already counted lost
+    ]
+    assert [(seq, rtt) for _, seq, rtt in parser.flush(1700000003.4)] == [(10, None)]
+    assert parser.pending == {}
+
+
+def test_sequence_wraps():
+    parser = PingStreamParser()
+    parser.feed("[1.0] 64 bytes from h: icmp_seq=65535 ttl=1 time=1.0 ms\n")
+    results = parser.feed("[2.0] 64 bytes from h: icmp_seq=1 ttl=1 time=1.0 ms\n")
+    assert [seq for _, seq, _ in results] == [1] and list(parser.pending) == [0]
+    results = parser.feed("[3.0] 64 bytes from h: icmp_seq=2 ttl=1 time=1.0 ms\n")
+    assert [(seq, rtt) for _, seq, rtt in results] == [(0, None), (2, 1.0)]
+
+
+FAKE_PING = """#!{python}
+import sys, time
+seq = 0
+while True:
+    seq += 1
+    if seq % 4 == 0:
+        continue
+    print("[%.6f] 64 bytes from %s: icmp_seq=%d ttl=64 time=%d.5 ms" % (time.time(), sys.argv[-1], seq, seq), flush=True)
+    time.sleep(0.02)
+"""
+
+
+def test_worker_streams_and_stops_on_removal():
+    with tempfile.TemporaryDirectory() as bin_dir:
+        fake = os.path.join(bin_dir, "ping")
+        with open(fake, "w") as f:
+            f.write(FAKE_PING.format(python=sys.executable))
+        os.chmod(fake, os.stat(fake).st_mode | stat.S_IEXEC)
+
+        old_path, old_mode = os.environ["PATH"], ping.ping_mode
+        os.environ["PATH"] = bin_dir + os.pathsep + old_path
+        ping.ping_mode = "stream"
+        try:
+            host_info = {
+                "host": "10.0.0.1",
+                "enabled": True,
+                "probes": create_probe_store(),
+                "stats": LatencyStats(),
+                "process": None,
+                "removed": False,
+            }
+            worker = threading.Thread(target=ping.ping_worker, args=(host_info,), daemon=True)
+            worker.start()
+            deadline = time.monotonic() + 5
+            while len(host_info["probes"]) < 5 and time.monotonic() < deadline:
+                time.sleep(0.005)
+            proc = host_info["process"]
+            assert proc is not None and proc.poll() is None
+
+            host_info["removed"] = True
+            ping._stop_process(proc)
+            worker.join(timeout=3)
+            assert not worker.is_alive()
+            assert proc.poll() is not None
+            assert host_info["process"] is None
+            # Every probe was kept, losses (every 4th seq) included.
+            lost = host_info["probes"].view("lost")
+            assert len(lost) >= 5 and 0 < lost.sum() < len(lost)
+            assert np.nanmax(host_info["probes"].view("rtt")) > 1
+        finally:
+            os.environ["PATH"] = old_path
+            ping.ping_mode = old_mode
+
+
+class _RefusedProber:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def start(self):
+        raise PermissionError(13, "Permission denied")
+
+
+def test_async_mode_falls_back_to_streaming():
+    with tempfile.TemporaryDirectory() as bin_dir:
+        fake = os.path.join(bin_dir, "ping")
+        with open(fake, "w") as f:
+            f.write(FAKE_PING.format(python=sys.executable))
+        os.chmod(fake, os.stat(fake).st_mode | stat.S_IEXEC)
+
+        old_path, old_mode, old_prober_cls = os.environ["PATH"], ping.ping_mode, ping.AsyncProber
+        os.environ["PATH"] = bin_dir + os.pathsep + old_path
+        ping.ping_mode = "async"
+        ping.AsyncProber = _RefusedProber
+        host_info = None
+        try:
+            host_info = ping.add_ping_host("10.0.0.1")
+            assert ping.ping_mode == "stream" and ping._prober is None
+            assert not host_info["probing"]
+            worker = host_info["thread"]
+            assert worker is not None and worker.is_alive()
+            deadline = time.monotonic() + 5
+            while len(host_info["probes"]) == 0 and time.monotonic() < deadline:
+                time.sleep(0.005)
+            assert len(host_info["probes"]) > 0
+
+            ping.remove_ping_host(constants.ping_hosts.index(host_info))
+            host_info = None
+            worker.join(timeout=3)
+            assert not worker.is_alive()
+        finally:
+            if host_info in constants.ping_hosts:
+                ping.remove_ping_host(constants.ping_hosts.index(host_info))
+            os.environ["PATH"] = old_path
+            ping.ping_mode = old_mode
+            ping.AsyncProber = old_prober_cls
+
+
+if __name__ == "__main__":
+    test_parse_lines()
+    test_late_replies_replace_provisional_losses()
+    test_sequence_wraps()
+    test_worker_streams_and_stops_on_removal()
+    test_async_mode_falls_back_to_streaming()
+    print("All tests passed!")
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+"""Tests for the asyncio ICMP prober against a loopback stand-in responder.
+
+Unprivileged ICMP sockets are often not allowed in test environments, so the
+prober talks ICMP echo over UDP to a responder thread on 127.0.0.1.
+127.0.0.2 is bound on the same port but never answers.
+"""
+
+import socket
+import threading
+import time
+
+from wifi_monitor.prober import (
+    ICMP_ECHO_REPLY,
+    ICMP_ECHO_REQUEST,
+    AsyncProber,
+    build_echo_request,
+    icmp_checksum,
+    parse_echo,
+)
+
+
+class StandInResponder:
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.port = self.sock.getsockname()[1]
+        self.silent = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.silent.bind(("127.0.0.2", self.port))
+        self.sock.settimeout(0.05)
+        self.received = 0
+        self._running = True
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _serve(self):
+        while self._running:
+            try:
+                data, addr = self.sock.recvfrom(2048)
+            except socket.timeout:
+                continue
+            parsed = parse_echo(data)
+            if parsed is None or parsed[0] != ICMP_ECHO_REQUEST:
+                continue
+            self.received += 1
+            reply = bytes([ICMP_ECHO_REPLY]) + data[1:]
+            self.sock.sendto(reply, addr)
+
+    def close(self):
+        self._running = False
+        self._thread.join()
+        self.sock.close()
+        self.silent.close()
+
+
+def _udp_socket():
+    return socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+
+def test_echo_request_encoding():
+    packet = build_echo_request(0x1234, 7, b"abc")
+    assert icmp_checksum(packet) == 0
+    assert parse_echo(packet) == (ICMP_ECHO_REQUEST, 0x1234, 7, b"abc")
+    assert parse_echo(b"\x03\x01" + packet[2:]) is None
+
+
+def test_replies_and_timeouts_per_target():
+    responder = StandInResponder()
+    prober = AsyncProber(open_socket=_udp_socket, port=responder.port, timeout=0.2)
+    results = {"up": [], "down": []}
+    prober.start()
+    try:
+        prober.add_target("up", "127.0.0.1", 0.05, lambda ts, seq, rtt: results["up"].append(rtt))
+        prober.add_target("down", "127.0.0.2", 0.05, lambda ts, seq, rtt: results["down"].append(rtt))
+        time.sleep(0.8)
+        prober.remove_target("up")
+        time.sleep(0.1)
+        count = len(results["up"])
+        time.sleep(0.2)
+    finally:
+        prober.stop(timeout=1.0)
+        responder.close()
+
+    assert len(results["up"]) >= 8
+    assert all(rtt is not None and 0 <= rtt < 200 for rtt in results["up"])
+    assert len(results["down"]) >= 5 and all(rtt is None for rtt in results["down"])
+    # No more results once a target is removed.
+    assert len(results["up"]) == count
+
+
+def test_many_targets_share_a_global_rate_cap():
+    responder = StandInResponder()
+    prober = AsyncProber(open_socket=_udp_socket, port=responder.port, max_pps=100, timeout=0.5)
+    replies = []
+    prober.start()
+    try:
+        # 100 targets at 20 probes/s each would be 2000 pps without the cap.
+        for i in range(100):
+            prober.add_target(i, "127.0.0.1", 0.05, lambda ts, seq, rtt, i=i: replies.append((i, rtt)))
+        time.sleep(1.0)
+    finally:
+        prober.stop(timeout=1.0)
+        responder.close()
+
+    assert 50 <= prober.sent <= 100 * 1.0 + prober.max_pps // 10 + 5
+    answered = [rtt for _, rtt in replies if rtt is not None]
+    assert len(answered) >= 0.9 * len(replies)
+    assert len({i for i, _ in replies}) > 20
+
+
+def test_start_raises_when_the_socket_cannot_be_opened():
+    def refused():
+        raise PermissionError(13, "Permission denied")
+
+    prober = AsyncProber(open_socket=refused)
+    errors = []
+
+    def run():
+        try:
+            prober.start()
+        except PermissionError as exc:
+            errors.append(exc)
+
+    caller = threading.Thread(target=run, daemon=True)
+    caller.start()
+    caller.join(timeout=2)
+    assert not caller.is_alive(), "start() hung on a socket error"
+    assert len(errors) == 1 and errors[0].errno == 13
+    assert prober._thread is None and prober._sock is None
+
+
+if __name__ == "__main__":
+    test_echo_request_encoding()
+    test_replies_and_timeouts_per_target()
+    test_many_targets_share_a_global_rate_cap()
+    test_start_raises_when_the_socket_cannot_be_opened()
+    print("All tests passed!")
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+"""Tests for the incrementally maintained min/max/mean pyramid."""
+
+import numpy as np
+
+from wifi_monitor.pyramid import MinMaxPyramid
+
+
+def _series(n, seed=0):
+    rng = np.random.default_rng(seed)
+    t = 1_700_000_000.0 + np.arange(n, dtype=float)
+    y = rng.normal(-55, 5, n)
+    y[rng.random(n) < 0.05] = np.nan
+    return t, y
+
+
+def test_incremental_matches_bulk():
+    t, y = _series(5000)
+
+    bulk = MinMaxPyramid(1)
+    bulk.update(t, [y])
+
+    inc = MinMaxPyramid(1)
+    for i in range(1, len(t) + 1):
+        inc.update(t[:i], [y[:i]])
+
+    for a, b in zip(bulk.levels, inc.levels):
+        assert a.end == b.end
+        assert np.array_equal(a.time.view(), b.time.view())
+        assert np.array_equal(a.ys[0].view(), b.ys[0].view(), equal_nan=True)
+        assert np.array_equal(a.bucket_time.view(), b.bucket_time.view())
+        assert np.allclose(a.means[0].view(), b.means[0].view(), equal_nan=True)
+        assert np.array_equal(a.counts[0].view(), b.counts[0].view())
+
+
+def test_render_preserves_extremes_and_order():
+    t, y = _series(20000, seed=1)
+    pyramid = MinMaxPyramid(1)
+    pyramid.update(t, [y])
+
+    out_t, (out_y,), raw_start, width = pyramid.render(t, [y], t[0], t[-1], 300)
+
+    assert len(out_t) <= 2 * 300 + 2 * 3 * len(pyramid.levels) + width
+    assert np.all(np.diff(out_t) >= 0)
+    assert np.nanmin(out_y) == np.nanmin(y)
+    assert np.nanmax(out_y) == np.nanmax(y)
+    # Everything after the finest level's end is passed through raw.
+    assert np.array_equal(out_t[-(len(t) - raw_start) :], t[raw_start:])
+
+
+def test_level_means_match_raw():
+    t, y = _series(20000, seed=2)
+    pyramid = MinMaxPyramid(1)
+    pyramid.update(t, [y])
+
+    for level in pyramid.levels:
+        starts = level.bucket_time.view()
+        if len(starts) == 0:
+            continue
+        keys = np.floor(t / level.width)
+        for start, mean, count in list(zip(starts, level.means[0].view(), level.counts[0].view()))[:50]:
+            chunk = y[keys == start / level.width]
+            finite = chunk[np.isfinite(chunk)]
+            assert count == len(finite)
+            assert np.isclose(mean, finite.mean())
+
+
+def test_render_means_covers_range_once():
+    t, y = _series(20000, seed=3)
+    pyramid = MinMaxPyramid(1)
+    pyramid.update(t, [y])
+
+    out_t, (out_y,), (out_n,), raw_start, width = pyramid.render_means(t, [y], t[100], t[-1], 300)
+
+    assert np.all(np.diff(out_t) > 0)
+    assert len(out_t) <= 300 + 2 * 3 * len(pyramid.levels) + width
+    # Every finite sample from the first whole bucket on is counted exactly once.
+    first = np.searchsorted(t, out_t[0])
+    assert out_n.sum() == np.isfinite(y[first:]).sum()
+    total = np.nansum(np.where(out_n > 0, out_y, 0.0) * out_n)
+    assert np.isclose(total, np.nansum(y[first:]))
+    assert np.array_equal(out_t[-(len(t) - raw_start) :], t[raw_start:])
+
+
+def test_single_kind_pyramids_match_full():
+    t, y = _series(20000, seed=4)
+    full = MinMaxPyramid(1)
+    minmax = MinMaxPyramid(1, means=False)
+    means = MinMaxPyramid(1, minmax=False)
+    # Fed in uneven chunks, like ticks after a bulk load.
+    for end in (5000, 5001, 5003, 12000, 20000):
+        for pyramid in (full, minmax, means):
+            pyramid.update(t[:end], [y[:end]])
+
+    for args in [(t[0], t[-1], 300), (t[5000], t[9000], 200)]:
+        expected, actual = full.render(t, [y], *args), minmax.render(t, [y], *args)
+        assert np.array_equal(expected[0], actual[0]) and np.array_equal(expected[1][0], actual[1][0], equal_nan=True)
+        expected, actual = full.render_means(t, [y], *args), means.render_means(t, [y], *args)
+        assert np.array_equal(expected[0], actual[0])
+        assert np.array_equal(expected[1][0], actual[1][0], equal_nan=True)
+        assert np.array_equal(expected[2][0], actual[2][0])
+    # Neither builds the other kind of bucket.
+    assert all(len(level.bucket_time) == 0 for level in minmax.levels)
+    assert all(len(level.time) == 0 for level in means.levels)
+
+
+if __name__ == "__main__":
+    test_incremental_matches_bulk()
+    test_render_preserves_extremes_and_order()
+    test_level_means_match_raw()
+    test_render_means_covers_range_once()
+    test_single_kind_pyramids_match_full()
+    print("All tests passed!")
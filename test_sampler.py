@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+"""Tests for the background link sampler."""
+
+import subprocess
+import time
+
+import numpy as np
+
+from wifi_monitor import constants
+from wifi_monitor.net import LinkState, parse_route_table
+from wifi_monitor.ping import ping_lock
+from wifi_monitor.sampler import Sampler
+from wifi_monitor.store import append_probe, create_probe_store
+
+INTERVAL = 0.02
+
+LINK = LinkState(0.0, -50, 100.0, 90.0, 80, 5180.0, "5", None, None, tx_retries=7)
+
+
+def _collect_running(sampler, count, timeout=5.0):
+    samples = []
+    deadline = time.monotonic() + timeout
+    while len(samples) < count and time.monotonic() < deadline:
+        samples.extend(sampler.drain())
+        time.sleep(INTERVAL / 4)
+    return samples
+
+
+def _collect(sampler, count, timeout=5.0):
+    samples = _collect_running(sampler, count, timeout)
+    sampler.stop(timeout=1.0)
+    return samples
+
+
+def test_steady_schedule_and_gateway_changes():
+    routes = iter(["192.168.1.1"] * 5 + ["10.0.0.1"] * 5 + [None] + ["10.0.0.1"] * 100)
+    sampler = Sampler(
+        read_link=lambda: LINK,
+        read_gateway=lambda: next(routes),
+        interval=lambda: INTERVAL,
+    )
+    sampler.start()
+    samples = _collect(sampler, 20)
+
+    assert len(samples) >= 20
+    gaps = np.diff([s.timestamp for s in samples])
+    assert np.all(gaps > INTERVAL / 2) and np.median(gaps) < 2 * INTERVAL
+    # Reported once per route change, on the tick it was first seen.
+    gateways = [s.gateway for s in samples[:12]]
+    assert gateways == ["192.168.1.1"] + [None] * 4 + ["10.0.0.1"] + [None] * 5 + ["10.0.0.1"]
+    assert samples[0].signal == -50
+    assert samples[0].station["tx_retries"] == 7 and samples[0].station["beacon_loss"] is None
+
+
+ROUTES = """Iface	Destination	Gateway 	Flags	RefCnt	Use	Metric	Mask		MTU	Window	IRTT
+wlan0	00000000	0101A8C0	0003	0	0	600	00000000	0	0	0
+eth0	00000000	0100000A	0003	0	0	100	00000000	0	0	0
+eth0	0000000A	00000000	0001	0	0	100	00FFFFFF	0	0	0
+tun0	00000000	0101A8C0	0001	0	0	0	00000000	0	0	0
+"""
+
+
+def test_parse_route_table():
+    # Lowest-metric default route that has a gateway (tun0 has no RTF_GATEWAY).
+    assert parse_route_table(ROUTES) == "10.0.0.1"
+    assert parse_route_table(ROUTES.replace("\t100\t00000000", "\t900\t00000000")) == "192.168.1.1"
+    assert parse_route_table(ROUTES.splitlines()[0]) is None
+
+
+def test_stalled_read_skips_ticks_and_timeouts_fail():
+    calls = []
+
+    def read_link():
+        calls.append(time.monotonic())
+        if len(calls) == 3:
+            # A stalled command, cut off by its timeout.
+            time.sleep(4 * INTERVAL)
+            raise subprocess.TimeoutExpired(["iw"], 4 * INTERVAL)
+        return LINK
+
+    sampler = Sampler(read_link=read_link, read_gateway=lambda: None, interval=lambda: INTERVAL)
+    sampler.start()
+    samples = _collect(sampler, 6)
+
+    assert (samples[2].signal, samples[2].rx, samples[2].tx, samples[2].bw) == (None, None, None, None)
+    assert samples[3].signal == -50
+    # Missed ticks are dropped, not fired back to back after the stall.
+    assert calls[3] - calls[2] >= 3 * INTERVAL
+
+
+def test_reschedule_applies_new_interval_immediately():
+    interval = [5.0]
+    sampler = Sampler(read_link=lambda: LINK, read_gateway=lambda: None, interval=lambda: interval[0])
+    sampler.start()
+    assert len(_collect_running(sampler, 1)) == 1
+    interval[0] = INTERVAL
+    sampler.reschedule()
+    # Without the reschedule this would wait out the 5 s tick.
+    assert len(_collect(sampler, 10, timeout=2.0)) >= 10
+
+
+def test_nothing_sampled_while_paused():
+    host_info = {"enabled": True, "probes": create_probe_store()}
+    for k in range(10, 0, -1):
+        append_probe(host_info, time.time() - k, 12.0)
+    constants.ping_hosts.append(host_info)
+    constants.paused = True
+    try:
+        sampler = Sampler(read_link=lambda: LINK, interval=lambda: INTERVAL)
+        sampler.start()
+        time.sleep(5 * INTERVAL)
+        sampler.stop(timeout=1.0)
+        assert sampler.drain() == []
+        # Probes are still dropped, as no sample will read them.
+        assert len(host_info["probes"]) == 1
+    finally:
+        constants.paused = False
+        constants.ping_hosts.remove(host_info)
+
+
+def test_sampling_faster_than_probing_records_no_false_failures():
+    host_info = {"enabled": True, "probes": create_probe_store()}
+    append_probe(host_info, time.time(), 12.0)
+    constants.ping_hosts.append(host_info)
+    try:
+        sampler = Sampler(read_link=lambda: LINK, interval=lambda: INTERVAL)
+        sampler.start()
+        samples = []
+        # One probe per 4 samples; the 3rd one is lost.
+        for i in range(6):
+            samples.extend(_collect_running(sampler, 4))
+            with ping_lock:
+                append_probe(host_info, time.time(), None if i == 2 else 12.0 + i)
+        samples.extend(_collect(sampler, 2))
+    finally:
+        constants.ping_hosts.remove(host_info)
+
+    rtts = [dict((id(h), v) for h, v in s.pings)[id(host_info)] for s in samples]
+    assert len(rtts) >= 24
+    lost = [i for i, rtt in enumerate(rtts) if rtt is None]
+    assert lost and len(lost) <= 8, rtts
+    assert all(rtt is not None for rtt in rtts[lost[-1] + 1:])
+    assert rtts[-1] == 17.0
+    # Sampled probes were dropped.
+    assert len(host_info["probes"]) == 1
+
+
+if __name__ == "__main__":
+    test_steady_schedule_and_gateway_changes()
+    test_parse_route_table()
+    test_stalled_read_skips_ticks_and_timeouts_fail()
+    test_reschedule_applies_new_interval_immediately()
+    test_nothing_sampled_while_paused()
+    test_sampling_faster_than_probing_records_no_false_failures()
+    print("All tests passed!")
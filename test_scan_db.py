@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+"""Tests for the SQLite scan archive."""
+
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+from scan_helpers import TempStorage, make_scan
+from wifi_monitor import storage
+from wifi_monitor.scan_db import ScanArchive
+
+CHANNELS = list(range(1, 15))
+
+
+def test_insert_is_idempotent():
+    db = ScanArchive(":memory:")
+    scans = [make_scan(1000.0 + i, counts={1: i + 1, 6: 1}) for i in range(3)]
+    assert db.insert_scans(scans) == 3
+    assert db.insert_scans(scans) == 0
+    assert db.scan_count() == 3
+    assert db.scan_count(band="5") == 0
+    assert db.scan_count(start=1001.0) == 2
+
+
+def test_heatmap_matches_journal_path():
+    with TempStorage() as root:
+        today = datetime.now().replace(hour=12, minute=0, second=0, microsecond=0)
+        yesterday = today - timedelta(days=1)
+        for scan in [
+            make_scan(today.timestamp(), counts={1: 1}),
+            make_scan(today.timestamp() + 60, counts={1: 3, 11: 2}),
+            make_scan(today.timestamp() + 120, band="5", counts={36: 4}),
+            make_scan(yesterday.timestamp(), band=None, counts={6: 5}, bss=False),
+        ]:
+            day = datetime.fromtimestamp(scan["timestamp"]).strftime("%Y-%m-%d")
+            with open(root / f"{day}.jsonl", "a") as f:
+                f.write(storage.json.dumps(scan) + "\n")
+
+        expected, dates, channels, band = storage.get_heatmap_data(days=3, band="2.4")
+        expected_networks = storage.get_heatmap_networks(dates, channels, band)
+
+        db = storage.open_archive()
+        assert Path(db.path).parent == root
+        assert db.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert db.scan_count() == 4
+        data, _, _, _ = storage.get_heatmap_data(days=3, band="2.4")
+        assert np.array_equal(data, expected, equal_nan=True)
+        assert storage.get_heatmap_networks(dates, channels, band) == expected_networks
+
+        # Reopening imports nothing twice; new scans go to both stores.
+        storage.close_archive()
+        db = storage.open_archive()
+        assert db.scan_count() == 4
+        storage.save_scan(make_scan(today.timestamp() + 180, counts={1: 9}))
+        assert db.scan_count() == 5
+        assert storage.get_heatmap_data(days=3, band="2.4")[0][-1, 0] == 9
+
+
+def test_range_aggregates():
+    db = ScanArchive(":memory:")
+    db.insert_scans(
+        [
+            make_scan(0.0, counts={1: 2, 6: 1}),
+            make_scan(600.0, counts={1: 4}),
+            make_scan(4000.0, counts={1: 3}),
+            make_scan(4100.0, band="5", counts={36: 7}),
+        ]
+    )
+    usage = db.channel_usage("2.4", 0.0, 3600.0)
+    assert usage[1] == (3.0, 4, 2)
+    assert usage[6] == (1.0, 1, 1)
+    assert 36 not in usage
+
+    times, means = db.channel_series(1, 0.0, 5000.0, bucket=3600)
+    assert list(times) == [0.0, 3600.0]
+    assert list(means) == [3.0, 3.0]
+
+    sightings = db.bss_sightings(0.0, 5000.0, channel=1)
+    assert sightings[0][:4] == ("02:00:00:00:01:00", "net1-0", 1, 3)
+    assert sightings[0][6] == -50.0
+    assert len(sightings) == 4
+
+
+if __name__ == "__main__":
+    test_insert_is_idempotent()
+    test_heatmap_matches_journal_path()
+    test_range_aggregates()
+    print("All tests passed!")
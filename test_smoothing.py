@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+"""Blocked/streaming EMA must match the original per-element smooth_data loop."""
+
+import numpy as np
+
+from wifi_monitor.buffers import CurveBuffer
+from wifi_monitor.data import EmaSmoother, smooth_data
+
+
+def reference_smooth(data, alpha=0.3):
+    """The original loop implementation of smooth_data."""
+    data = np.asarray(data, dtype=float)
+    smoothed = np.empty_like(data)
+    valid_mask = ~np.isnan(data)
+    if not np.any(valid_mask):
+        return data
+    first_valid_idx = np.argmax(valid_mask)
+    ema = data[first_valid_idx]
+    for i in range(len(data)):
+        if np.isnan(data[i]):
+            smoothed[i] = np.nan
+        else:
+            ema = data[i] if i == first_valid_idx else alpha * data[i] + (1 - alpha) * ema
+            smoothed[i] = ema
+    return smoothed
+
+
+def _series(n, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.normal(-55, 10, n)
+    x[rng.random(n) < 0.1] = np.nan
+    x[:3] = np.nan
+    return x
+
+
+def test_bulk_matches_loop():
+    x = _series(5000)
+    for alpha in (0.3, 0.05, 0.9, 1.0):
+        assert np.allclose(smooth_data(x, alpha), reference_smooth(x, alpha), rtol=1e-12, equal_nan=True)
+    assert smooth_data(np.array([])).size == 0
+    assert np.all(np.isnan(smooth_data(np.full(4, np.nan))))
+
+
+def test_streaming_matches_loop():
+    x = _series(1200, seed=1)
+    smoother = EmaSmoother(alpha=0.3)
+    parts = [smoother.smooth(x[:600])]
+    parts += [smoother.update(x[i : i + 1]) for i in range(600, 1000)]
+    parts.append(smoother.update(x[1000:]))
+    assert np.allclose(np.concatenate(parts), reference_smooth(x), rtol=1e-12, equal_nan=True)
+
+
+def test_streaming_into_buffer_matches_loop():
+    """update(out=...) writes the same values in place, for short and long inputs."""
+    x = _series(1200, seed=2)
+    buf = CurveBuffer(1, capacity=64)
+    smoother = EmaSmoother(alpha=0.3)
+    for a, b in [(0, 1), (1, 3), (3, 40), (40, 41)] + [(i, i + 1) for i in range(41, 1100)] + [(1100, 1200)]:
+        block = buf.append_slots(b - a)
+        block[0] = np.arange(a, b)
+        row = block[1]
+        assert smoother.update(x[a:b], out=row) is row
+        buf.trim_before(b - 300)
+    expected = reference_smooth(x)[-len(buf) :]
+    assert np.array_equal(buf.time(), np.arange(1200 - len(buf), 1200))
+    assert np.allclose(buf.series(0), expected, rtol=1e-12, equal_nan=True)
+
+
+if __name__ == "__main__":
+    test_bulk_matches_loop()
+    test_streaming_matches_loop()
+    test_streaming_into_buffer_matches_loop()
+    print("All tests passed!")
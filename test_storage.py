@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+"""Tests for the per-day scan journal."""
+
+import json
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from scan_helpers import TempStorage, make_scan
+from wifi_monitor import storage
+
+
+def test_save_appends_one_line_per_scan():
+    with TempStorage():
+        now = datetime.now().timestamp()
+        for i in range(3):
+            assert storage.save_scan(make_scan(now + i))
+        path = storage.get_today_file()
+        assert path.suffix == ".jsonl"
+        assert len(path.read_text().splitlines()) == 3
+        scans = storage.load_day_scans(datetime.now())
+        assert [s["timestamp"] for s in scans] == [now, now + 1, now + 2]
+        assert storage.get_last_scan_time() == datetime.fromtimestamp(now + 2)
+
+
+def test_corrupt_tail_is_skipped():
+    with TempStorage():
+        now = datetime.now().timestamp()
+        storage.save_scan(make_scan(now))
+        path = storage.get_today_file()
+        with open(path, "a") as f:
+            f.write('{"timestamp": 12, "band": "2.')  # write cut short
+        assert len(storage.load_day_scans(datetime.now())) == 1
+
+        # The next append starts on its own line and is readable.
+        storage.save_scan(make_scan(now + 1))
+        scans = storage.load_day_scans(datetime.now())
+        assert [s["timestamp"] for s in scans] == [now, now + 1]
+
+
+def test_legacy_day_file_is_migrated():
+    with TempStorage() as root:
+        date_str = datetime.now().strftime("%Y-%m-%d")
+        legacy = root / f"{date_str}.json"
+        legacy.write_text(json.dumps([make_scan(1.0, counts={1: 5}), make_scan(2.0, band=None, counts={6: 1})], indent=2))
+        assert storage.get_scan_dates() == [date_str]
+
+        data, dates, channels, band = storage.get_heatmap_data(days=1, band="2.4")
+        assert data[0, channels.index(1)] == 5
+        assert not legacy.exists()
+        assert storage.get_day_file(date_str).exists()
+
+        storage.save_scan(make_scan(3.0))
+        assert [s["timestamp"] for s in storage.load_day_scans(date_str)] == [1.0, 2.0, 3.0]
+        assert storage.get_scan_dates() == [date_str]
+
+
+def test_heatmap_prefers_band_scans():
+    with TempStorage():
+        now = datetime.now().timestamp()
+        storage.save_scan(make_scan(now, band=None, counts={1: 9}))
+        storage.save_scan(make_scan(now + 1, counts={1: 3, 6: 1}))
+        storage.save_scan(make_scan(now + 2, counts={1: 4, 6: 2}))
+        storage.save_scan(make_scan(now + 3, band="5", counts={36: 7}))
+        data, dates, channels, band = storage.get_heatmap_data(days=2, band="2.4")
+        assert data[-1, channels.index(1)] == 4
+        assert data[-1, channels.index(6)] == 2
+        assert all(v != v for v in data[0])  # no data yesterday: NaN
+
+
+def test_summary_index_avoids_day_files():
+    with TempStorage():
+        now = datetime.now().timestamp()
+        storage.save_scan(make_scan(now, counts={1: 1}))
+        storage.save_scan(make_scan(now + 1, counts={1: 2, 6: 1}))
+        date_str = datetime.now().strftime("%Y-%m-%d")
+
+        original = storage.iter_day_scans
+        storage.iter_day_scans = None  # any journal read would fail
+        try:
+            data, dates, channels, band = storage.get_heatmap_data(days=30, band="2.4")
+            networks = storage.get_heatmap_networks(dates, channels, "2.4")
+        finally:
+            storage.iter_day_scans = original
+        assert data[-1, channels.index(1)] == 2
+        assert networks[date_str][6] == ["net6-0"]
+        assert list(networks) == [date_str]
+
+
+def test_summary_rebuilt_after_outside_change():
+    with TempStorage():
+        now = datetime.now().timestamp()
+        storage.save_scan(make_scan(now, counts={1: 1}))
+        path = storage.get_today_file()
+        with open(path, "a") as f:
+            f.write(json.dumps(make_scan(now + 1, counts={11: 5})) + "\n")
+        data, dates, channels, band = storage.get_heatmap_data(days=1, band="2.4")
+        assert data[0, channels.index(11)] == 5
+
+        # Appends after the rebuild are folded into the index again.
+        storage.save_scan(make_scan(now + 2, counts={3: 9}))
+        summary = storage._load_summary()
+        assert summary["sizes"][path.stem] == path.stat().st_size
+        assert summary["days"][path.stem]["2.4"]["total"] == 9
+
+
+def test_repeat_reads_hit_cache():
+    with TempStorage():
+        now = datetime.now().timestamp()
+        storage.save_scan(make_scan(now))
+        storage.load_day_scans(datetime.now())
+        storage.get_heatmap_data(days=7, band="2.4")
+        before = storage.cache_stats()
+
+        decode = storage.json.loads
+        storage.json.loads = None  # any decoding would fail
+        try:
+            for _ in range(3):
+                storage.get_heatmap_data(days=7, band="2.4")
+                assert len(storage.load_day_scans(datetime.now())) == 1
+                assert storage.get_last_scan_time() == datetime.fromtimestamp(now)
+            # An append extends the cached day rather than invalidating it.
+            storage.save_scan(make_scan(now + 1))
+            assert len(storage.load_day_scans(datetime.now())) == 2
+        finally:
+            storage.json.loads = decode
+        after = storage.cache_stats()
+        assert after["hits"] > before["hits"]
+        assert after["misses"] == before["misses"]
+
+
+def test_cache_invalidated_by_outside_change():
+    with TempStorage():
+        now = datetime.now().timestamp()
+        storage.save_scan(make_scan(now))
+        assert len(storage.load_day_scans(datetime.now())) == 1
+        with open(storage.get_today_file(), "a") as f:
+            f.write(json.dumps(make_scan(now + 1)) + "\n")
+        assert len(storage.load_day_scans(datetime.now())) == 2
+
+
+def test_cache_size_bound():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = storage.ParsedFileCache(max_bytes=250)
+        paths = []
+        for i in range(4):
+            path = Path(tmp) / f"{i}.txt"
+            path.write_text("x" * 100)
+            paths.append(path)
+        cache.get(paths[0], Path.read_text)
+        cache.get(paths[1], Path.read_text)
+        cache.get(paths[0], Path.read_text)  # 0 is now most recently used
+        cache.get(paths[2], Path.read_text)  # evicts 1
+        stats = cache.stats()
+        assert stats["entries"] == 2 and stats["bytes"] == 200
+        assert stats["hits"] == 1 and stats["misses"] == 3 and stats["evictions"] == 1
+        assert cache.peek(paths[1]) is None and cache.peek(paths[0]) is not None
+        assert cache.get(Path(tmp) / "missing", Path.read_text) is None
+
+
+def test_manifest_answers_without_day_files():
+    with TempStorage() as root:
+        now = datetime.now().timestamp()
+        storage.save_scan(make_scan(now))
+        storage.save_scan(make_scan(now + 60, band="5"))
+        storage.save_scan(make_scan(now + 30))
+        date_str = datetime.now().strftime("%Y-%m-%d")
+        (root / "2020-01-02.json").write_text(json.dumps([make_scan(5.0, band=None)]))
+
+        storage._cache.clear()
+        (root / storage.MANIFEST_FILE).unlink()
+        assert storage.get_scan_dates() == [date_str, "2020-01-02"]  # rebuilt once
+
+        original = storage._day_scans
+        storage._day_scans = None  # any day file read would fail
+        try:
+            assert storage.get_last_scan_time() == datetime.fromtimestamp(now + 60)
+            assert storage.get_last_scan_time("2.4") == datetime.fromtimestamp(now + 30)
+            assert storage.get_last_scan_time(storage.UNBANDED) == datetime.fromtimestamp(5.0)
+            assert storage.get_scan_dates() == [date_str, "2020-01-02"]
+            assert storage._load_manifest()["counts"] == {date_str: 3, "2020-01-02": 1}
+        finally:
+            storage._day_scans = original
+
+        storage.cleanup_old_scans(keep_days=90)
+        assert storage.get_scan_dates() == [date_str]
+
+
+if __name__ == "__main__":
+    test_save_appends_one_line_per_scan()
+    test_corrupt_tail_is_skipped()
+    test_legacy_day_file_is_migrated()
+    test_heatmap_prefers_band_scans()
+    test_summary_index_avoids_day_files()
+    test_summary_rebuilt_after_outside_change()
+    test_repeat_reads_hit_cache()
+    test_cache_invalidated_by_outside_change()
+    test_cache_size_bound()
+    test_manifest_answers_without_day_files()
+    print("All tests passed!")
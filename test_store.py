@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+"""Tests for the capacity-doubling metrics store."""
+
+import numpy as np
+
+from wifi_monitor import store
+from wifi_monitor.buffers import CurveBuffer, GrowableArray
+from wifi_monitor.store import MetricsStore, PING_COLUMNS, append_probe, create_probe_store, probe_mean, probe_sample, trim_probes
+
+
+def test_append_matches_np_append():
+    buf = GrowableArray(capacity=1)
+    expected = np.array([])
+    for i in range(1000):
+        buf.append(i * 0.5)
+        expected = np.append(expected, i * 0.5)
+    assert np.array_equal(buf.view(), expected)
+
+
+def test_views_survive_growth():
+    """A view handed out earlier must not change when the buffer grows."""
+    buf = GrowableArray(capacity=2)
+    buf.extend([1.0, 2.0])
+    old = buf.view()
+    for i in range(100):
+        buf.append(float(i))
+    assert list(old) == [1.0, 2.0]
+    assert len(buf) == 102
+
+
+def test_store_columns_stay_aligned():
+    store = MetricsStore(PING_COLUMNS)
+    store.extend(data=np.full(3, np.nan), failed=np.ones(3, dtype=bool))
+    store.append(data=12.5, failed=False)
+    views = store.views()
+    assert len(store) == 4
+    assert views["failed"].dtype == bool
+    assert views["data"][-1] == 12.5 and not views["failed"][-1]
+
+    store.load(data=[1.0], failed=[False])
+    assert len(store) == 1
+
+
+def test_curve_buffer_matches_concatenate_and_trim():
+    buf = CurveBuffer(1, capacity=8)
+    t = np.arange(100, dtype=float)
+    y = t * 2
+    views = []
+    for i in range(100):
+        buf.append(t[i : i + 1], [y[i : i + 1]])
+        buf.trim_before(i - 5)
+        views.append((i, buf.time()))
+        assert np.array_equal(buf.time(), t[max(0, i - 5) : i + 1])
+        assert np.array_equal(buf.series(0), y[max(0, i - 5) : i + 1])
+    # Capacity never grew past what the window needs, and the last view handed
+    # out before a compaction still shows what it did then.
+    assert buf.capacity == 8
+    i, last = views[-2]
+    assert np.array_equal(last, t[i - 5 : i + 1])
+
+    buf.load(t, [y])
+    assert len(buf) == 100 and np.array_equal(buf.series(0), y)
+
+
+def test_probe_mean_counts_every_reply_once():
+    host_info = {"probes": create_probe_store()}
+    for t, rtt in [(0.3, 10.0), (0.6, None), (0.9, 20.0), (1.2, 30.0), (1.5, None), (1.8, None)]:
+        append_probe(host_info, t, rtt)
+    assert probe_mean(host_info, 0.0, 1.0) == 15.0
+    assert probe_mean(host_info, 1.0, 2.0) == 30.0
+    assert probe_mean(host_info, 1.3, 2.0) is None
+    assert list(host_info["probes"].view("lost")) == [False, True, False, False, True, True]
+
+
+def test_probe_sample_carries_the_last_probe_forward():
+    host_info = {"probes": create_probe_store()}
+    assert probe_sample(host_info, 0.0, 0.1, 2.0) is None
+    for t, rtt in [(0.3, 10.0), (0.6, 20.0), (0.9, None), (1.2, 40.0)]:
+        append_probe(host_info, t, rtt)
+    # Probes every 0.3 s, samples every 0.1 s.
+    assert probe_sample(host_info, 0.2, 0.3, 2.0) == 10.0
+    assert probe_sample(host_info, 0.3, 0.4, 2.0) == 10.0
+    assert probe_sample(host_info, 0.5, 0.6, 2.0) == 20.0
+    assert probe_sample(host_info, 0.9, 1.0, 2.0) is None  # until the lost probe's successor
+    assert probe_sample(host_info, 1.1, 1.2, 2.0) == 40.0
+    assert probe_sample(host_info, 1.2, 1.3, 2.0) == 40.0
+    assert probe_sample(host_info, 0.0, 1.3, 2.0) == probe_mean(host_info, 0.0, 1.3)
+    # Nothing heard for max_age: the host stalled.
+    assert probe_sample(host_info, 3.0, 3.1, 2.0) == 40.0
+    assert probe_sample(host_info, 3.3, 3.4, 2.0) is None
+
+
+def test_trimmed_probes_sample_the_same():
+    full, trimmed = {"probes": create_probe_store()}, {"probes": create_probe_store()}
+    probes = [(0.3 * i, None if i % 5 == 3 else 10.0 + i) for i in range(1, 41)]
+    for t, rtt in probes:
+        append_probe(full, t, rtt)
+    for t0 in np.arange(0.0, 12.5, 0.1):
+        for t, rtt in probes:
+            if t0 - 0.1 < t <= t0:
+                append_probe(trimmed, t, rtt)
+        expected = probe_sample(full, t0 - 0.1, t0, 2.0)
+        assert probe_sample(trimmed, t0 - 0.1, t0, 2.0) == expected
+        trim_probes(trimmed, t0)
+        # Only the last probe up to the sample is kept.
+        assert len(trimmed["probes"]) <= 1
+    trim_probes(trimmed, 100.0)
+    assert list(trimmed["probes"].view("time")) == [12.0]
+
+
+def test_station_counters_stored_as_deltas():
+    empty = {name: np.array([], dtype=dtype) for name, dtype in store.LINK_COLUMNS.items()}
+    store.load_link_metrics(**empty)
+    try:
+        readings = [
+            {"tx_retries": 100, "beacon_signal": -50},
+            {"tx_retries": 104, "beacon_signal": -51},
+            None,  # failed read
+            {"tx_retries": 110},
+            {"tx_retries": 3},  # reassociated, counters restarted
+            {"tx_retries": 5},
+        ]
+        for t, station in enumerate(readings):
+            store.append_link_sample(float(t), -50, 1.0, 1.0, 20, station)
+        retries = store.station_metrics.view("tx_retries")
+        assert np.array_equal(retries, [np.nan, 4, np.nan, np.nan, np.nan, 2], equal_nan=True)
+        assert np.array_equal(store.station_metrics.view("beacon_signal")[:2], [-50, -51])
+        assert len(store.station_metrics) == len(store.metrics)
+    finally:
+        store.load_link_metrics(**empty)
+
+
+if __name__ == "__main__":
+    test_append_matches_np_append()
+    test_views_survive_growth()
+    test_store_columns_stay_aligned()
+    test_curve_buffer_matches_concatenate_and_trim()
+    test_probe_mean_counts_every_reply_once()
+    test_probe_sample_carries_the_last_probe_forward()
+    test_trimmed_probes_sample_the_same()
+    test_station_counters_stored_as_deltas()
+    print("All tests passed!")
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+"""Downsampled redraw of a range zoomed into history, on an offscreen window."""
+
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+from PyQt5.QtWidgets import QApplication
+
+from wifi_monitor import constants, data, ping, store
+from wifi_monitor.windows.main_window import WifiMonitor
+
+
+def test_zoom_into_history_draws_bucketed_ping():
+    app = QApplication.instance() or QApplication([])
+    old_hosts, old_running = list(constants.ping_hosts), ping.ping_threads_running
+    ping.ping_threads_running = False
+    constants.ping_hosts[:] = []
+    window = None
+    try:
+        host_info = ping.add_ping_host("10.0.0.1", "gateway")
+        data.generate_test_data("6h")
+        n = len(constants.time_data)
+        ramp = np.linspace(0.0, 500.0, n)
+        store.load_host_metrics(host_info, ramp, np.zeros(n, dtype=bool))
+
+        window = WifiMonitor(antialias_default=False)
+        window.sampler.stop(timeout=1.0)
+        window.show()
+        app.processEvents()
+        window.set_window("∞")
+        window.needs_full_redraw = True
+        window.draw_charts()
+
+        # Hours 1-3 of 6: far more samples than pixels, all of them history.
+        t0 = constants.time_data[0]
+        window.signal_plot.setXRange(t0 + 3600, t0 + 3 * 3600, padding=0)
+        window.is_zoomed = True
+        window._full_redraw()
+
+        x, y = window.ping_curves[0].getData()
+        assert len(x) < (2 * 3600) / 2
+        assert t0 + 3600 - 60 <= x.min() and x.max() <= t0 + 3 * 3600 + 60
+        # Each point sits on its own bucket time (up to the smoothing lag).
+        expected = np.interp(x, constants.time_data, ramp)
+        assert np.nanmax(np.abs(y - expected)) < 5, (np.nanmin(y), np.nanmax(y))
+        assert np.nanmax(y) > 245
+    finally:
+        if window is not None:
+            window.close()
+        constants.ping_hosts[:] = old_hosts
+        ping.ping_threads_running = old_running
+
+
+if __name__ == "__main__":
+    test_zoom_into_history_draws_bucketed_ping()
+    print("All tests passed!")
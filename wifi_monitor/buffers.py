@@ -0,0 +1,153 @@
+"""Preallocated numpy buffers."""
+
+import numpy as np
+
+
+class GrowableArray:
+    """1-D numpy buffer that doubles its capacity when full."""
+
+    def __init__(self, dtype=float, capacity=1024):
+        self._buf = np.empty(max(1, int(capacity)), dtype=dtype)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def dtype(self):
+        return self._buf.dtype
+
+    def _reserve(self, size):
+        if size <= len(self._buf):
+            return
+        capacity = len(self._buf)
+        while capacity < size:
+            capacity *= 2
+        buf = np.empty(capacity, dtype=self._buf.dtype)
+        buf[: self._size] = self._buf[: self._size]
+        self._buf = buf
+
+    def append(self, value):
+        if self._size == len(self._buf):
+            self._reserve(self._size + 1)
+        self._buf[self._size] = value
+        self._size += 1
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=self._buf.dtype)
+        n = len(values)
+        if n == 0:
+            return
+        self._reserve(self._size + n)
+        self._buf[self._size : self._size + n] = values
+        self._size += n
+
+    def clear(self):
+        self._size = 0
+
+    def drop_front(self, n):
+        """Drop the first `n` values, moving the rest to the front in place.
+
+        Unlike appends this overwrites what earlier views show, so callers
+        must not hold on to views across it.
+        """
+        n = min(max(0, int(n)), self._size)
+        if n == 0:
+            return
+        self._size -= n
+        self._buf[: self._size] = self._buf[n : n + self._size]
+
+    def view(self):
+        """Zero-copy view of the filled part of the buffer.
+
+        Views stay valid after later appends: a reallocation leaves old views
+        pointing at the previous buffer, and in-place appends only write past
+        the end of every view handed out so far.
+        """
+        return self._buf[: self._size]
+
+
+class CurveBuffer:
+    """Fixed-capacity display buffer for one plot curve (time + Y series).
+
+    Holds the visible window between `head` and `tail`. New samples are written
+    at the tail and samples that scrolled out of the window are dropped by
+    moving the head, so the live path neither copies nor allocates. When the
+    tail reaches the end, the live part is moved to the front of a second,
+    preallocated buffer; views handed to the plot before that stay valid.
+    """
+
+    def __init__(self, n_series, capacity=4096):
+        self.n_series = n_series
+        self._bufs = [np.empty((n_series + 1, max(1, int(capacity)))) for _ in range(2)]
+        self._active = 0
+        self.head = 0
+        self.tail = 0
+
+    def __len__(self):
+        return self.tail - self.head
+
+    @property
+    def capacity(self):
+        return self._bufs[0].shape[1]
+
+    def _reserve(self, n):
+        """Make room for `n` more samples at the tail."""
+        if self.tail + n <= self.capacity:
+            return
+        size = len(self)
+        src = self._bufs[self._active]
+        if size + n > self.capacity:
+            capacity = self.capacity
+            while capacity < size + n:
+                capacity *= 2
+            self._bufs = [np.empty((self.n_series + 1, capacity)) for _ in range(2)]
+            self._active = 0
+        else:
+            self._active ^= 1
+        self._bufs[self._active][:, :size] = src[:, self.head : self.tail]
+        self.head = 0
+        self.tail = size
+
+    def clear(self):
+        self.head = 0
+        self.tail = 0
+
+    def load(self, time_arr, y_arrays):
+        """Replace the contents (after a full redraw)."""
+        self.clear()
+        self.append(time_arr, y_arrays)
+
+    def append(self, time_arr, y_arrays):
+        n = len(time_arr)
+        if n == 0:
+            return
+        self._reserve(n)
+        buf = self._bufs[self._active]
+        buf[0, self.tail : self.tail + n] = time_arr
+        for row, y in zip(buf[1:], y_arrays):
+            row[self.tail : self.tail + n] = y
+        self.tail += n
+
+    def append_slots(self, n):
+        """Append `n` samples to be filled in place.
+
+        Returns the (1 + n_series) x n block at the tail: row 0 is time, row
+        i + 1 series i. Writing the new samples there (e.g. with
+        `EmaSmoother.update(..., out=row)`) avoids any temporary arrays.
+        """
+        self._reserve(n)
+        block = self._bufs[self._active][:, self.tail : self.tail + n]
+        self.tail += n
+        return block
+
+    def trim_before(self, cutoff):
+        """Drop samples older than `cutoff` from the head."""
+        times = self._bufs[self._active][0, self.head : self.tail]
+        self.head += int(np.searchsorted(times, cutoff, side="left"))
+
+    def time(self):
+        return self._bufs[self._active][0, self.head : self.tail]
+
+    def series(self, i):
+        return self._bufs[self._active][i + 1, self.head : self.tail]
@@ -16,7 +16,10 @@ PING_COLORS = ["#FF0000", "#FFA500", "#800080", "#8B4513", "#FF1493", "#00FFFF"]
 
 # Defaults
 DEFAULT_WINDOW = 600
-DEFAULT_REFRESH_INTERVAL_MS = 1000
+DEFAULT_REFRESH_INTERVAL_MS = 1000  # repaint interval
+DEFAULT_SAMPLE_INTERVAL_MS = 1000  # link sampling interval
+COMMAND_TIMEOUT = 2.0  # seconds allowed per `iw`/`ip` call
+LINK_STATE_MAX_AGE = 5.0  # seconds a cached `iw link` snapshot may be reused
 
 # Shared state (mutated by app)
 current_window = DEFAULT_WINDOW
@@ -34,6 +37,7 @@ bandwidth_failed = np.array([], dtype=bool)
 
 INTERFACE = None
 REFRESH_INTERVAL = DEFAULT_REFRESH_INTERVAL_MS
+SAMPLE_INTERVAL = DEFAULT_SAMPLE_INTERVAL_MS
 
 ping_hosts = []
 
@@ -3,150 +3,10 @@ import time
 import numpy as np
 import pyqtgraph as pg
 
-from .. import constants
-from ..data import smooth_data
-
-
-def _downsample_minmax(time_arr: np.ndarray, y_arr: np.ndarray, step: int):
-    """Downsample by emitting min+max per bucket (peak-preserving).
-
-    NOTE: This function buckets by index (0..n). For sliding windows, bucket
-    boundaries can move as the window cutoff shifts.
-    """
-    n = len(time_arr)
-    if step <= 1 or n <= 2:
-        return time_arr, y_arr
-
-    out_t = []
-    out_y = []
-
-    end = (n // step) * step
-    for i in range(0, end, step):
-        t_chunk = time_arr[i : i + step]
-        y_chunk = y_arr[i : i + step]
-
-        if np.all(~np.isfinite(y_chunk)):
-            mid = len(t_chunk) // 2
-            out_t.append(t_chunk[mid])
-            out_y.append(np.nan)
-            continue
-
-        imin = int(np.nanargmin(y_chunk))
-        imax = int(np.nanargmax(y_chunk))
-
-        if imin <= imax:
-            out_t.extend([t_chunk[imin], t_chunk[imax]])
-            out_y.extend([y_chunk[imin], y_chunk[imax]])
-        else:
-            out_t.extend([t_chunk[imax], t_chunk[imin]])
-            out_y.extend([y_chunk[imax], y_chunk[imin]])
-
-    if end < n:
-        out_t.extend(time_arr[end:])
-        out_y.extend(y_arr[end:])
-
-    return np.asarray(out_t), np.asarray(out_y)
-
-
-def _downsample_minmax_timebucket(time_arr: np.ndarray, y_arr: np.ndarray, step: int, t0: float, dt: float):
-    """Stable min/max downsampling using absolute-time buckets.
-
-    Buckets are aligned to (t0 + k*step*dt), so a sliding cutoff does not move
-    bucket boundaries and deep history stays visually stable.
-    """
-    n = len(time_arr)
-    if step <= 1 or n <= 2:
-        return time_arr, y_arr
-
-    dt = max(float(dt), 1e-6)
-    bucket = step * dt
-
-    # Bucket index per sample.
-    idx = np.floor((time_arr - t0) / bucket).astype(np.int64)
-
-    out_t = []
-    out_y = []
-
-    i = 0
-    while i < n:
-        j = i + 1
-        while j < n and idx[j] == idx[i]:
-            j += 1
-
-        t_chunk = time_arr[i:j]
-        y_chunk = y_arr[i:j]
-
-        if np.all(~np.isfinite(y_chunk)):
-            mid = len(t_chunk) // 2
-            out_t.append(t_chunk[mid])
-            out_y.append(np.nan)
-        else:
-            imin = int(np.nanargmin(y_chunk))
-            imax = int(np.nanargmax(y_chunk))
-            if imin <= imax:
-                out_t.extend([t_chunk[imin], t_chunk[imax]])
-                out_y.extend([y_chunk[imin], y_chunk[imax]])
-            else:
-                out_t.extend([t_chunk[imax], t_chunk[imin]])
-                out_y.extend([y_chunk[imax], y_chunk[imin]])
-
-        i = j
-
-    return np.asarray(out_t), np.asarray(out_y)
-
-
-def _downsample_multi_timebucket(time_arr: np.ndarray, y_arrays: list, step: int, t0: float, dt: float):
-    """Downsample multiple Y series using a shared time grid.
-
-    Returns (out_time, [out_y1, out_y2, ...]) where all arrays have the same length.
-    For each bucket, emits two points (at min/max times based on the FIRST y array).
-    Other y arrays are sampled at the same indices.
-    """
-    n = len(time_arr)
-    if step <= 1 or n <= 2:
-        return time_arr, y_arrays
-
-    dt = max(float(dt), 1e-6)
-    bucket = step * dt
-
-    idx = np.floor((time_arr - t0) / bucket).astype(np.int64)
-
-    out_t = []
-    out_ys = [[] for _ in y_arrays]
-
-    i = 0
-    while i < n:
-        j = i + 1
-        while j < n and idx[j] == idx[i]:
-            j += 1
-
-        t_chunk = time_arr[i:j]
-        # Use the first Y array (signal) to determine which indices to sample
-        y_primary = y_arrays[0][i:j]
-
-        if np.all(~np.isfinite(y_primary)):
-            # All NaN in primary - emit single midpoint for all series
-            mid = len(t_chunk) // 2
-            out_t.append(t_chunk[mid])
-            for k, y_arr in enumerate(y_arrays):
-                out_ys[k].append(y_arr[i:j][mid])
-        else:
-            imin = int(np.nanargmin(y_primary))
-            imax = int(np.nanargmax(y_primary))
-            if imin <= imax:
-                out_t.extend([t_chunk[imin], t_chunk[imax]])
-                for k, y_arr in enumerate(y_arrays):
-                    y_chunk = y_arr[i:j]
-                    out_ys[k].extend([y_chunk[imin], y_chunk[imax]])
-            else:
-                out_t.extend([t_chunk[imax], t_chunk[imin]])
-                for k, y_arr in enumerate(y_arrays):
-                    y_chunk = y_arr[i:j]
-                    out_ys[k].extend([y_chunk[imax], y_chunk[imin]])
-
-        i = j
-
-    return np.asarray(out_t), [np.asarray(y) for y in out_ys]
+from .. import constants, store
+from ..buffers import CurveBuffer
+from ..data import EmaSmoother
+from ..downsample import bucket_means, bucket_percentiles
 
 
 def _get_min_failure_cluster_size():
@@ -169,85 +29,74 @@ def _get_min_failure_cluster_size():
         return 1
 
 
-def draw_failure_regions(window, plot_idx, failure_list, start_idx, x_range=None):
+def draw_failure_regions(window, plot_idx, runs, colors=None):
+    """Shade the failure runs inside the current view of one plot.
+
+    `runs` is a list of `FailureRuns` drawn on the same plot (one per ping host
+    on the ping plot), `colors` their matching colors (default red).
+    """
     plots = [window.signal_plot, window.ping_plot, window.rate_plot, window.bw_plot]
     plot = plots[plot_idx]
     overlay = window.failure_overlays[plot_idx]
 
     overlay.setGeometry(plot.viewport().rect())
 
-    if len(constants.time_data) == 0 or len(failure_list) == 0:
+    if len(constants.time_data) == 0 or not runs:
         overlay.setRegions([])
         return
 
     vb = plot.getViewBox()
-    view_range = vb.viewRange()
-    x_min, x_max = view_range[0]
+    x_min, x_max = vb.viewRange()[0]
 
     if x_max <= x_min:
         overlay.setRegions([])
         return
 
-    vis_start = max(0, np.searchsorted(constants.time_data, x_min, side="left") - 1)
-    vis_end = min(
-        len(failure_list),
-        np.searchsorted(constants.time_data, x_max, side="right") + 1,
-    )
-
-    if vis_end <= vis_start:
-        overlay.setRegions([])
-        return
-
-    vis_failures = failure_list[vis_start:vis_end]
-
-    if not np.any(vis_failures):
-        overlay.setRegions([])
-        return
-
-    padded = np.concatenate([[False], vis_failures.astype(bool), [False]])
-    diff = np.diff(padded.astype(np.int8))
-    starts = np.where(diff == 1)[0]
-    ends = np.where(diff == -1)[0]
+    # The X axis is linear, so two mapped points give the view -> pixel transform.
+    left_px = plot.mapFromScene(vb.mapViewToScene(pg.Point(x_min, 0))).x()
+    right_px = plot.mapFromScene(vb.mapViewToScene(pg.Point(x_max, 0))).x()
+    scale = (right_px - left_px) / (x_max - x_min)
 
     min_cluster = _get_min_failure_cluster_size()
+    if colors is None:
+        colors = [None] * len(runs)
 
     pixel_regions = []
-    for s, e in zip(starts, ends):
-        # Skip clusters smaller than minimum threshold for this interval
-        cluster_size = e - s
-        if cluster_size < min_cluster:
-            continue
-        global_start = vis_start + s
-        global_end = vis_start + e - 1
+    for failure_runs, color in zip(runs, colors):
+        t_start, t_end = failure_runs.visible(x_min, x_max, min_cluster)
+        lefts = left_px + (t_start - x_min) * scale
+        rights = left_px + (t_end - x_min) * scale
+        for left_pixel, right_pixel in zip(lefts.tolist(), rights.tolist()):
+            if right_pixel > left_pixel:
+                pixel_regions.append((left_pixel, right_pixel, color))
 
-        if global_start >= len(constants.time_data) or global_end >= len(constants.time_data):
-            continue
+    overlay.setRegions(pixel_regions)
 
-        t_start = constants.time_data[global_start]
-        t_end = constants.time_data[global_end]
 
-        if global_start > 0:
-            t_start = constants.time_data[global_start - 1]
-        if global_end + 1 < len(constants.time_data):
-            t_end = constants.time_data[global_end + 1]
+def draw_all_failure_regions(window):
+    with window.frames.phase("overlays"):
+        _draw_all_failure_regions(window)
 
-        t_start = max(t_start, x_min)
-        t_end = min(t_end, x_max)
 
-        left_scene = vb.mapViewToScene(pg.Point(t_start, 0))
-        right_scene = vb.mapViewToScene(pg.Point(t_end, 0))
-        left_pixel = plot.mapFromScene(left_scene).x()
-        right_pixel = plot.mapFromScene(right_scene).x()
+def _draw_all_failure_regions(window):
+    from ..constants import PING_COLORS
 
-        if right_pixel > left_pixel:
-            pixel_regions.append((left_pixel, right_pixel))
+    draw_failure_regions(window, 0, [store.link_failures["signal_failed"]])
+    draw_failure_regions(window, 2, [store.link_failures["rates_failed"]])
+    draw_failure_regions(window, 3, [store.link_failures["bandwidth_failed"]])
 
-    overlay.setRegions(pixel_regions)
+    hosts = constants.ping_hosts[: len(window.ping_curves)]
+    draw_failure_regions(
+        window,
+        1,
+        [host_info["failure_runs"] for host_info in hosts],
+        [PING_COLORS[i % len(PING_COLORS)] for i in range(len(hosts))],
+    )
 
 
 def update_ping_curves(window):
     from ..constants import PING_COLORS
-    from ..plot_items import setup_legend
+    from ..plot_items import LatencyBands, setup_legend
 
     # Remove only the ping curves + their legend entries; do not clear the whole plot,
     # otherwise the ping graph visibly blinks on host add/remove.
@@ -265,7 +114,12 @@ def update_ping_curves(window):
             window.ping_plot.removeItem(curve)
         except Exception:
             pass
+    for bands in window.ping_bands:
+        bands.remove(window.ping_plot)
+    window.ping_bands.clear()
     window.ping_curves.clear()
+    window.ping_smoothers.clear()
+    window.ping_buffers.clear()
 
     window.ping_legend = setup_legend(window.ping_plot)
 
@@ -273,16 +127,123 @@ def update_ping_curves(window):
         color = PING_COLORS[i % len(PING_COLORS)]
         curve = window.ping_plot.plot(
             pen=pg.mkPen(color, width=2),
-            antialias=window.antialias_default,
+            antialias=window.frames.antialias(window.antialias_default),
             connect="finite",
         )
         window.ping_curves.append(curve)
+        window.ping_smoothers.append(EmaSmoother(alpha=0.3))
+        window.ping_buffers.append(CurveBuffer(1))
+        window.ping_bands.append(LatencyBands(window.ping_plot, curve, color))
         window.ping_legend.addItem(curve, host_info["label"])
 
     # The selection lines + overlays are created once in main_window.py and should be
     # left intact here.
 
 
+def apply_frame_quality(window):
+    """Apply the frame scheduler's quality level (antialiasing, point density)."""
+    antialias = window.frames.antialias(window.antialias_default)
+    curves = [window.signal_curve, window.rx_curve, window.tx_curve, window.bw_curve, *window.ping_curves]
+    for curve in curves:
+        curve.opts["antialias"] = antialias
+        curve.curve.opts["antialias"] = antialias
+        curve.update()
+    # The point density only changes with a full redraw.
+    window.needs_full_redraw = True
+
+
+# Percentiles drawn as smokeping-style bands: min, p25, median, p75, max.
+BAND_QUANTILES = (0.0, 0.25, 0.5, 0.75, 1.0)
+
+
+def _bucket_band_stats(time_arr, matrix, period):
+    out_time, percentiles, loss, complete = bucket_percentiles(time_arr, matrix, period, BAND_QUANTILES)
+    return out_time, np.concatenate([percentiles, loss[:, None, :]], axis=1), complete
+
+
+# Per-bucket ping reductions: name -> fn(time, host matrix, period) returning
+# (bucket_times, stats with buckets on the last axis, complete).
+_PING_REDUCERS = {
+    "mean": bucket_means,
+    "bands": _bucket_band_stats,
+}
+
+
+def _ping_bucket_stats(window, hosts, lo, hi, period, kind="mean"):
+    """Per-bucket ping statistics of every host over raw samples [lo, hi).
+
+    `kind` "mean" gives one row of means per host (hosts x buckets); "bands"
+    gives min/p25/median/p75/max and the loss fraction (hosts x 6 x buckets).
+
+    Completed buckets are cached on the window (like the link-metric pyramid,
+    they never change once a later sample exists), so a redraw only aggregates
+    the partial first bucket, the samples after the last completed bucket, and
+    trims what scrolled off.
+    Returns (bucket_times, stats).
+    """
+    reduce = _PING_REDUCERS[kind]
+    times = constants.time_data
+
+    def host_matrix(a, b):
+        matrix = np.full((len(hosts), max(0, b - a)), np.nan)
+        for row, host_info in zip(matrix, hosts):
+            data = host_info["data"][a:b]
+            row[: len(data)] = data
+        return matrix
+
+    if hi <= lo:
+        out_time, stats, _ = reduce(times[:0], host_matrix(0, 0), period)
+        return out_time, stats
+
+    key = (kind, float(period), float(times[0]), tuple(id(h) for h in hosts))
+    cache = getattr(window, "_ping_ds_cache", None)
+
+    # The first bucket is usually cut by the window start; it is always
+    # recomputed so cached and fresh results agree.
+    first_full = np.ceil(times[lo] / period) * period
+    head_end = min(hi, int(np.searchsorted(times, first_full, side="left")))
+
+    # The cache is only usable if it covers the range from its first whole
+    # bucket on: it must start no later and end inside the range.
+    if (
+        cache is not None
+        and cache["key"] == key
+        and cache["start"] <= first_full
+        and head_end <= cache["end_idx"] <= hi
+    ):
+        keep = np.floor(cache["time"] / period) * period >= first_full
+        parts_time = [cache["time"][keep]]
+        parts_stats = [cache["stats"][..., keep]]
+        from_idx = cache["end_idx"]
+    else:
+        parts_time = []
+        parts_stats = []
+        from_idx = head_end
+
+    head_time, head_stats, _ = reduce(times[lo:head_end], host_matrix(lo, head_end), period)
+    new_time, new_stats, complete = reduce(times[from_idx:hi], host_matrix(from_idx, hi), period)
+
+    cached_time = np.concatenate(parts_time + [new_time[:complete]])
+    cached_stats = np.concatenate(parts_stats + [new_stats[..., :complete]], axis=-1)
+
+    # Everything but the last (possibly still filling) bucket is reusable.
+    end_idx = from_idx
+    if len(new_time) > 0:
+        last_start = np.floor(new_time[-1] / period) * period
+        end_idx = max(from_idx, int(np.searchsorted(times, last_start, side="left")))
+    window._ping_ds_cache = {
+        "key": key,
+        "start": first_full,
+        "end_idx": end_idx,
+        "time": cached_time,
+        "stats": cached_stats,
+    }
+
+    out_time = np.concatenate([head_time, cached_time, new_time[complete:]])
+    out_stats = np.concatenate([head_stats, cached_stats, new_stats[..., complete:]], axis=-1)
+    return out_time, out_stats
+
+
 def full_redraw(window):
     if len(constants.time_data) == 0:
         return
@@ -296,129 +257,61 @@ def full_redraw(window):
         cutoff = now - constants.current_window
         start_idx = np.searchsorted(constants.time_data, cutoff, side="left")
 
-    vis_time = constants.time_data[start_idx:]
-    vis_signal = constants.signal_data[start_idx:]
-    vis_rx = constants.rx_rate_data[start_idx:]
-    vis_tx = constants.tx_rate_data[start_idx:]
-    vis_bw = constants.bandwidth_data[start_idx:]
+    # When zoomed, only the zoomed range (plus one sample either side) is drawn,
+    # so the pyramid can serve it from a finer level.
+    end_idx = len(constants.time_data)
+    if window.is_zoomed:
+        x_min, x_max = window.signal_plot.getViewBox().viewRange()[0]
+        start_idx = max(start_idx, np.searchsorted(constants.time_data, x_min, side="left") - 1)
+        end_idx = min(end_idx, np.searchsorted(constants.time_data, x_max, side="right") + 1)
 
-    points_per_pixel = 1.2
+    vis_time = constants.time_data[start_idx:end_idx]
+    vis_signal = constants.signal_data[start_idx:end_idx]
+    vis_rx = constants.rx_rate_data[start_idx:end_idx]
+    vis_tx = constants.tx_rate_data[start_idx:end_idx]
+    vis_bw = constants.bandwidth_data[start_idx:end_idx]
+
+    points_per_pixel = window.frames.points_per_pixel
     plot_px = max(1, window.signal_plot.viewport().width())
     max_points = max(200, int(plot_px * points_per_pixel))
 
     downsampled = False
-    downsample_step = 1
-    tail_points = 60
-
-    # Cache downsampled history so long windows (e.g. 4h) don't rerender the entire
-    # history every tick. Only recompute when the downsampling parameters change or
-    # enough new points accumulate to add at least one full bucket.
-    if not hasattr(window, "_ds_cache"):
-        window._ds_cache = None
-
-    if len(vis_time) > max_points + tail_points:
-        hist_time_raw = vis_time[:-tail_points]
-        hist_signal_raw = vis_signal[:-tail_points]
-        hist_rx_raw = vis_rx[:-tail_points]
-        hist_tx_raw = vis_tx[:-tail_points]
-        hist_bw_raw = vis_bw[:-tail_points]
-
-        tail_time = vis_time[-tail_points:]
-        tail_signal = vis_signal[-tail_points:]
-        tail_rx = vis_rx[-tail_points:]
-        tail_tx = vis_tx[-tail_points:]
-        tail_bw = vis_bw[-tail_points:]
-
-        step = max(1, int(np.ceil(len(hist_time_raw) / max(1, max_points // 2))))
-
-        # Stable bucket alignment: downsample history using absolute-time buckets
-        # so deep history doesn't reshuffle as the 4h cutoff slides.
-        dt = float(np.median(np.diff(constants.time_data))) if len(constants.time_data) > 2 else 1.0
-        t0 = constants.time_data[0] if len(constants.time_data) else 0.0
-
-        # Cache key should NOT include start_idx/vis_start_time because
-        # absolute-time bucketed downsampling produces stable results regardless
-        # of where the visible window starts. But we must track the actual END
-        # timestamp of the cached history to correctly compute the tail.
-        cache_key = (step, tail_points, max_points, plot_px, float(t0), float(dt))
-        cache = window._ds_cache
-
-        can_reuse = (
-            len(hist_time_raw) > 0
-            and cache is not None
-            and cache.get("key") == cache_key
-            and cache.get("hist_end_time", 0) <= hist_time_raw[-1]
-        )
 
-        if can_reuse:
-            cached_hist_time = cache["hist_time"]
-            cached_hist_signal = cache["hist_signal"]
-            cached_hist_rx = cache["hist_rx"]
-            cached_hist_tx = cache["hist_tx"]
-            cached_hist_bw = cache["hist_bw"]
-            cached_end_time = cache["hist_end_time"]
-
-            # Trim cached history to only include timestamps within current visible range.
-            # Some old cached data may have scrolled off the left edge.
-            vis_start = vis_time[0]
-            trim_idx = np.searchsorted(cached_hist_time, vis_start, side="left")
-            hist_time = cached_hist_time[trim_idx:]
-            hist_signal = cached_hist_signal[trim_idx:]
-            hist_rx = cached_hist_rx[trim_idx:]
-            hist_tx = cached_hist_tx[trim_idx:]
-            hist_bw = cached_hist_bw[trim_idx:]
-
-            # Find where to start the tail: first vis_time point after cached_end_time.
-            # This ensures no gap between cached history and tail.
-            tail_start_idx = np.searchsorted(vis_time, cached_end_time, side="right")
-            tail_time = vis_time[tail_start_idx:]
-            tail_signal = vis_signal[tail_start_idx:]
-            tail_rx = vis_rx[tail_start_idx:]
-            tail_tx = vis_tx[tail_start_idx:]
-            tail_bw = vis_bw[tail_start_idx:]
-        else:
-            # Downsample all series together using a shared time grid to ensure
-            # all Y arrays stay aligned with the same X timestamps.
-            hist_time, (hist_signal, hist_rx, hist_tx, hist_bw) = _downsample_multi_timebucket(
-                hist_time_raw,
-                [hist_signal_raw, hist_rx_raw, hist_tx_raw, hist_bw_raw],
-                step,
-                t0=t0,
-                dt=dt,
+    # Long ranges are served from the min/max pyramid maintained at ingest, so a
+    # redraw only touches O(pixels) precomputed points plus the few raw samples
+    # of the bucket still being filled.
+    if len(vis_time) > max_points:
+        with window.frames.phase("downsample"):
+            vis_time, (vis_signal, vis_rx, vis_tx, vis_bw), _, bucket_width = store.link_pyramid.render(
+                constants.time_data,
+                [constants.signal_data, constants.rx_rate_data, constants.tx_rate_data, constants.bandwidth_data],
+                float(vis_time[0]),
+                float(vis_time[-1]),
+                max(1, max_points // 2),
             )
 
-            window._ds_cache = {
-                "key": cache_key,
-                "hist_end_time": float(hist_time_raw[-1]) if len(hist_time_raw) > 0 else 0.0,
-                "hist_time": hist_time,
-                "hist_signal": hist_signal,
-                "hist_rx": hist_rx,
-                "hist_tx": hist_tx,
-                "hist_bw": hist_bw,
-            }
-
-        vis_time = np.concatenate([hist_time, tail_time])
-        vis_signal = np.concatenate([hist_signal, tail_signal])
-        vis_rx = np.concatenate([hist_rx, tail_rx])
-        vis_tx = np.concatenate([hist_tx, tail_tx])
-        vis_bw = np.concatenate([hist_bw, tail_bw])
-
         downsampled = True
-        downsample_step = step
-        tail_time_for_downsample = tail_time
-        # Track where tail starts in raw vis_* arrays (before downsampling) for ping alignment.
-        # When cache reused: use tail_start_idx computed from timestamp search.
-        # When not reused: use len(hist_time_raw) (original split point).
-        if can_reuse:
-            raw_tail_start = tail_start_idx
-        else:
-            raw_tail_start = len(hist_time_raw)
+        # Ping is bucket-averaged up to where the pyramid's finest level ends;
+        # everything after that is drawn raw, like the link metrics.
+        raw_tail_start = int(
+            np.searchsorted(
+                constants.time_data[start_idx:end_idx],
+                store.link_pyramid.levels[0].end,
+                side="left",
+            )
+        )
+        tail_time_for_downsample = constants.time_data[start_idx + raw_tail_start : end_idx]
 
+    # Smoothing (re)starts here; the live path in draw_charts continues from the
+    # smoother state left behind.
+    smoothers = [window.signal_smoother, window.rx_smoother, window.tx_smoother, window.bw_smoother]
     if not downsampled:
-        vis_signal = smooth_data(vis_signal, alpha=0.3)
-        vis_rx = smooth_data(vis_rx, alpha=0.3)
-        vis_tx = smooth_data(vis_tx, alpha=0.3)
-        vis_bw = smooth_data(vis_bw, alpha=0.3)
+        vis_signal, vis_rx, vis_tx, vis_bw = (
+            smoother.smooth(y) for smoother, y in zip(smoothers, [vis_signal, vis_rx, vis_tx, vis_bw])
+        )
+    else:
+        for smoother in smoothers:
+            smoother.reset()
 
     for plot in [window.signal_plot, window.ping_plot, window.rate_plot, window.bw_plot]:
         plot.setUpdatesEnabled(False)
@@ -428,66 +321,58 @@ def full_redraw(window):
     window.tx_curve.setData(vis_time, vis_tx)
     window.bw_curve.setData(vis_time, vis_bw)
 
+    # The live path in draw_charts appends to these; they only hold raw
+    # (non-downsampled) windows, which is the only case it handles.
+    if downsampled:
+        window.link_buffer.clear()
+    else:
+        window.link_buffer.load(vis_time, [vis_signal, vis_rx, vis_tx, vis_bw])
+
+    bands = downsampled and window.ping_bands_enabled
+    if downsampled:
+        # Ping history is reduced per absolute-time bucket (same grid as the
+        # pyramid) for all hosts at once: to means, or to percentile bands.
+        with window.frames.phase("downsample"):
+            hist_ping_time, hist_ping_stats = _ping_bucket_stats(
+                window,
+                constants.ping_hosts[: len(window.ping_curves)],
+                start_idx,
+                start_idx + raw_tail_start,
+                bucket_width / 2,
+                kind="bands" if bands else "mean",
+            )
+
     for i, host_info in enumerate(constants.ping_hosts):
         if i >= len(window.ping_curves):
             break
 
+        window.ping_buffers[i].clear()
+        window.ping_bands[i].clear()
         if len(host_info["data"]) > start_idx:
-            vis_ping = host_info["data"][start_idx:]
+            vis_ping = host_info["data"][start_idx:end_idx]
 
             if len(vis_ping) > 0:
-                if downsampled and len(vis_ping) > raw_tail_start:
-                    hist_ping = vis_ping[:raw_tail_start]
+                if downsampled:
+                    # Zoomed into history the pyramid covers the whole range
+                    # and the raw tail is empty.
                     tail_ping = vis_ping[raw_tail_start:]
 
-                    # Use the original timebase for ping; `vis_time` may already be
-                    # min/max downsampled for other series.
-                    hist_ping_time = constants.time_data[start_idx:][:raw_tail_start]
-
-                    # Ping downsampling must also be stable under sliding windows.
-                    # Use absolute-time buckets (same as other plots), but aggregate
-                    # with mean per bucket for ping.
-                    bucket = max(1, downsample_step // 2)
-
-                    dt = float(np.median(np.diff(constants.time_data))) if len(constants.time_data) > 2 else 1.0
-                    t0 = constants.time_data[0] if len(constants.time_data) else 0.0
-                    dt = max(float(dt), 1e-6)
-                    bucket_period = bucket * dt
-
-                    if len(hist_ping_time) > 0:
-                        bidx = np.floor((hist_ping_time - t0) / bucket_period).astype(np.int64)
-                        # Find bucket boundaries
-                        changes = np.nonzero(np.diff(bidx))[0] + 1
-                        starts = np.concatenate([[0], changes])
-                        ends = np.concatenate([changes, [len(bidx)]])
-
-                        out_t = []
-                        out_y = []
-                        for s, e in zip(starts, ends):
-                            t_chunk = hist_ping_time[s:e]
-                            y_chunk = hist_ping[s:e]
-                            mid = len(t_chunk) // 2
-                            out_t.append(t_chunk[mid])
-
-                            finite = np.isfinite(y_chunk)
-                            if not np.any(finite):
-                                out_y.append(np.nan)
-                            else:
-                                out_y.append(float(np.nanmean(y_chunk[finite])))
-
-                        hist_ping_time_ds = np.asarray(out_t)
-                        hist_ping_ds = np.asarray(out_y)
+                    if bands:
+                        # The line is the (unsmoothed) bucket median; the
+                        # bands show the spread around it.
+                        percentiles, loss = hist_ping_stats[i, :-1], hist_ping_stats[i, -1]
+                        window.ping_bands[i].setData(hist_ping_time, percentiles, loss)
+                        hist_ping_ds = percentiles[BAND_QUANTILES.index(0.5)]
+                        tail_ping_smooth = window.ping_smoothers[i].smooth(tail_ping)
                     else:
-                        hist_ping_time_ds = np.array([], dtype=float)
-                        hist_ping_ds = np.array([], dtype=float)
+                        hist_ping_ds = window.ping_smoothers[i].smooth(hist_ping_stats[i])
+                        tail_ping_smooth = window.ping_smoothers[i].update(tail_ping)
 
-                    hist_ping_ds = smooth_data(hist_ping_ds, alpha=0.3)
-                    tail_ping_smooth = smooth_data(tail_ping, alpha=0.3)
-
-                    vis_ping_time = np.concatenate([hist_ping_time_ds, tail_time_for_downsample])
+                    vis_ping_time = np.concatenate([hist_ping_time, tail_time_for_downsample])
                     vis_ping = np.concatenate([hist_ping_ds, tail_ping_smooth])
                 else:
                     vis_ping_time = vis_time
+                    vis_ping = window.ping_smoothers[i].smooth(vis_ping)
 
                 min_len = min(len(vis_ping_time), len(vis_ping))
 
@@ -496,6 +381,8 @@ def full_redraw(window):
                     vis_ping[:min_len],
                     connect="finite",
                 )
+                if not downsampled:
+                    window.ping_buffers[i].load(vis_ping_time[:min_len], [vis_ping[:min_len]])
 
     for plot in [window.signal_plot, window.ping_plot, window.rate_plot, window.bw_plot]:
         plot.enableAutoRange(axis="y")
@@ -515,13 +402,7 @@ def full_redraw(window):
     for plot in [window.signal_plot, window.ping_plot, window.rate_plot, window.bw_plot]:
         plot.setUpdatesEnabled(True)
 
-    draw_failure_regions(window, 0, constants.signal_failed, start_idx)
-    draw_failure_regions(window, 2, constants.rates_failed, start_idx)
-    draw_failure_regions(window, 3, constants.bandwidth_failed, start_idx)
-    if constants.ping_hosts and len(constants.ping_hosts[0]["failed"]) > start_idx:
-        draw_failure_regions(window, 1, constants.ping_hosts[0]["failed"], start_idx)
-    else:
-        draw_failure_regions(window, 1, [], start_idx)
+    draw_all_failure_regions(window)
 
     window.last_drawn_index = len(constants.time_data)
 
@@ -549,95 +430,60 @@ def draw_charts(window):
         start_idx = np.searchsorted(constants.time_data, cutoff, side="left")
 
     vis_len = len(constants.time_data) - start_idx
-    points_per_pixel = 1.2
+    points_per_pixel = window.frames.points_per_pixel
     plot_px = max(1, window.signal_plot.viewport().width())
     max_points = max(200, int(plot_px * points_per_pixel))
 
-    if vis_len <= max_points and not window.is_zoomed:
+    # The display buffers are empty after a downsampled redraw; appending to
+    # them would drop the history, so redraw once more from scratch instead.
+    buffered = len(window.link_buffer) > 0 or window.last_drawn_index <= start_idx
+
+    if vis_len <= max_points and not window.is_zoomed and buffered:
         new_start = window.last_drawn_index
         new_end = len(constants.time_data)
 
         if new_end > new_start:
+            n_new = new_end - new_start
             new_time = constants.time_data[new_start:new_end]
 
-            context_start = max(0, new_start - 10)
-            new_signal = smooth_data(constants.signal_data[context_start:new_end], alpha=0.3)[
-                -(new_end - new_start) :
-            ]
-            new_rx = smooth_data(constants.rx_rate_data[context_start:new_end], alpha=0.3)[
-                -(new_end - new_start) :
-            ]
-            new_tx = smooth_data(constants.tx_rate_data[context_start:new_end], alpha=0.3)[
-                -(new_end - new_start) :
-            ]
-            new_bw = smooth_data(constants.bandwidth_data[context_start:new_end], alpha=0.3)[
-                -(new_end - new_start) :
-            ]
-
-            existing_signal = window.signal_curve.getData()
-            existing_rx = window.rx_curve.getData()
-            existing_tx = window.tx_curve.getData()
-            existing_bw = window.bw_curve.getData()
-
-            if existing_signal[0] is not None and len(existing_signal[0]) > 0:
-                all_time = np.concatenate([existing_signal[0], new_time])
-                all_signal = np.concatenate([existing_signal[1], new_signal])
-                all_rx = np.concatenate([existing_rx[1], new_rx])
-                all_tx = np.concatenate([existing_tx[1], new_tx])
-                all_bw = np.concatenate([existing_bw[1], new_bw])
-            else:
-                all_time = new_time
-                all_signal = new_signal
-                all_rx = new_rx
-                all_tx = new_tx
-                all_bw = new_bw
-
+            # Smooth the new points straight into the tail of the pre-trimmed
+            # display buffers and hand the plot contiguous views; no per-tick
+            # getData/concatenate copies and no temporary arrays.
+            link_buffer = window.link_buffer
+            block = link_buffer.append_slots(n_new)
+            block[0] = new_time
+            window.signal_smoother.update(constants.signal_data[new_start:new_end], out=block[1])
+            window.rx_smoother.update(constants.rx_rate_data[new_start:new_end], out=block[2])
+            window.tx_smoother.update(constants.tx_rate_data[new_start:new_end], out=block[3])
+            window.bw_smoother.update(constants.bandwidth_data[new_start:new_end], out=block[4])
             if constants.current_window is not None:
                 cutoff = time.time() - constants.current_window
-                trim_idx = np.searchsorted(all_time, cutoff, side="left")
-                all_time = all_time[trim_idx:]
-                all_signal = all_signal[trim_idx:]
-                all_rx = all_rx[trim_idx:]
-                all_tx = all_tx[trim_idx:]
-                all_bw = all_bw[trim_idx:]
+                link_buffer.trim_before(cutoff)
+            all_time = link_buffer.time()
 
             for plot in [window.signal_plot, window.ping_plot, window.rate_plot, window.bw_plot]:
                 plot.setUpdatesEnabled(False)
 
-            window.signal_curve.setData(all_time, all_signal)
-            window.rx_curve.setData(all_time, all_rx)
-            window.tx_curve.setData(all_time, all_tx)
-            window.bw_curve.setData(all_time, all_bw)
+            window.signal_curve.setData(all_time, link_buffer.series(0))
+            window.rx_curve.setData(all_time, link_buffer.series(1))
+            window.tx_curve.setData(all_time, link_buffer.series(2))
+            window.bw_curve.setData(all_time, link_buffer.series(3))
 
             for i, host_info in enumerate(constants.ping_hosts):
                 if i >= len(window.ping_curves):
                     break
 
                 if len(host_info["data"]) >= new_end:
-                    new_ping_smooth = smooth_data(
-                        host_info["data"][context_start:new_end],
-                        alpha=0.3,
-                    )[-(new_end - new_start) :]
-
-                    existing_ping = window.ping_curves[i].getData()
-
-                    if existing_ping[0] is not None and len(existing_ping[0]) > 0:
-                        all_ping_time = np.concatenate([existing_ping[0], new_time])
-                        all_ping_data = np.concatenate([existing_ping[1], new_ping_smooth])
-
-                        if constants.current_window is not None:
-                            cutoff = time.time() - constants.current_window
-                            trim_idx = np.searchsorted(all_ping_time, cutoff, side="left")
-                            all_ping_time = all_ping_time[trim_idx:]
-                            all_ping_data = all_ping_data[trim_idx:]
-
-                        window.ping_curves[i].setData(
-                            all_ping_time, all_ping_data, connect="finite"
-                        )
-                    else:
-                        window.ping_curves[i].setData(
-                            new_time, new_ping_smooth, connect="finite"
-                        )
+                    ping_buffer = window.ping_buffers[i]
+                    block = ping_buffer.append_slots(n_new)
+                    block[0] = new_time
+                    window.ping_smoothers[i].update(host_info["data"][new_start:new_end], out=block[1])
+                    if constants.current_window is not None:
+                        ping_buffer.trim_before(cutoff)
+
+                    window.ping_curves[i].setData(
+                        ping_buffer.time(), ping_buffer.series(0), connect="finite"
+                    )
 
             if len(all_time) > 0:
                 # Use actual window boundaries for consistent X-range
@@ -653,13 +499,7 @@ def draw_charts(window):
             for plot in [window.signal_plot, window.ping_plot, window.rate_plot, window.bw_plot]:
                 plot.setUpdatesEnabled(True)
 
-            draw_failure_regions(window, 0, constants.signal_failed, start_idx)
-            draw_failure_regions(window, 2, constants.rates_failed, start_idx)
-            draw_failure_regions(window, 3, constants.bandwidth_failed, start_idx)
-            if constants.ping_hosts and len(constants.ping_hosts[0]["failed"]) > start_idx:
-                draw_failure_regions(window, 1, constants.ping_hosts[0]["failed"], start_idx)
-            else:
-                draw_failure_regions(window, 1, [], start_idx)
+            draw_all_failure_regions(window)
 
         window.last_drawn_index = len(constants.time_data)
 
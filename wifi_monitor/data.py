@@ -3,7 +3,54 @@ from datetime import datetime
 
 import numpy as np
 
-from . import constants
+from . import constants, store
+
+
+# EMA block length is capped so c**-block stays below this bound, keeping the
+# blocked recurrence within ~1e-12 of the sequential one.
+_EMA_BLOCK_GAIN = 1e4
+# Up to this many points, EmaSmoother.update(out=...) runs a plain scalar loop.
+_EMA_SCALAR_MAX = 16
+
+
+def _ema(values, alpha, state):
+    """EMA over NaN-free `values`, continuing from `state` (None seeds with values[0]).
+
+    Evaluated in blocks: within a block the zero-state response is a scaled
+    cumsum, and only the block start states are carried sequentially.
+    Returns (smoothed, new_state).
+    """
+    n = len(values)
+    if n == 0:
+        return values.copy(), state
+    if state is None:
+        state = values[0]
+
+    c = 1.0 - alpha
+    if c <= 0.0:
+        return values.copy(), values[-1]
+    if c >= 1.0:
+        return np.full(n, float(state)), state
+
+    block = int(np.clip(np.log(_EMA_BLOCK_GAIN) / -np.log(c), 1, 256))
+    n_blocks = -(-n // block)
+    x = np.zeros(n_blocks * block)
+    x[:n] = values
+    x = x.reshape(n_blocks, block)
+
+    k = np.arange(block)
+    decay = c ** (k + 1)
+    zero_state = alpha * c**k * np.cumsum(x * c ** (-k), axis=1)
+
+    carry = np.empty(n_blocks)
+    decay_block = c**block
+    s = float(state)
+    for b in range(n_blocks):
+        carry[b] = s
+        s = decay_block * s + zero_state[b, -1]
+
+    smoothed = (zero_state + decay * carry[:, None]).ravel()[:n]
+    return smoothed, smoothed[-1]
 
 
 def smooth_data(data, alpha=0.3):
@@ -11,26 +58,68 @@ def smooth_data(data, alpha=0.3):
         return data
 
     data = np.asarray(data, dtype=float)
-    smoothed = np.empty_like(data)
 
     valid_mask = ~np.isnan(data)
     if not np.any(valid_mask):
         return data
 
-    first_valid_idx = np.argmax(valid_mask)
-    ema = data[first_valid_idx]
+    smoothed = np.full_like(data, np.nan)
+    smoothed[valid_mask], _ = _ema(data[valid_mask], alpha, None)
+    return smoothed
+
 
-    for i in range(len(data)):
-        if np.isnan(data[i]):
-            smoothed[i] = np.nan
-        else:
-            if i == first_valid_idx:
-                ema = data[i]
-            else:
-                ema = alpha * data[i] + (1 - alpha) * ema
-            smoothed[i] = ema
+class EmaSmoother:
+    """Streaming EMA for one series.
 
-    return smoothed
+    Keeps the EMA state across calls so live updates only smooth the new
+    points. NaN gaps stay NaN and do not touch the state, like `smooth_data`.
+    """
+
+    def __init__(self, alpha=0.3):
+        self.alpha = alpha
+        self.state = None
+
+    def reset(self):
+        self.state = None
+
+    def smooth(self, data):
+        """Smooth a whole window from scratch; the state ends at its last point."""
+        self.reset()
+        return self.update(data)
+
+    def update(self, data, out=None):
+        """Smooth points that follow everything seen so far.
+
+        With `out` the result is written there (e.g. straight into a display
+        buffer) and `out` is returned. Short inputs, the usual one or two new
+        samples of a live tick, are then smoothed without any temporary array.
+        """
+        data = np.asarray(data, dtype=float)
+        if out is not None and len(data) <= _EMA_SCALAR_MAX:
+            return self._update_scalar(data, out)
+        if out is None:
+            smoothed = np.full_like(data, np.nan)
+        else:
+            smoothed = out
+            smoothed[:] = np.nan
+        valid_mask = ~np.isnan(data)
+        if np.any(valid_mask):
+            smoothed[valid_mask], self.state = _ema(data[valid_mask], self.alpha, self.state)
+        return smoothed
+
+    def _update_scalar(self, data, out):
+        alpha = self.alpha
+        c = 1.0 - alpha
+        state = None if self.state is None else float(self.state)
+        for i in range(len(data)):
+            x = data.item(i)
+            if x != x:  # NaN: gap, state unchanged
+                out[i] = x
+                continue
+            state = x if state is None else c * state + alpha * x
+            out[i] = state
+        self.state = state
+        return out
 
 
 def generate_test_data(duration="1h"):
@@ -136,6 +225,23 @@ def generate_test_data(duration="1h"):
             host_info["failed"][fail_start : fail_start + fail_len] = True
             host_info["data"][fail_start : fail_start + fail_len] = np.nan
 
+    # Station counters: per-sample retry/failure/beacon-loss deltas and gauges.
+    station = {
+        "tx_retries": np.random.poisson(3, num_points).astype(float),
+        "tx_failed": np.random.poisson(0.2, num_points).astype(float),
+        "beacon_loss": (np.random.random(num_points) < 0.005).astype(float),
+        "beacon_signal": constants.signal_data + np.random.uniform(0, 3, num_points),
+        "expected_throughput": constants.rx_rate_data * 0.6,
+        "inactive_time": np.random.uniform(0, 200, num_points),
+        "connected_time": constants.time_data - start_time,
+    }
+
+    # Move the generated arrays into the metrics store so live appends continue
+    # from them; `constants.*` and host_info then hold views into the store.
+    store.load_link_metrics(**{name: getattr(constants, name) for name in store.LINK_COLUMNS}, **station)
+    for host_info in constants.ping_hosts:
+        store.load_host_metrics(host_info, host_info["data"], host_info["failed"])
+
     print(
         f"Done! Generated {len(constants.time_data):,} points from {datetime.fromtimestamp(start_time)} to {datetime.fromtimestamp(current_time)}"
     )
@@ -0,0 +1,229 @@
+"""Peak-preserving min/max downsampling kernels.
+
+All kernels are vectorized: bucket boundaries come from `np.diff` on the bucket
+index and per-bucket extrema from `reduceat`, with no Python loop per bucket.
+"""
+
+import numpy as np
+
+# `bucket_percentiles` pads buckets to a common length while that costs at most
+# this many times the samples.
+PERCENTILE_PAD_LIMIT = 4
+
+
+def _runs(idx: np.ndarray):
+    """(starts, ends) of runs of equal consecutive values in `idx`."""
+    changes = np.flatnonzero(np.diff(idx)) + 1
+    starts = np.concatenate(([0], changes))
+    ends = np.concatenate((changes, [len(idx)]))
+    return starts, ends
+
+
+def _segment_extrema(y: np.ndarray, starts: np.ndarray, ends: np.ndarray):
+    """Per-segment first argmin/argmax (absolute indices) and all-non-finite mask.
+
+    Matches `np.nanargmin`/`np.nanargmax` on each segment: NaN is skipped, +-inf
+    are regular values, and ties resolve to the first occurrence. `y` may be 2-D
+    (series x samples); segments then run along the last axis for every series.
+    """
+    n = y.shape[-1]
+    counts = ends - starts
+    empty = ~np.logical_or.reduceat(np.isfinite(y), starts, axis=-1)
+
+    # fmin/fmax skip NaN, so only all-NaN segments come out NaN (and are `empty`).
+    seg_min = np.fmin.reduceat(y, starts, axis=-1)
+    seg_max = np.fmax.reduceat(y, starts, axis=-1)
+
+    pos = np.arange(n, dtype=np.int32 if n < 2**31 else np.int64)
+    imin = np.minimum.reduceat(np.where(y == np.repeat(seg_min, counts, axis=-1), pos, n), starts, axis=-1)
+    imax = np.minimum.reduceat(np.where(y == np.repeat(seg_max, counts, axis=-1), pos, n), starts, axis=-1)
+    return imin, imax, empty
+
+
+def _emit_indices(starts, ends, imin, imax, empty):
+    """Sample indices to emit: min/max in time order, or the midpoint if empty."""
+    first = np.where(empty, starts + (ends - starts) // 2, np.minimum(imin, imax))
+    second = np.maximum(imin, imax)
+
+    out = np.empty(2 * len(starts), dtype=np.int64)
+    out[0::2] = first
+    out[1::2] = second
+    keep = np.ones(len(out), dtype=bool)
+    keep[1::2] = ~empty
+    return out[keep], np.repeat(empty, np.where(empty, 1, 2))
+
+
+def _time_buckets(time_arr, step, t0, dt):
+    dt = max(float(dt), 1e-6)
+    bucket = step * dt
+    return np.floor((time_arr - t0) / bucket).astype(np.int64)
+
+
+def downsample_minmax(time_arr: np.ndarray, y_arr: np.ndarray, step: int):
+    """Downsample by emitting min+max per bucket (peak-preserving).
+
+    NOTE: This function buckets by index (0..n). For sliding windows, bucket
+    boundaries can move as the window cutoff shifts.
+    """
+    n = len(time_arr)
+    if step <= 1 or n <= 2:
+        return time_arr, y_arr
+
+    time_arr = np.asarray(time_arr)
+    y_arr = np.asarray(y_arr)
+
+    end = (n // step) * step
+    if end == 0:
+        return time_arr.copy(), y_arr.astype(float)
+
+    starts = np.arange(0, end, step)
+    ends = starts + step
+    imin, imax, empty = _segment_extrema(y_arr[:end], starts, ends)
+    out_idx, out_empty = _emit_indices(starts, ends, imin, imax, empty)
+
+    out_y = y_arr[out_idx].astype(float)
+    out_y[out_empty] = np.nan
+    return (
+        np.concatenate((time_arr[out_idx], time_arr[end:])),
+        np.concatenate((out_y, y_arr[end:])),
+    )
+
+
+def downsample_minmax_timebucket(time_arr: np.ndarray, y_arr: np.ndarray, step: int, t0: float, dt: float):
+    """Stable min/max downsampling using absolute-time buckets.
+
+    Buckets are aligned to (t0 + k*step*dt), so a sliding cutoff does not move
+    bucket boundaries and deep history stays visually stable.
+    """
+    n = len(time_arr)
+    if step <= 1 or n <= 2:
+        return time_arr, y_arr
+
+    time_arr = np.asarray(time_arr)
+    y_arr = np.asarray(y_arr)
+
+    starts, ends = _runs(_time_buckets(time_arr, step, t0, dt))
+    imin, imax, empty = _segment_extrema(y_arr, starts, ends)
+    out_idx, out_empty = _emit_indices(starts, ends, imin, imax, empty)
+
+    out_y = y_arr[out_idx].astype(float)
+    out_y[out_empty] = np.nan
+    return time_arr[out_idx], out_y
+
+
+def downsample_multi_timebucket(time_arr: np.ndarray, y_arrays: list, step: int, t0: float, dt: float):
+    """Downsample multiple Y series using a shared time grid.
+
+    Returns (out_time, [out_y1, out_y2, ...]) where all arrays have the same length.
+    Every bucket emits two points, at the times of its first and last sample.
+    Each series gets its own min and max there, in the order they occurred in
+    that series, so peaks in secondary series (rates, bandwidth) survive too.
+    Series with no finite value in a bucket get NaN for both points.
+    """
+    n = len(time_arr)
+    if step <= 1 or n <= 2:
+        return time_arr, y_arrays
+
+    time_arr = np.asarray(time_arr)
+    ys = np.asarray(np.stack(y_arrays), dtype=float)
+
+    starts, ends = _runs(_time_buckets(time_arr, step, t0, dt))
+    imin, imax, empty = _segment_extrema(ys, starts, ends)
+
+    out_t = np.empty(2 * len(starts), dtype=time_arr.dtype)
+    out_t[0::2] = time_arr[starts]
+    out_t[1::2] = time_arr[ends - 1]
+
+    out_ys = np.empty((len(ys), 2 * len(starts)))
+    out_ys[:, 0::2] = np.take_along_axis(ys, np.minimum(imin, imax) % n, axis=1)
+    out_ys[:, 1::2] = np.take_along_axis(ys, np.maximum(imin, imax) % n, axis=1)
+    out_ys[:, 0::2][empty] = np.nan
+    out_ys[:, 1::2][empty] = np.nan
+
+    return out_t, list(out_ys)
+
+
+def bucket_means(time_arr: np.ndarray, y_matrix: np.ndarray, period: float, t0: float = 0.0):
+    """NaN-aware per-bucket means of several series on one absolute-time grid.
+
+    `y_matrix` is (series x samples). Returns (out_time, means, complete) where
+    `out_time` holds each bucket's middle sample time, `means` is
+    (series x buckets) with NaN for buckets without a finite value, and
+    `complete` is the index of the first bucket that may still receive samples
+    (always the last one).
+    """
+    n = len(time_arr)
+    if n == 0:
+        return np.array([], dtype=float), np.empty((len(y_matrix), 0)), 0
+
+    period = max(float(period), 1e-6)
+    starts, ends = _runs(np.floor((time_arr - t0) / period).astype(np.int64))
+
+    finite = np.isfinite(y_matrix)
+    sums = np.add.reduceat(np.where(finite, y_matrix, 0.0), starts, axis=-1)
+    counts = np.add.reduceat(finite, starts, axis=-1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = np.where(counts > 0, sums / counts, np.nan)
+
+    return time_arr[starts + (ends - starts) // 2], means, len(starts) - 1
+
+
+def bucket_percentiles(time_arr: np.ndarray, y_matrix: np.ndarray, period: float, qs, t0: float = 0.0):
+    """Per-bucket percentiles and loss of several series on one absolute-time grid.
+
+    `qs` are fractions (0.5 = median), interpolated linearly like
+    `np.nanpercentile`. Returns (out_time, percentiles, loss, complete):
+    `percentiles` is (series x len(qs) x buckets), NaN where a bucket has no
+    finite value; `loss` is the fraction of non-finite samples per bucket;
+    `out_time` and `complete` are as in `bucket_means`.
+    """
+    n = len(time_arr)
+    n_series = len(y_matrix)
+    if n == 0:
+        return np.array([], dtype=float), np.empty((n_series, len(qs), 0)), np.empty((n_series, 0)), 0
+
+    period = max(float(period), 1e-6)
+    starts, ends = _runs(np.floor((time_arr - t0) / period).astype(np.int64))
+    lengths = ends - starts
+
+    finite = np.isfinite(y_matrix)
+    counts = np.add.reduceat(finite, starts, axis=-1)
+    out = np.full((n_series, len(qs), len(starts)), np.nan)
+
+    # Buckets are sorted as the rows of a (buckets x longest bucket) matrix
+    # padded with +inf: a row-wise sort of short rows is far cheaper than one
+    # lexsort by (bucket, value) over everything. When bucket sizes vary too
+    # much for the padding to pay off, fall back to the lexsort.
+    width = int(lengths.max())
+    padded = len(starts) * width <= PERCENTILE_PAD_LIMIT * n
+    if padded:
+        cols = np.arange(width)
+        take = np.minimum(starts[:, None] + cols, n - 1)
+        pad = cols >= lengths[:, None]
+        base = np.arange(len(starts)) * width
+    else:
+        segment = np.repeat(np.arange(len(starts)), lengths)
+        base = starts
+
+    for row, y in enumerate(y_matrix):
+        # Per bucket: finite values in order, non-finite last.
+        if padded:
+            sorted_y = y[take]
+            sorted_y[pad | ~finite[row][take]] = np.inf
+            sorted_y.sort(axis=1)
+            sorted_y = sorted_y.ravel()
+        else:
+            sorted_y = y[np.lexsort((np.where(finite[row], y, np.inf), segment))]
+        count = counts[row]
+        has = count > 0
+        last = base + np.maximum(count, 1) - 1
+        for k, q in enumerate(qs):
+            pos = base + (count - 1).clip(min=0) * q
+            lo = np.floor(pos).astype(np.int64)
+            hi = np.minimum(lo + 1, last)
+            with np.errstate(invalid="ignore"):  # empty buckets (inf - inf), dropped below
+                value = sorted_y[lo] + (sorted_y[hi] - sorted_y[lo]) * (pos - lo)
+            out[row, k, has] = value[has]
+
+    loss = 1.0 - counts / (ends - starts)
+    return time_arr[starts + (ends - starts) // 2], out, loss, len(starts) - 1
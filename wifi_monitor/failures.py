@@ -0,0 +1,81 @@
+"""Run-length index of failure intervals.
+
+Every `*_failed` mask is mirrored by a `FailureRuns`: one entry per run of
+consecutive failed samples, extended in O(1) per sample. Overlay drawing then
+binary-searches the runs that intersect the view instead of rescanning masks.
+"""
+
+import numpy as np
+
+from .buffers import GrowableArray
+
+
+class FailureRuns:
+    """Failure runs as (start_ts, end_ts, length) columns, ordered by time.
+
+    A run spans from the last good sample before it to the first good sample
+    after it (or the last failed sample while it is still open), which is the
+    region shaded on the plots. `length` counts the failed samples.
+    """
+
+    def __init__(self):
+        self.start_ts = GrowableArray(float)
+        self.end_ts = GrowableArray(float)
+        self.length = GrowableArray(np.int64)
+        self._open = False
+        self._prev_ts = None
+
+    def __len__(self):
+        return len(self.length)
+
+    def clear(self):
+        self.start_ts.clear()
+        self.end_ts.clear()
+        self.length.clear()
+        self._open = False
+        self._prev_ts = None
+
+    def append(self, timestamp, failed):
+        if failed:
+            if self._open:
+                self.end_ts.view()[-1] = timestamp
+                self.length.view()[-1] += 1
+            else:
+                self.start_ts.append(self._prev_ts if self._prev_ts is not None else timestamp)
+                self.end_ts.append(timestamp)
+                self.length.append(1)
+                self._open = True
+        elif self._open:
+            self.end_ts.view()[-1] = timestamp
+            self._open = False
+        self._prev_ts = timestamp
+
+    def load(self, time_arr, failed):
+        """Rebuild the index from a full mask (e.g. synthetic test data)."""
+        self.clear()
+        n = len(time_arr)
+        if n == 0:
+            return
+
+        padded = np.concatenate(([False], np.asarray(failed, dtype=bool), [False]))
+        edges = np.diff(padded.astype(np.int8))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+
+        self.start_ts.extend(time_arr[np.maximum(starts - 1, 0)])
+        self.end_ts.extend(time_arr[np.minimum(ends, n - 1)])
+        self.length.extend(ends - starts)
+        self._open = bool(failed[-1])
+        self._prev_ts = float(time_arr[-1])
+
+    def visible(self, x_min, x_max, min_length=1):
+        """(start_ts, end_ts) of runs of at least `min_length` samples in the view, clipped to it."""
+        start_ts = self.start_ts.view()
+        end_ts = self.end_ts.view()
+        a = int(np.searchsorted(end_ts, x_min, side="right"))
+        b = int(np.searchsorted(start_ts, x_max, side="left"))
+        keep = self.length.view()[a:b] >= min_length
+        return (
+            np.maximum(start_ts[a:b][keep], x_min),
+            np.minimum(end_ts[a:b][keep], x_max),
+        )
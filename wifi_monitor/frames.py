@@ -0,0 +1,133 @@
+"""Adaptive frame scheduling for the live plots.
+
+Every repaint tick is one frame: collect the queued samples, downsample, hand
+the curves their data, draw the overlays. `FrameScheduler` times those phases
+against a per-frame budget and reacts when frames get too expensive:
+
+- a frame over budget makes the next ticks skip drawing, so their samples are
+  merged into one later frame instead of queuing up behind a slow redraw
+  (skipped ticks are counted as dropped frames);
+- sustained cost over budget lowers the quality level (fewer points per pixel,
+  then no antialiasing); a cost well under budget for a while raises it again.
+
+It holds no Qt state, so the policy can be tested with a fake clock.
+"""
+
+import math
+import time
+from contextlib import contextmanager
+
+from . import constants
+
+# Quality levels, best first: (points per pixel, antialiasing allowed).
+QUALITY_LEVELS = [
+    (1.2, True),
+    (0.8, True),
+    (0.5, False),
+]
+
+FRAME_BUDGET_MS = 50.0  # upper bound on the per-frame budget
+FRAME_BUDGET_FRACTION = 0.25  # of the repaint interval
+COST_SMOOTHING = 0.3  # EWMA weight of the newest frame cost
+RECOVER_FRACTION = 0.3  # smoothed cost below this share of the budget...
+RECOVER_FRAMES = 10  # ...for this many frames raises the quality again
+MAX_SKIP = 4  # ticks skipped after one slow frame, at most
+
+
+def _default_budget():
+    return min(FRAME_BUDGET_MS, FRAME_BUDGET_FRACTION * constants.REFRESH_INTERVAL) / 1000.0
+
+
+class FrameScheduler:
+    """Measures frame cost per phase and decides what the next frames draw.
+
+    `budget` returns the per-frame budget in seconds. Phases may nest; each
+    phase is charged only its own time, not that of phases inside it.
+    """
+
+    def __init__(self, budget=_default_budget, clock=time.perf_counter):
+        self._budget = budget
+        self._clock = clock
+        self.level = 0
+        self.cost = None  # smoothed frame cost, seconds
+        self.last_phases = {}
+        self.frames = 0
+        self.dropped = 0
+        self._phases = {}
+        self._stack = []
+        self._skip = 0
+        self._calm = 0
+
+    @property
+    def budget(self):
+        return self._budget()
+
+    @property
+    def points_per_pixel(self):
+        return QUALITY_LEVELS[self.level][0]
+
+    def antialias(self, default):
+        """Whether curves are antialiased at the current level."""
+        return default and QUALITY_LEVELS[self.level][1]
+
+    @contextmanager
+    def phase(self, name):
+        self._stack.append(0.0)
+        start = self._clock()
+        try:
+            yield
+        finally:
+            elapsed = self._clock() - start
+            children = self._stack.pop()
+            self._phases[name] = self._phases.get(name, 0.0) + elapsed - children
+            if self._stack:
+                self._stack[-1] += elapsed
+
+    def begin_frame(self):
+        self._phases = {}
+
+    def should_render(self):
+        """False while catching up after a slow frame; the tick's samples wait for the next frame."""
+        if self._skip > 0:
+            self._skip -= 1
+            self.dropped += 1
+            return False
+        return True
+
+    def end_frame(self):
+        """Account the frame's phases. Returns True if the quality level changed."""
+        cost = sum(self._phases.values())
+        self.last_phases = self._phases
+        self._phases = {}
+        self.frames += 1
+        self.cost = cost if self.cost is None else self.cost + COST_SMOOTHING * (cost - self.cost)
+
+        budget = self.budget
+        if cost > budget:
+            self._skip = min(MAX_SKIP, math.ceil(cost / budget) - 1)
+
+        level = self.level
+        # Degrade on sustained load only: the smoothed cost still carries a
+        # past spike for a few frames after the frames got cheap again.
+        if cost > budget and self.cost > budget:
+            self.level = min(self.level + 1, len(QUALITY_LEVELS) - 1)
+            self._calm = 0
+        elif self.cost < RECOVER_FRACTION * budget:
+            self._calm += 1
+            if self._calm >= RECOVER_FRAMES:
+                self.level = max(self.level - 1, 0)
+                self._calm = 0
+        else:
+            self._calm = 0
+        return self.level != level
+
+    def report(self):
+        """One-line status: smoothed frame cost, reduced quality, dropped frames."""
+        if self.cost is None:
+            return ""
+        parts = [f"{self.cost * 1000:.0f} ms/frame"]
+        if self.level:
+            parts.append("reduced quality")
+        if self.dropped:
+            parts.append(f"{self.dropped} dropped")
+        return " · ".join(parts)
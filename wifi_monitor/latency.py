@@ -0,0 +1,173 @@
+"""Streaming per-host latency statistics.
+
+Every probe updates a `LatencyStats` in O(1). For each rolling window (10m,
+60m, 1D) it keeps a ring of time slots, each with a log-bucketed RTT histogram,
+sent/lost/longest-burst counters and the sum of the RFC 3550 jitter estimates
+taken in it, plus running totals over the ring.
+Histograms are mergeable by addition, so a slot leaving the window is simply
+subtracted. Queries never touch raw samples: percentiles walk a fixed number
+of histogram buckets, loss, jitter and burst read the totals and the slot ring.
+
+RTT buckets are log-spaced with ~2% relative width, so percentiles are exact to
+within that.
+"""
+
+import math
+from collections import namedtuple
+
+import numpy as np
+
+RTT_MIN_MS = 0.05
+RTT_MAX_MS = 10000.0
+RTT_BUCKET_GROWTH = 1.04
+
+_LOG_GROWTH = math.log(RTT_BUCKET_GROWTH)
+N_BUCKETS = int(math.ceil(math.log(RTT_MAX_MS / RTT_MIN_MS) / _LOG_GROWTH)) + 1
+# Geometric middle of every bucket, reported for a percentile falling in it.
+_BUCKET_VALUES = RTT_MIN_MS * RTT_BUCKET_GROWTH ** (np.arange(N_BUCKETS) + 0.5)
+
+# Window label -> (span seconds, slot seconds).
+LATENCY_WINDOWS = {
+    "10m": (600, 10),
+    "60m": (3600, 60),
+    "1D": (86400, 900),
+}
+
+LatencySummary = namedtuple(
+    "LatencySummary", ["sent", "lost", "loss", "p50", "p95", "p99", "jitter", "max_burst"]
+)
+
+
+def rtt_bucket(rtt_ms):
+    if rtt_ms <= RTT_MIN_MS:
+        return 0
+    return min(N_BUCKETS - 1, int(math.log(rtt_ms / RTT_MIN_MS) / _LOG_GROWTH))
+
+
+class _RollingWindow:
+    def __init__(self, span, slot):
+        self.slot = float(slot)
+        self.n_slots = int(math.ceil(span / slot))
+        self.keys = np.full(self.n_slots, -1, dtype=np.int64)
+        self.hist = np.zeros((self.n_slots, N_BUCKETS), dtype=np.int32)
+        self.sent = np.zeros(self.n_slots, dtype=np.int64)
+        self.lost = np.zeros(self.n_slots, dtype=np.int64)
+        self.burst = np.zeros(self.n_slots, dtype=np.int64)
+        self.jitter_sum = np.zeros(self.n_slots, dtype=np.float64)
+        self.jitters = np.zeros(self.n_slots, dtype=np.int64)
+        self.hist_total = np.zeros(N_BUCKETS, dtype=np.int64)
+        self.sent_total = 0
+        self.lost_total = 0
+        self.jitter_sum_total = 0.0
+        self.jitters_total = 0
+        self.head = -1  # newest slot key
+
+    def advance(self, timestamp):
+        """Move the window forward to `timestamp`, expiring slots that left it."""
+        key = int(timestamp // self.slot)
+        if key <= self.head:
+            return
+        # At most one pass over the ring, even after a long gap.
+        start = max(self.head + 1, key - self.n_slots + 1)
+        for k in range(start, key + 1):
+            row = k % self.n_slots
+            if self.keys[row] >= 0:
+                self.hist_total -= self.hist[row]
+                self.sent_total -= self.sent[row]
+                self.lost_total -= self.lost[row]
+                self.jitter_sum_total -= self.jitter_sum[row]
+                self.jitters_total -= self.jitters[row]
+                self.hist[row] = 0
+                self.sent[row] = self.lost[row] = self.burst[row] = self.jitters[row] = 0
+                self.jitter_sum[row] = 0.0
+            self.keys[row] = k
+        self.head = key
+
+    def add(self, timestamp, bucket, burst, jitter):
+        """One probe; `bucket` is None for a loss, `burst` the loss run it is part of,
+        `jitter` the jitter estimate after it (None if there is none yet)."""
+        self.advance(timestamp)
+        row = int(timestamp // self.slot) % self.n_slots
+        if self.keys[row] != int(timestamp // self.slot):
+            # Older than the window (clock step back); ignore.
+            return
+        self.sent[row] += 1
+        self.sent_total += 1
+        if bucket is None:
+            self.lost[row] += 1
+            self.lost_total += 1
+            if burst > self.burst[row]:
+                self.burst[row] = burst
+        else:
+            self.hist[row, bucket] += 1
+            self.hist_total[bucket] += 1
+            if jitter is not None:
+                self.jitter_sum[row] += jitter
+                self.jitter_sum_total += jitter
+                self.jitters[row] += 1
+                self.jitters_total += 1
+
+    def quantiles(self, qs):
+        total = int(self.hist_total.sum())
+        if total == 0:
+            return [None] * len(qs)
+        cumulative = np.cumsum(self.hist_total)
+        idx = np.searchsorted(cumulative, [q * total for q in qs], side="left")
+        return [float(_BUCKET_VALUES[min(i, N_BUCKETS - 1)]) for i in idx]
+
+
+class LatencyStats:
+    """Rolling latency statistics of one ping host, fed one probe at a time.
+
+    Jitter follows RFC 3550: over consecutive replies, J += (|D| - J) / 16 with
+    D the RTT change, in ms. A window reports the mean of the estimates taken
+    in it, so it covers the same span as the other statistics.
+    """
+
+    def __init__(self, windows=LATENCY_WINDOWS):
+        self.windows = {label: _RollingWindow(span, slot) for label, (span, slot) in windows.items()}
+        self._jitter = 0.0
+        self._last_rtt = None
+        self._burst = 0
+
+    def add(self, timestamp, rtt_ms):
+        jitter = None
+        if rtt_ms is None:
+            self._burst += 1
+            bucket = None
+        else:
+            self._burst = 0
+            bucket = rtt_bucket(rtt_ms)
+            if self._last_rtt is not None:
+                self._jitter += (abs(rtt_ms - self._last_rtt) - self._jitter) / 16.0
+                jitter = self._jitter
+            self._last_rtt = rtt_ms
+        for window in self.windows.values():
+            window.add(timestamp, bucket, self._burst, jitter)
+
+    def summary(self, label, now):
+        """`LatencySummary` for window `label` as of `now` (RTTs in ms, loss 0..1)."""
+        window = self.windows[label]
+        window.advance(now)
+        p50, p95, p99 = window.quantiles((0.5, 0.95, 0.99))
+        sent = int(window.sent_total)
+        lost = int(window.lost_total)
+        jitters = int(window.jitters_total)
+        return LatencySummary(
+            sent=sent,
+            lost=lost,
+            loss=lost / sent if sent else None,
+            p50=p50,
+            p95=p95,
+            p99=p99,
+            jitter=max(window.jitter_sum_total, 0.0) / jitters if jitters else None,
+            max_burst=int(window.burst.max()),
+        )
+
+
+def window_label(seconds):
+    """Smallest statistics window covering a plot window of `seconds` (None = ∞)."""
+    for label, (span, _) in LATENCY_WINDOWS.items():
+        if seconds is not None and seconds <= span:
+            return label
+    return list(LATENCY_WINDOWS)[-1]
@@ -3,7 +3,7 @@ import sys
 
 from PyQt5.QtWidgets import QApplication
 
-from . import constants
+from . import constants, net, storage
 from .data import generate_test_data
 from .gpu import configure_pyqtgraph
 from .net import get_default_gateway, get_wireless_interfaces
@@ -24,11 +24,25 @@ def main(argv=None):
         action="store_true",
         help="Disable OpenGL/GPU acceleration (force CPU rendering).",
     )
+    parser.add_argument(
+        "--link-backend",
+        choices=["auto", "nl80211", "iw"],
+        default="auto",
+        help="How link metrics are read: nl80211 netlink or the `iw` tool (default: auto).",
+    )
+    parser.add_argument(
+        "--scan-archive",
+        action="store_true",
+        help="Also keep channel scans in a SQLite archive (imports existing scan history).",
+    )
     args, qt_args = parser.parse_known_args(argv if argv is not None else sys.argv[1:])
 
     # Create QApplication first so we can detect system theme
     app = QApplication([sys.argv[0], *qt_args])
 
+    net.link_backend = args.link_backend
+    if args.scan_archive:
+        storage.open_archive()
     antialias_default = configure_pyqtgraph(force_no_gpu=args.no_gpu)
 
     interfaces = get_wireless_interfaces()
@@ -57,7 +71,9 @@ def main(argv=None):
     def cleanup():
         from . import ping
 
-        ping.ping_threads_running = False
+        ping.stop_all_pings()
+        window.sampler.stop(timeout=1.0)
+        storage.close_archive()
 
     app.aboutToQuit.connect(cleanup)
     sys.exit(app.exec_())
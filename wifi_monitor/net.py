@@ -1,12 +1,55 @@
-import subprocess
 import re
+import socket
+import struct
+import subprocess
+import threading
+import time
+from collections import namedtuple
 
 from . import constants
+from .nl80211 import Nl80211
+
+
+ROUTE_TABLE = "/proc/net/route"
+RTF_UP = 0x1
+RTF_GATEWAY = 0x2
+
+
+def parse_route_table(text):
+    """Gateway of the lowest-metric IPv4 default route in /proc/net/route text, or None."""
+    best = None
+    for line in text.splitlines()[1:]:
+        fields = line.split()
+        if len(fields) < 8:
+            continue
+        try:
+            destination, gateway, flags, metric = (
+                int(fields[1], 16),
+                int(fields[2], 16),
+                int(fields[3], 16),
+                int(fields[6]),
+            )
+        except ValueError:
+            continue
+        if destination != 0 or flags & (RTF_UP | RTF_GATEWAY) != RTF_UP | RTF_GATEWAY:
+            continue
+        if best is None or metric < best[0]:
+            # Addresses are in host (little-endian) byte order.
+            best = (metric, socket.inet_ntoa(struct.pack("<I", gateway)))
+    return best[1] if best else None
 
 
 def get_default_gateway():
+    """Default IPv4 gateway, read from the kernel route table without forking."""
+    try:
+        with open(ROUTE_TABLE) as f:
+            return parse_route_table(f.read())
+    except OSError:
+        pass
     try:
-        result = subprocess.check_output(["ip", "route"], text=True)
+        result = subprocess.check_output(
+            ["ip", "route"], text=True, timeout=constants.COMMAND_TIMEOUT
+        )
         for line in result.split("\n"):
             if line.startswith("default"):
                 parts = line.split()
@@ -20,7 +63,9 @@ def get_default_gateway():
 def get_wireless_interfaces():
     interfaces = []
     try:
-        result = subprocess.check_output(["iw", "dev"], text=True)
+        result = subprocess.check_output(
+            ["iw", "dev"], text=True, timeout=constants.COMMAND_TIMEOUT
+        )
         for line in result.split("\n"):
             if "Interface" in line:
                 interfaces.append(line.split()[-1])
@@ -29,38 +74,265 @@ def get_wireless_interfaces():
     return interfaces
 
 
-def get_link_info():
+# Per-station counters and gauges of the associated AP. tx_retries, tx_failed
+# and beacon_loss are cumulative since association; beacon_signal is in dBm,
+# expected_throughput in Mbit/s, inactive_time in ms, connected_time in s.
+STATION_FIELDS = (
+    "tx_retries",
+    "tx_failed",
+    "beacon_loss",
+    "beacon_signal",
+    "expected_throughput",
+    "inactive_time",
+    "connected_time",
+)
+
+# Snapshot of the link. Fields are None when not connected or not reported;
+# `timestamp` is time.monotonic() when it was read.
+LinkState = namedtuple(
+    "LinkState",
+    ["timestamp", "signal", "rx_rate", "tx_rate", "width", "frequency", "band", "bssid", "ssid", *STATION_FIELDS],
+    defaults=(None,) * len(STATION_FIELDS),
+)
+
+_link_lock = threading.Lock()
+_link_state = None
+_link_interface = None
+
+# "nl80211": ask the kernel directly over generic netlink (see nl80211.py).
+# "iw": fork `iw dev <iface> station dump` and parse its output.
+# "auto" (or "nl80211" where netlink is unavailable) falls back to "iw".
+link_backend = "auto"
+_nl80211 = None
+_backend_lock = threading.Lock()
+
+# A failed nl80211 read is answered by iw instead; after this many failures in
+# a row the backend switches to iw for good.
+NL80211_MAX_FAILURES = 5
+_nl80211_failures = 0
+_nl80211_warned = False
+
+# (bssid, frequency, ssid, time.monotonic() of the `iw link` read) of the
+# current association, for the iw backend: `station dump` has no frequency or
+# SSID, so `iw link` is only run when the BSSID changes, and at least every
+# IW_LINK_MAX_AGE seconds to catch channel switches (CSA) of the same AP.
+IW_LINK_MAX_AGE = 10.0
+_iw_association = (None, None, None, None)
+
+
+def band_for_frequency(freq):
+    """'2.4' or '5' for a frequency in MHz, None for None."""
+    if freq is None:
+        return None
+    if freq < 3000:  # 2.4GHz is 2412-2484 MHz
+        return "2.4"
+    else:  # 5GHz is 5180-5825 MHz
+        return "5"
+
+
+def parse_link(text, timestamp=None):
+    """Parse `iw dev <iface> link` output into a `LinkState`."""
+    bssid_match = re.search(r"Connected to ([0-9a-fA-F:]{17})", text)
+    ssid_match = re.search(r"^\s*SSID: (.*)$", text, re.MULTILINE)
+    freq_match = re.search(r"freq: ([\d.]+)", text)
+    signal_match = re.search(r"signal: (-\d+)", text)
+    rx_match = re.search(r"rx bitrate: ([\d.]+) MBit/s.*?(\d+)MHz", text)
+    tx_match = re.search(r"tx bitrate: ([\d.]+) MBit/s.*?(\d+)MHz", text)
+
+    freq = float(freq_match.group(1)) if freq_match else None
+    rx_bw = int(rx_match.group(2)) if rx_match else None
+    tx_bw = int(tx_match.group(2)) if tx_match else None
+    return LinkState(
+        timestamp=time.monotonic() if timestamp is None else timestamp,
+        signal=int(signal_match.group(1)) if signal_match else None,
+        rx_rate=float(rx_match.group(1)) if rx_match else None,
+        tx_rate=float(tx_match.group(1)) if tx_match else None,
+        width=rx_bw or tx_bw,
+        frequency=freq,
+        band=band_for_frequency(freq),
+        bssid=bssid_match.group(1).lower() if bssid_match else None,
+        ssid=ssid_match.group(1).strip() or None if ssid_match else None,
+    )
+
+
+def _resolve_link_backend():
+    global link_backend, _nl80211
+    with _backend_lock:
+        if link_backend in ("auto", "nl80211") and _nl80211 is None:
+            try:
+                _nl80211 = Nl80211()
+                link_backend = "nl80211"
+            except OSError:
+                link_backend = "iw"
+        return link_backend
+
+
+def _read_nl80211_link():
+    global link_backend, _nl80211_failures, _nl80211_warned
     try:
-        result = subprocess.check_output(
-            ["iw", "dev", constants.INTERFACE, "link"], text=True
-        )
-        signal_match = re.search(r"signal: (-\d+)", result)
-        rx_match = re.search(r"rx bitrate: ([\d.]+) MBit/s.*?(\d+)MHz", result)
-        tx_match = re.search(r"tx bitrate: ([\d.]+) MBit/s.*?(\d+)MHz", result)
+        fields = _nl80211.link(socket.if_nametoindex(constants.INTERFACE))
+    except Exception as e:
+        _nl80211_failures += 1
+        if not _nl80211_warned:
+            _nl80211_warned = True
+            print(f"⚠  nl80211 link read failed ({e}), reading through iw")
+        if _nl80211_failures >= NL80211_MAX_FAILURES:
+            print(f"⚠  nl80211 failed {_nl80211_failures} reads in a row, switching to iw")
+            with _backend_lock:
+                link_backend = "iw"
+        return _read_iw_link()
+    _nl80211_failures = 0
+    return LinkState(timestamp=time.monotonic(), band=band_for_frequency(fields["frequency"]), **fields)
 
-        signal = int(signal_match.group(1)) if signal_match else None
-        rx_rate = float(rx_match.group(1)) if rx_match else None
-        rx_bw = int(rx_match.group(2)) if rx_match else None
-        tx_rate = float(tx_match.group(1)) if tx_match else None
-        tx_bw = int(tx_match.group(2)) if tx_match else None
 
-        return signal, rx_rate, tx_rate, rx_bw or tx_bw
-    except Exception:
-        return None, None, None, None
+def _parse_bitrate(value):
+    rate = re.match(r"([\d.]+) MBit/s", value)
+    width = re.search(r"(\d+)MHz", value)
+    return (float(rate.group(1)) if rate else None), (int(width.group(1)) if width else None)
 
 
-def get_current_frequency():
-    """Get current connection frequency in MHz. Returns None if not connected."""
+def _first_int(value):
+    match = re.match(r"-?\d+", value)
+    return int(match.group(0)) if match else None
+
+
+# Integer `station dump` lines, line key -> LinkState field.
+_STATION_INT_KEYS = {
+    "signal": "signal",
+    "tx retries": "tx_retries",
+    "tx failed": "tx_failed",
+    "beacon loss": "beacon_loss",
+    "beacon signal avg": "beacon_signal",
+    "inactive time": "inactive_time",
+    "connected time": "connected_time",
+}
+
+
+def parse_station_dump(text, timestamp=None, bssid=None):
+    """Parse one station of `iw dev <iface> station dump` in one pass.
+
+    The station is the one with MAC `bssid` (the first one if None); a
+    `LinkState` of Nones if there is none. Frequency, band and SSID are not
+    part of the dump and are left None.
+    """
+    fields = dict.fromkeys(LinkState._fields)
+    wanted = bssid.lower() if bssid else None
+    in_station = False
+    for line in text.splitlines():
+        if line.startswith("Station "):
+            if fields["bssid"] is not None:
+                break
+            match = re.match(r"Station ([0-9a-fA-F:]{17})", line)
+            mac = match.group(1).lower() if match else None
+            in_station = mac is not None and wanted in (None, mac)
+            if in_station:
+                fields["bssid"] = mac
+            continue
+        if not in_station:
+            continue
+        key, sep, value = line.strip().partition(":")
+        if not sep:
+            continue
+        value = value.strip()
+        if key == "rx bitrate":
+            fields["rx_rate"], rx_bw = _parse_bitrate(value)
+            fields["width"] = rx_bw or fields["width"]
+        elif key == "tx bitrate":
+            fields["tx_rate"], tx_bw = _parse_bitrate(value)
+            fields["width"] = fields["width"] or tx_bw
+        elif key == "expected throughput":
+            match = re.match(r"([\d.]+)Mbps", value)
+            fields["expected_throughput"] = float(match.group(1)) if match else None
+        elif key in _STATION_INT_KEYS:
+            fields[_STATION_INT_KEYS[key]] = _first_int(value)
+
+    fields["timestamp"] = time.monotonic() if timestamp is None else timestamp
+    return LinkState(**fields)
+
+
+def _run_iw(*args):
     try:
-        result = subprocess.check_output(
-            ["iw", "dev", constants.INTERFACE, "link"], text=True
+        return subprocess.check_output(
+            ["iw", "dev", constants.INTERFACE, *args],
+            text=True,
+            timeout=constants.COMMAND_TIMEOUT,
         )
-        freq_match = re.search(r"freq: ([\d.]+)", result)
-        if freq_match:
-            return float(freq_match.group(1))
     except Exception:
-        pass
-    return None
+        return ""
+
+
+def _read_iw_link():
+    """One `iw station dump` per read; `iw link` after (re)association or roaming
+    and every IW_LINK_MAX_AGE seconds."""
+    global _iw_association
+    dump = _run_iw("station", "dump")
+    if not dump.strip():
+        return parse_station_dump(dump)  # not connected
+    bssid, frequency, ssid, checked = _iw_association
+    now = time.monotonic()
+    if bssid is not None and now - checked < IW_LINK_MAX_AGE:
+        state = parse_station_dump(dump, bssid=bssid)
+        if state.bssid is not None:
+            return state._replace(frequency=frequency, band=band_for_frequency(frequency), ssid=ssid)
+
+    link = parse_link(_run_iw("link"))
+    if link.bssid is None:
+        return link
+    _iw_association = (link.bssid, link.frequency, link.ssid, now)
+    state = parse_station_dump(dump, bssid=link.bssid)
+    if state.bssid is None:
+        # Roamed between the two reads; `iw link` has the basics.
+        return link
+    return state._replace(frequency=link.frequency, band=link.band, ssid=link.ssid)
+
+
+def read_link_state():
+    """Read the link once through the link backend; a `LinkState` of Nones if that fails."""
+    if _resolve_link_backend() == "nl80211":
+        return _read_nl80211_link()
+    return _read_iw_link()
+
+
+def refresh_link_state():
+    """Read the link now and make it the shared snapshot."""
+    global _link_state, _link_interface
+    interface = constants.INTERFACE
+    state = read_link_state()
+    with _link_lock:
+        _link_state = state
+        _link_interface = interface
+    return state
+
+
+def get_link_state(max_age=None):
+    """Shared link snapshot, re-read only if older than `max_age` seconds.
+
+    The sampler refreshes it every sample, so other callers are normally served
+    from the cache. `max_age` defaults to `constants.LINK_STATE_MAX_AGE`.
+    """
+    if max_age is None:
+        max_age = constants.LINK_STATE_MAX_AGE
+    with _link_lock:
+        state = _link_state
+        fresh = (
+            state is not None
+            and _link_interface == constants.INTERFACE
+            and time.monotonic() - state.timestamp <= max_age
+        )
+    if fresh:
+        return state
+    return refresh_link_state()
+
+
+def get_link_info():
+    """(signal, rx rate, tx rate, width) from a fresh read."""
+    state = refresh_link_state()
+    return state.signal, state.rx_rate, state.tx_rate, state.width
+
+
+def get_current_frequency():
+    """Get current connection frequency in MHz. Returns None if not connected."""
+    return get_link_state().frequency
 
 
 def get_current_band():
@@ -68,10 +340,4 @@ def get_current_band():
     Detect if connected to 2.4GHz or 5GHz.
     Returns '2.4' or '5' or None if not connected.
     """
-    freq = get_current_frequency()
-    if freq is None:
-        return None
-    if freq < 3000:  # 2.4GHz is 2412-2484 MHz
-        return "2.4"
-    else:  # 5GHz is 5180-5825 MHz
-        return "5"
+    return get_link_state().band
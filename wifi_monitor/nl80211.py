@@ -0,0 +1,272 @@
+"""Minimal nl80211 client over generic netlink (`AF_NETLINK`, no dependencies).
+
+Reads the link fields `iw dev <iface> link` prints without forking `iw`:
+`NL80211_CMD_GET_INTERFACE` gives the frequency and SSID, and a
+`NL80211_CMD_GET_STATION` dump on a managed interface returns the associated AP
+(its MAC is the BSSID) with signal, rx/tx bitrates and the station counters.
+If TDLS or mesh peers are dumped too, the AP is the station whose MAC is the
+BSSID the scan results (`NL80211_CMD_GET_SCAN`) mark as associated.
+
+The socket is injectable, so decoding can be tested by replaying recorded
+kernel replies without a radio.
+"""
+
+import errno
+import os
+import socket
+import struct
+import threading
+
+from . import constants
+
+NETLINK_GENERIC = 16
+
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+NLM_F_REQUEST = 0x1
+NLM_F_MULTI = 0x2
+NLM_F_DUMP = 0x300
+NLA_TYPE_MASK = 0x3FFF  # strips NLA_F_NESTED / NLA_F_NET_BYTEORDER
+
+_NLMSGHDR = struct.Struct("=IHHII")  # length, type, flags, seq, port id
+_GENLMSGHDR = struct.Struct("=BBH")  # cmd, version, reserved
+_NLATTR = struct.Struct("=HH")  # length, type
+GENL_VERSION = 1
+
+GENL_ID_CTRL = 0x10
+CTRL_CMD_GETFAMILY = 3
+CTRL_ATTR_FAMILY_ID = 1
+CTRL_ATTR_FAMILY_NAME = 2
+
+NL80211_CMD_GET_INTERFACE = 5
+NL80211_CMD_GET_STATION = 17
+NL80211_CMD_GET_SCAN = 32
+
+NL80211_ATTR_IFINDEX = 3
+NL80211_ATTR_MAC = 6
+NL80211_ATTR_STA_INFO = 21
+NL80211_ATTR_WIPHY_FREQ = 38
+NL80211_ATTR_BSS = 47
+NL80211_ATTR_SSID = 52
+
+NL80211_BSS_BSSID = 1
+NL80211_BSS_STATUS = 9  # u32
+NL80211_BSS_STATUS_ASSOCIATED = 1
+NL80211_BSS_STATUS_IBSS_JOINED = 2
+
+NL80211_STA_INFO_INACTIVE_TIME = 1  # u32, ms
+NL80211_STA_INFO_SIGNAL = 7
+NL80211_STA_INFO_TX_BITRATE = 8
+NL80211_STA_INFO_TX_RETRIES = 11  # u32
+NL80211_STA_INFO_TX_FAILED = 12  # u32
+NL80211_STA_INFO_RX_BITRATE = 14
+NL80211_STA_INFO_CONNECTED_TIME = 16  # u32, s
+NL80211_STA_INFO_BEACON_LOSS = 18  # u32
+NL80211_STA_INFO_EXPECTED_THROUGHPUT = 27  # u32, kbit/s
+NL80211_STA_INFO_BEACON_SIGNAL_AVG = 30  # s8, dBm
+
+# Plain u32 station info attributes -> link field.
+STA_INFO_U32_FIELDS = {
+    NL80211_STA_INFO_TX_RETRIES: "tx_retries",
+    NL80211_STA_INFO_TX_FAILED: "tx_failed",
+    NL80211_STA_INFO_BEACON_LOSS: "beacon_loss",
+    NL80211_STA_INFO_INACTIVE_TIME: "inactive_time",
+    NL80211_STA_INFO_CONNECTED_TIME: "connected_time",
+}
+
+NL80211_RATE_INFO_BITRATE = 1  # u16, 100 kbit/s
+NL80211_RATE_INFO_BITRATE32 = 5  # u32, 100 kbit/s
+
+# Rate info width flags -> MHz; a rate without any is 20 MHz.
+RATE_INFO_WIDTHS = {
+    3: 40,  # NL80211_RATE_INFO_40_MHZ_WIDTH
+    8: 80,  # NL80211_RATE_INFO_80_MHZ_WIDTH
+    9: 80,  # NL80211_RATE_INFO_80P80_MHZ_WIDTH
+    10: 160,  # NL80211_RATE_INFO_160_MHZ_WIDTH
+    11: 10,  # NL80211_RATE_INFO_10_MHZ_WIDTH
+    12: 5,  # NL80211_RATE_INFO_5_MHZ_WIDTH
+    18: 320,  # NL80211_RATE_INFO_320_MHZ_WIDTH
+}
+
+LINK_FIELDS = (
+    "signal",
+    "rx_rate",
+    "tx_rate",
+    "width",
+    "frequency",
+    "bssid",
+    "ssid",
+    "tx_retries",
+    "tx_failed",
+    "beacon_loss",
+    "beacon_signal",
+    "expected_throughput",
+    "inactive_time",
+    "connected_time",
+)
+
+
+def pack_attr(attr_type, data):
+    length = _NLATTR.size + len(data)
+    return _NLATTR.pack(length, attr_type) + data + b"\0" * (-length % 4)
+
+
+def parse_attrs(data):
+    """{type: payload} of a run of netlink attributes."""
+    attrs = {}
+    offset = 0
+    while offset + _NLATTR.size <= len(data):
+        length, attr_type = _NLATTR.unpack_from(data, offset)
+        if length < _NLATTR.size:
+            break
+        attrs[attr_type & NLA_TYPE_MASK] = data[offset + _NLATTR.size : offset + length]
+        offset += (length + 3) & ~3
+    return attrs
+
+
+def parse_messages(data):
+    """(type, flags, seq, payload) for every netlink message in one datagram."""
+    messages = []
+    offset = 0
+    while offset + _NLMSGHDR.size <= len(data):
+        length, msg_type, flags, seq, _ = _NLMSGHDR.unpack_from(data, offset)
+        if length < _NLMSGHDR.size:
+            break
+        messages.append((msg_type, flags, seq, data[offset + _NLMSGHDR.size : offset + length]))
+        offset += (length + 3) & ~3
+    return messages
+
+
+def decode_bitrate(data):
+    """(MBit/s, width MHz) of a nested NL80211_STA_INFO_*_BITRATE."""
+    rate = parse_attrs(data)
+    if NL80211_RATE_INFO_BITRATE32 in rate:
+        value = struct.unpack("=I", rate[NL80211_RATE_INFO_BITRATE32][:4])[0]
+    elif NL80211_RATE_INFO_BITRATE in rate:
+        value = struct.unpack("=H", rate[NL80211_RATE_INFO_BITRATE][:2])[0]
+    else:
+        return None, None
+    width = next((mhz for attr, mhz in RATE_INFO_WIDTHS.items() if attr in rate), 20)
+    return value / 10.0, width
+
+
+def decode_link(interface, station):
+    """Link fields from GET_INTERFACE and GET_STATION attributes (all None if unassociated)."""
+    fields = dict.fromkeys(LINK_FIELDS)
+    if station is None:
+        return fields
+
+    if NL80211_ATTR_MAC in station:
+        fields["bssid"] = ":".join(f"{b:02x}" for b in station[NL80211_ATTR_MAC][:6])
+    info = parse_attrs(station.get(NL80211_ATTR_STA_INFO, b""))
+    if NL80211_STA_INFO_SIGNAL in info:
+        fields["signal"] = struct.unpack("=b", info[NL80211_STA_INFO_SIGNAL][:1])[0]
+    rx_rate, rx_bw = decode_bitrate(info.get(NL80211_STA_INFO_RX_BITRATE, b""))
+    tx_rate, tx_bw = decode_bitrate(info.get(NL80211_STA_INFO_TX_BITRATE, b""))
+    fields["rx_rate"] = rx_rate
+    fields["tx_rate"] = tx_rate
+    fields["width"] = rx_bw or tx_bw
+    for attr, name in STA_INFO_U32_FIELDS.items():
+        if attr in info:
+            fields[name] = struct.unpack("=I", info[attr][:4])[0]
+    if NL80211_STA_INFO_BEACON_SIGNAL_AVG in info:
+        fields["beacon_signal"] = struct.unpack("=b", info[NL80211_STA_INFO_BEACON_SIGNAL_AVG][:1])[0]
+    if NL80211_STA_INFO_EXPECTED_THROUGHPUT in info:
+        kbps = struct.unpack("=I", info[NL80211_STA_INFO_EXPECTED_THROUGHPUT][:4])[0]
+        fields["expected_throughput"] = kbps / 1000.0
+
+    if NL80211_ATTR_WIPHY_FREQ in interface:
+        fields["frequency"] = float(struct.unpack("=I", interface[NL80211_ATTR_WIPHY_FREQ][:4])[0])
+    ssid = interface.get(NL80211_ATTR_SSID)
+    if ssid:
+        fields["ssid"] = ssid.decode("utf-8", "replace")
+    return fields
+
+
+def open_netlink_socket():
+    sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_GENERIC)
+    sock.bind((0, 0))
+    return sock
+
+
+class Nl80211:
+    """Generic netlink connection resolved to the nl80211 family.
+
+    Raises OSError on construction if netlink or nl80211 is unavailable.
+    """
+
+    def __init__(self, sock=None):
+        self._sock = open_netlink_socket() if sock is None else sock
+        self._sock.settimeout(constants.COMMAND_TIMEOUT)
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._bssid = None  # associated BSSID as last read from the scan results
+        self.family = self._resolve_family()
+
+    def close(self):
+        self._sock.close()
+
+    def _request(self, msg_type, cmd, attrs, dump=False):
+        """Send one request; the attribute dicts of every reply to it."""
+        self._seq += 1
+        seq = self._seq
+        flags = NLM_F_REQUEST | (NLM_F_DUMP if dump else 0)
+        body = _GENLMSGHDR.pack(cmd, GENL_VERSION, 0) + b"".join(pack_attr(t, d) for t, d in attrs)
+        self._sock.send(_NLMSGHDR.pack(_NLMSGHDR.size + len(body), msg_type, flags, seq, 0) + body)
+
+        replies = []
+        while True:
+            for reply_type, reply_flags, reply_seq, payload in parse_messages(self._sock.recv(65536)):
+                if reply_seq != seq:
+                    # Leftover from a request that timed out.
+                    continue
+                if reply_type == NLMSG_ERROR:
+                    error = struct.unpack_from("=i", payload)[0]
+                    if error:
+                        raise OSError(-error, os.strerror(-error))
+                    return replies
+                if reply_type == NLMSG_DONE:
+                    return replies
+                replies.append(parse_attrs(payload[_GENLMSGHDR.size :]))
+                if not reply_flags & NLM_F_MULTI:
+                    return replies
+
+    def _resolve_family(self):
+        replies = self._request(GENL_ID_CTRL, CTRL_CMD_GETFAMILY, [(CTRL_ATTR_FAMILY_NAME, b"nl80211\0")])
+        if not replies or CTRL_ATTR_FAMILY_ID not in replies[0]:
+            raise OSError(errno.ENOENT, "nl80211 family not found")
+        return struct.unpack("=H", replies[0][CTRL_ATTR_FAMILY_ID][:2])[0]
+
+    def _associated_bssid(self, index):
+        """MAC (bytes) of the BSS the scan results mark as associated or joined, or None."""
+        for reply in self._request(self.family, NL80211_CMD_GET_SCAN, index, dump=True):
+            bss = parse_attrs(reply.get(NL80211_ATTR_BSS, b""))
+            status = bss.get(NL80211_BSS_STATUS)
+            if status is not None and struct.unpack("=I", status[:4])[0] in (
+                NL80211_BSS_STATUS_ASSOCIATED,
+                NL80211_BSS_STATUS_IBSS_JOINED,
+            ):
+                return bss.get(NL80211_BSS_BSSID, b"")[:6] or None
+        return None
+
+    def _associated_station(self, index, stations):
+        """The AP among the dumped stations; the BSSID is re-read only when the
+        cached one is not among them (first read, roam, peers changing)."""
+        if len(stations) <= 1:
+            return stations[0] if stations else None
+        for refresh in (False, True):
+            if refresh:
+                self._bssid = self._associated_bssid(index)
+            for station in stations:
+                if self._bssid is not None and station.get(NL80211_ATTR_MAC, b"")[:6] == self._bssid:
+                    return station
+        return stations[0]
+
+    def link(self, ifindex):
+        """Link fields (see `LINK_FIELDS`) of interface `ifindex`."""
+        index = [(NL80211_ATTR_IFINDEX, struct.pack("=I", ifindex))]
+        with self._lock:
+            interface = self._request(self.family, NL80211_CMD_GET_INTERFACE, index)
+            stations = self._request(self.family, NL80211_CMD_GET_STATION, index, dump=True)
+            station = self._associated_station(index, stations)
+        return decode_link(interface[0] if interface else {}, station)
@@ -40,6 +40,7 @@ class FailureOverlay(QWidget):
         self.regions = []
 
     def setRegions(self, regions):
+        """`regions` are (left_x, right_x) or (left_x, right_x, color) tuples."""
         self.regions = regions
         self.update()
 
@@ -47,8 +48,17 @@ class FailureOverlay(QWidget):
         from PyQt5.QtGui import QColor, QPainter
 
         painter = QPainter(self)
-        color = QColor(255, 0, 0, 60)
-        for left_x, right_x in self.regions:
+        default = QColor(255, 0, 0, 60)
+        colors = {}
+        for left_x, right_x, *rest in self.regions:
+            name = rest[0] if rest else None
+            if name is None:
+                color = default
+            else:
+                color = colors.get(name)
+                if color is None:
+                    color = colors[name] = QColor(name)
+                    color.setAlpha(60)
             painter.fillRect(int(left_x), 0, int(right_x - left_x), self.height(), color)
 
 
@@ -2,59 +2,305 @@ import re
 import threading
 import time
 import subprocess
-
-import numpy as np
+from functools import partial
 
 from . import constants
+from .failures import FailureRuns
+from .latency import LatencyStats
+from .prober import AsyncProber, icmp_dgram_allowed
+from .store import append_probe, create_host_store, create_probe_store
 
 
 ping_lock = threading.Lock()
 ping_threads_running = True
 
+# "async": every host probed from one asyncio loop over an unprivileged ICMP
+# datagram socket (see prober.py).
+# "stream": one long-lived `ping -O -D` process per host, parsed line by line.
+# "oneshot": fork `ping -c 1` for every probe (also the fallback for `ping`
+# builds without -O/-D, e.g. busybox).
+# "auto" picks "async" where `net.ipv4.ping_group_range` allows it, else "stream".
+ping_mode = "auto"
+PING_INTERVAL = 0.3  # seconds between probes
+PING_TIMEOUT = 1  # seconds a probe may take to be answered (ping -W)
+PING_RESTART_DELAY = 1.0  # seconds before restarting an exited ping process
+
 
 gateway_host_info = None
 gateway_removed_by_user = False
 
 
-def ping_worker(host_info):
-    while ping_threads_running:
+_REPLY_RE = re.compile(r"^\[(\d+\.\d+)\].*icmp_seq=(\d+).*time=([\d.]+) ms")
+# "no answer yet for icmp_seq=N" (-O) and ICMP errors ("From ... icmp_seq=N ...").
+_LOSS_RE = re.compile(r"^\[(\d+\.\d+)\] (?:no answer yet for|From .*) icmp_seq=(\d+)")
+_NO_ANSWER_RE = re.compile(r"^\[\d+\.\d+\] no answer yet for")
+_OPTION_ERROR_RE = re.compile(r"invalid option|unrecognized option|illegal option")
+
+SEQ_MODULO = 65536
+
+
+def parse_ping_line(line):
+    """Parse one line of `ping -O -D` output.
+
+    Returns (timestamp, seq, rtt_ms) for a reply, (timestamp, seq, None) for a
+    reported loss, or None for anything else (header, statistics).
+    """
+    match = _REPLY_RE.match(line)
+    if match:
+        return float(match.group(1)), int(match.group(2)), float(match.group(3))
+    match = _LOSS_RE.match(line)
+    if match:
+        return float(match.group(1)), int(match.group(2)), None
+    return None
+
+
+class PingStreamParser:
+    """Turns `ping -O -D` output into one result per probe sequence number.
+
+    `-O` reports "no answer yet" as soon as the next probe is due, well before
+    the probe times out. Such probes, and sequence numbers skipped without any
+    line, are only provisionally lost: a reply up to `timeout` seconds after the
+    probe was sent still counts, and only then does the loss become final. ICMP
+    errors are final at once. A reply to a probe already counted is dropped, so
+    every probe is counted once.
+    """
+
+    def __init__(self, interval=PING_INTERVAL, timeout=PING_TIMEOUT):
+        self.interval = interval
+        self.timeout = timeout
+        self.next_seq = None
+        self.pending = {}  # provisionally lost seq -> time the loss becomes final
+
+    def feed(self, line):
+        """List of (timestamp, seq, rtt_ms or None) results completed by `line`."""
+        parsed = parse_ping_line(line)
+        if parsed is None:
+            return []
+        timestamp, seq, rtt = parsed
+        provisional = rtt is None and _NO_ANSWER_RE.match(line) is not None
+
+        results = self._expire(timestamp)
+        if self.next_seq is None:
+            self.next_seq = seq
+        gap = (seq - self.next_seq) % SEQ_MODULO
+        if gap >= SEQ_MODULO // 2:
+            # An earlier probe: counts if it is still provisionally lost.
+            if not provisional and self.pending.pop(seq, None) is not None:
+                results.append((timestamp, seq, rtt))
+            return results
+
+        # Reported about one interval after the probe was sent.
+        deadline = timestamp - self.interval + self.timeout
+        for k in range(gap):
+            self.pending[(self.next_seq + k) % SEQ_MODULO] = deadline
+        self.next_seq = (seq + 1) % SEQ_MODULO
+        if provisional:
+            self.pending[seq] = deadline
+        else:
+            results.append((timestamp, seq, rtt))
+        return results
+
+    def flush(self, timestamp):
+        """Every provisional loss as final (the stream ended)."""
+        results = [(timestamp, seq, None) for seq in self.pending]
+        self.pending.clear()
+        return results
+
+    def _expire(self, timestamp):
+        expired = [seq for seq, deadline in self.pending.items() if deadline <= timestamp]
+        for seq in expired:
+            del self.pending[seq]
+        return [(timestamp, seq, None) for seq in expired]
+
+
+def _record_probe(host_info, timestamp, rtt):
+    """Keep one probe result (rtt None = lost) in the host's probe series."""
+    with ping_lock:
+        append_probe(host_info, timestamp, rtt)
+        host_info["stats"].add(timestamp, rtt)
+
+
+def _stop_process(proc):
+    if proc is None or proc.poll() is not None:
+        return
+    proc.terminate()
+    try:
+        proc.wait(timeout=1.0)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+def _host_active(host_info):
+    return ping_threads_running and not host_info["removed"]
+
+
+def _stream_ping(host_info):
+    """Ping `host_info` with a persistent process until the host is removed.
+
+    Returns False if `ping` cannot stream here, so the caller falls back to
+    one-shot probes.
+    """
+    while _host_active(host_info):
+        if not host_info["enabled"]:
+            time.sleep(0.5)
+            continue
+
+        target = host_info["host"]
+        try:
+            proc = subprocess.Popen(
+                ["ping", "-n", "-O", "-D", "-i", str(PING_INTERVAL), "-W", str(PING_TIMEOUT), target],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                bufsize=1,
+            )
+        except OSError:
+            return False
+        host_info["process"] = proc
+
+        parser = PingStreamParser()
+        replies = 0
+        unparsed = []
+        for line in proc.stdout:
+            results = parser.feed(line)
+            if results:
+                replies += len(results)
+                for timestamp, _, rtt in results:
+                    _record_probe(host_info, timestamp, rtt)
+            else:
+                unparsed = (unparsed + [line])[-5:]
+            # -O prints a line every interval, so these are checked promptly.
+            if not _host_active(host_info) or not host_info["enabled"] or host_info["host"] != target:
+                break
+
+        for timestamp, _, rtt in parser.flush(time.time()):
+            _record_probe(host_info, timestamp, rtt)
+        _stop_process(proc)
+        proc.stdout.close()
+        host_info["process"] = None
+
+        if replies == 0 and any(_OPTION_ERROR_RE.search(line) for line in unparsed):
+            return False
+        if _host_active(host_info) and host_info["enabled"] and host_info["host"] == target:
+            # Exited on its own (e.g. network unreachable); back off, then restart.
+            time.sleep(PING_RESTART_DELAY)
+    return True
+
+
+def _oneshot_ping(host_info):
+    while _host_active(host_info):
         if not host_info["enabled"]:
             time.sleep(0.5)
             continue
         try:
             result = subprocess.check_output(
-                ["ping", "-c", "1", "-W", "1", host_info["host"]],
+                ["ping", "-c", "1", "-W", str(PING_TIMEOUT), host_info["host"]],
                 text=True,
                 stderr=subprocess.DEVNULL,
             )
             match = re.search(r"time=([\d.]+)", result)
-            with ping_lock:
-                host_info["latest"] = float(match.group(1)) if match else None
+            _record_probe(host_info, time.time(), float(match.group(1)) if match else None)
         except Exception:
-            with ping_lock:
-                host_info["latest"] = None
-        time.sleep(0.3)
+            _record_probe(host_info, time.time(), None)
+        time.sleep(PING_INTERVAL)
+
+
+def ping_worker(host_info):
+    if _resolve_ping_mode() == "stream" and _stream_ping(host_info):
+        return
+    _oneshot_ping(host_info)
+
+
+_prober = None
+
+
+def _resolve_ping_mode():
+    global ping_mode
+    if ping_mode == "auto":
+        ping_mode = "async" if icmp_dgram_allowed() else "stream"
+    return ping_mode
+
+
+def _get_prober():
+    global _prober
+    if _prober is None:
+        prober = AsyncProber()
+        prober.start()
+        _prober = prober
+    return _prober
+
+
+def _start_async_probing(host_info):
+    """Probe `host_info` from the shared prober.
+
+    Returns False if the prober cannot open its ICMP socket after all (e.g.
+    ping_group_range changed, or EPERM/EACCES under a sandbox); "async" mode is
+    then given up for "stream" for this and every later host.
+    """
+    global ping_mode
+    try:
+        prober = _get_prober()
+    except OSError:
+        ping_mode = "stream"
+        return False
+    prober.add_target(id(host_info), host_info["host"], PING_INTERVAL, partial(_on_probe_result, host_info))
+    host_info["probing"] = True
+    return True
+
+
+def _on_probe_result(host_info, timestamp, seq, rtt):
+    _record_probe(host_info, timestamp, rtt)
+
+
+def set_ping_host(host_info, host):
+    """Point an existing ping host at a new target (e.g. the gateway moved)."""
+    host_info["host"] = host
+    if host_info["probing"]:
+        _get_prober().set_target(id(host_info), host=host)
 
 
 def add_ping_host(host, label=None):
-    current_len = len(constants.time_data)
+    host_store = create_host_store(len(constants.time_data))
     host_info = {
         "host": host,
         "label": label or host,
         "enabled": True,
-        "data": np.full(current_len, np.nan),
-        "failed": np.ones(current_len, dtype=bool),
-        "latest": None,
+        "store": host_store,
+        **host_store.views(),
+        "failure_runs": FailureRuns(),
+        "probes": create_probe_store(),
+        "stats": LatencyStats(),
         "thread": None,
+        "process": None,
+        "probing": False,
+        "removed": False,
     }
-    thread = threading.Thread(target=ping_worker, args=(host_info,), daemon=True)
-    host_info["thread"] = thread
-    thread.start()
+    if _resolve_ping_mode() == "async" and ping_threads_running:
+        _start_async_probing(host_info)
+    if _resolve_ping_mode() != "async":
+        thread = threading.Thread(target=ping_worker, args=(host_info,), daemon=True)
+        host_info["thread"] = thread
+        thread.start()
     constants.ping_hosts.append(host_info)
     return host_info
 
 
 def remove_ping_host(index):
     if 0 <= index < len(constants.ping_hosts):
-        constants.ping_hosts[index]["enabled"] = False
-        constants.ping_hosts.pop(index)
+        host_info = constants.ping_hosts.pop(index)
+        host_info["enabled"] = False
+        host_info["removed"] = True
+        _stop_process(host_info["process"])
+        if host_info["probing"]:
+            _get_prober().remove_target(id(host_info))
+
+
+def stop_all_pings():
+    """Stop every ping worker and its process (on application exit)."""
+    global ping_threads_running
+    ping_threads_running = False
+    for host_info in constants.ping_hosts:
+        _stop_process(host_info["process"])
+    if _prober is not None:
+        _prober.stop(timeout=1.0)
@@ -1,5 +1,6 @@
 from datetime import datetime
 
+import numpy as np
 import pyqtgraph as pg
 
 
@@ -155,3 +156,69 @@ class TimeAxisItem(pg.AxisItem):
             return [datetime.fromtimestamp(v).strftime("%d %H:%M") for v in values]
         else:
             return [datetime.fromtimestamp(v).strftime("%H:%M:%S") for v in values]
+
+
+# Median point colors by bucket loss fraction, smokeping style: (upper bound, rgb).
+LOSS_COLORS = [
+    (0.0, (0, 200, 0)),
+    (0.05, (0, 160, 255)),
+    (0.2, (255, 160, 0)),
+    (1.0, (255, 0, 0)),
+]
+
+
+def loss_brushes(loss):
+    """One brush per bucket, picked by its loss fraction."""
+    bounds = np.array([bound for bound, _ in LOSS_COLORS])
+    brushes = [pg.mkBrush(*rgb) for _, rgb in LOSS_COLORS]
+    idx = np.searchsorted(bounds, np.nan_to_num(loss), side="left").clip(max=len(brushes) - 1)
+    return [brushes[i] for i in idx]
+
+
+class LatencyBands:
+    """Smokeping-style distribution bands for one ping host.
+
+    Shades min..max and p25..p75 per bucket around the median curve and marks
+    every median with a point colored by the bucket's loss. Follows the
+    visibility of `curve`, so the legend toggles the bands too.
+    """
+
+    def __init__(self, plot, curve, color):
+        # Invisible edges (no pen) that still count for Y auto-range.
+        self._edges = [pg.PlotCurveItem(pen=pg.mkPen(None), connect="finite") for _ in range(4)]
+        band = pg.mkColor(color)
+        band.setAlpha(35)
+        outer = pg.FillBetweenItem(self._edges[0], self._edges[3], brush=pg.mkBrush(band))
+        band = pg.mkColor(color)
+        band.setAlpha(80)
+        inner = pg.FillBetweenItem(self._edges[1], self._edges[2], brush=pg.mkBrush(band))
+        self.points = pg.ScatterPlotItem(size=4, pen=None)
+        self.items = [*self._edges, outer, inner, self.points]
+        for item in self.items:
+            plot.addItem(item)
+        outer.setZValue(-20)
+        inner.setZValue(-10)
+        self._curve = curve
+        curve.visibleChanged.connect(self._sync_visibility)
+
+    def _sync_visibility(self):
+        visible = self._curve.isVisible()
+        for item in self.items:
+            item.setVisible(visible)
+
+    def setData(self, time_arr, percentiles, loss):
+        """`percentiles` holds min, p25, median, p75, max rows over `time_arr`."""
+        for edge, values in zip(self._edges, percentiles[[0, 1, 3, 4]]):
+            edge.setData(time_arr, values)
+        ok = np.isfinite(percentiles[2])
+        self.points.setData(time_arr[ok], percentiles[2][ok], brush=loss_brushes(loss[ok]))
+
+    def clear(self):
+        for edge in self._edges:
+            edge.setData([], [])
+        self.points.setData([], [])
+
+    def remove(self, plot):
+        self._curve.visibleChanged.disconnect(self._sync_visibility)
+        for item in self.items:
+            plot.removeItem(item)
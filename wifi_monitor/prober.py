@@ -0,0 +1,333 @@
+"""Asyncio ICMP echo prober for many targets on one event loop.
+
+Uses unprivileged `SOCK_DGRAM` ICMP sockets (allowed when the user's group is
+inside `net.ipv4.ping_group_range`); `ping.py` falls back to subprocess pings
+where they are not. One socket and one loop thread serve every target:
+
+- each target is probed on its own interval, with jittered send times so
+  hundreds of targets do not fire in lockstep;
+- a global token bucket caps the packets sent per second;
+- replies are matched by (source address, sequence number), and probes without
+  a reply within `timeout` are reported as lost.
+
+The socket is injectable, so the prober can be tested against a stand-in
+responder speaking ICMP echo over UDP on loopback.
+"""
+
+import asyncio
+import heapq
+import os
+import random
+import socket
+import struct
+import threading
+import time
+
+ICMP_ECHO_REPLY = 0
+ICMP_ECHO_REQUEST = 8
+
+PROBE_PAYLOAD = b"wifi-monitor-probe"
+
+DEFAULT_MAX_PPS = 200
+DEFAULT_TIMEOUT = 1.0
+DEFAULT_JITTER = 0.1  # fraction of the interval
+
+
+def icmp_checksum(data):
+    if len(data) % 2:
+        data += b"\0"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+def build_echo_request(ident, seq, payload=PROBE_PAYLOAD):
+    header = struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, 0, ident, seq)
+    checksum = icmp_checksum(header + payload)
+    return struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, checksum, ident, seq) + payload
+
+
+def parse_echo(data):
+    """(type, ident, seq, payload) of an ICMP echo message, or None."""
+    if len(data) < 8:
+        return None
+    icmp_type, code, _, ident, seq = struct.unpack("!BBHHH", data[:8])
+    if icmp_type not in (ICMP_ECHO_REPLY, ICMP_ECHO_REQUEST) or code != 0:
+        return None
+    return icmp_type, ident, seq, data[8:]
+
+
+def icmp_dgram_allowed():
+    """Whether this process may open unprivileged ICMP datagram sockets."""
+    try:
+        with open("/proc/sys/net/ipv4/ping_group_range") as f:
+            low, high = (int(v) for v in f.read().split())
+    except (OSError, ValueError):
+        low, high = 1, 0
+    groups = {os.getgid(), *os.getgroups()}
+    if not any(low <= gid <= high for gid in groups):
+        return False
+    try:
+        socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP).close()
+    except OSError:
+        return False
+    return True
+
+
+def open_icmp_socket():
+    return socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+
+
+class _Target:
+    def __init__(self, key, host, interval, on_result):
+        self.key = key
+        self.host = host
+        self.interval = interval
+        self.on_result = on_result
+        self.address = None
+        self.resolve_failed = False
+        self.enabled = True
+
+
+class AsyncProber:
+    """ICMP echo prober running all targets on one asyncio loop thread.
+
+    `on_result(timestamp, seq, rtt_ms)` is called on the loop thread for every
+    probe, with `rtt_ms` None for a lost probe. `open_socket` and `port` exist
+    for tests (a UDP socket and the stand-in responder's port); ICMP datagram
+    sockets ignore the port.
+    """
+
+    def __init__(
+        self,
+        open_socket=open_icmp_socket,
+        port=0,
+        max_pps=DEFAULT_MAX_PPS,
+        timeout=DEFAULT_TIMEOUT,
+        jitter=DEFAULT_JITTER,
+    ):
+        self._open_socket = open_socket
+        self._port = port
+        self.max_pps = max_pps
+        self.timeout = timeout
+        self.jitter = jitter
+
+        self._targets = {}
+        self._schedule = []  # heap of (send_at, counter, key)
+        self._counter = 0
+        self._outstanding = {}  # seq -> (key, address, send_monotonic)
+        self._seq = 0
+        self._ident = os.getpid() & 0xFFFF
+        self._tokens = float(self._burst)
+        self._refilled = time.monotonic()
+
+        self._loop = None
+        self._sock = None
+        self._thread = None
+        self._wakeup = None
+        self._start_error = None
+        self.sent = 0
+
+    @property
+    def _burst(self):
+        return max(1, self.max_pps // 10)
+
+    # ---- Public API (any thread) ----
+
+    def start(self):
+        """Start the loop thread. Raises what opening the socket raised (e.g.
+        PermissionError where ICMP datagram sockets are not allowed)."""
+        if self._thread is not None:
+            return
+        started = threading.Event()
+        self._start_error = None
+        self._thread = threading.Thread(target=self._thread_main, args=(started,), name="icmp-prober", daemon=True)
+        self._thread.start()
+        started.wait()
+        if self._start_error is not None:
+            self._thread.join()
+            self._thread = None
+            raise self._start_error
+
+    def stop(self, timeout=None):
+        if self._loop is None:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def add_target(self, key, host, interval, on_result):
+        self._call(self._add_target, key, host, interval, on_result)
+
+    def remove_target(self, key):
+        self._call(self._remove_target, key)
+
+    def set_target(self, key, host=None, enabled=None):
+        """Change a target's host (re-resolved) or pause/resume probing it."""
+        self._call(self._set_target, key, host, enabled)
+
+    def _call(self, fn, *args):
+        if self._loop is None:
+            raise RuntimeError("prober is not running")
+        self._loop.call_soon_threadsafe(fn, *args)
+
+    # ---- Loop thread ----
+
+    def _thread_main(self, started):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            self._sock = self._open_socket()
+            self._sock.setblocking(False)
+            loop.add_reader(self._sock.fileno(), self._on_readable)
+            self._wakeup = asyncio.Event()
+            task = loop.create_task(self._send_loop())
+            self._loop = loop
+        except Exception as exc:
+            # Handed to start(), which re-raises it on the calling thread.
+            self._start_error = exc
+            if self._sock is not None:
+                self._sock.close()
+                self._sock = None
+            loop.close()
+            return
+        finally:
+            started.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            task.cancel()
+            self._loop.run_until_complete(asyncio.gather(task, return_exceptions=True))
+            self._loop.remove_reader(self._sock.fileno())
+            self._sock.close()
+            self._loop.close()
+            self._loop = None
+
+    def _add_target(self, key, host, interval, on_result):
+        target = _Target(key, host, interval, on_result)
+        self._targets[key] = target
+        self._loop.create_task(self._resolve(target))
+        # Spread the first probes of many targets over one interval.
+        self._push(time.monotonic() + random.uniform(0, interval), key)
+
+    def _remove_target(self, key):
+        self._targets.pop(key, None)
+
+    def _set_target(self, key, host, enabled):
+        target = self._targets.get(key)
+        if target is None:
+            return
+        if enabled is not None:
+            target.enabled = enabled
+        if host is not None and host != target.host:
+            target.host = host
+            target.address = None
+            target.resolve_failed = False
+            self._loop.create_task(self._resolve(target))
+
+    async def _resolve(self, target):
+        host = target.host
+        try:
+            infos = await self._loop.getaddrinfo(host, None, family=socket.AF_INET, type=socket.SOCK_DGRAM)
+            address = infos[0][4][0]
+        except OSError:
+            address = None
+        if target.host == host:
+            target.address = address
+            target.resolve_failed = address is None
+
+    def _push(self, when, key):
+        self._counter += 1
+        heapq.heappush(self._schedule, (when, self._counter, key))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _take_token(self, now):
+        """Seconds to wait for a send token (0 if one was taken)."""
+        self._tokens = min(float(self._burst), self._tokens + (now - self._refilled) * self.max_pps)
+        self._refilled = now
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return 0.0
+        return (1.0 - self._tokens) / self.max_pps
+
+    async def _send_loop(self):
+        while True:
+            now = time.monotonic()
+            self._expire(now)
+
+            if not self._schedule:
+                delay = self.timeout
+            elif self._schedule[0][0] > now:
+                delay = self._schedule[0][0] - now
+            else:
+                wait = self._take_token(now)
+                if wait > 0:
+                    delay = wait
+                else:
+                    _, _, key = heapq.heappop(self._schedule)
+                    target = self._targets.get(key)
+                    if target is not None:
+                        self._send(target, now)
+                        spread = 1.0 + random.uniform(-self.jitter, self.jitter)
+                        self._push(now + target.interval * spread, key)
+                    continue
+
+            # Also wake up for the oldest outstanding probe's timeout.
+            if self._outstanding:
+                oldest = next(iter(self._outstanding.values()))[2]
+                delay = min(delay, max(0.0, oldest + self.timeout - now))
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def _send(self, target, now):
+        if not target.enabled or target.address is None:
+            if target.enabled and target.resolve_failed:
+                # An unresolvable host counts as a lost probe.
+                target.on_result(time.time(), None, None)
+            return
+        self._seq = (self._seq + 1) & 0xFFFF
+        packet = build_echo_request(self._ident, self._seq)
+        try:
+            self._sock.sendto(packet, (target.address, self._port))
+        except OSError:
+            target.on_result(time.time(), self._seq, None)
+            return
+        self._outstanding[self._seq] = (target.key, target.address, now)
+        self.sent += 1
+
+    def _expire(self, now):
+        # `_outstanding` is in send order, so expired probes are at the front.
+        while self._outstanding:
+            seq, (key, _, sent_at) = next(iter(self._outstanding.items()))
+            if now - sent_at < self.timeout:
+                break
+            del self._outstanding[seq]
+            target = self._targets.get(key)
+            if target is not None:
+                target.on_result(time.time(), seq, None)
+
+    def _on_readable(self):
+        while True:
+            try:
+                data, (address, _) = self._sock.recvfrom(2048)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return
+            now = time.monotonic()
+            parsed = parse_echo(data)
+            if parsed is None or parsed[0] != ICMP_ECHO_REPLY:
+                continue
+            _, _, seq, _ = parsed
+            pending = self._outstanding.get(seq)
+            if pending is None or pending[1] != address:
+                continue
+            del self._outstanding[seq]
+            target = self._targets.get(pending[0])
+            if target is not None:
+                target.on_result(time.time(), seq, (now - pending[2]) * 1000.0)
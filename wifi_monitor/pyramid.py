@@ -0,0 +1,247 @@
+"""Multi-resolution min/max/mean pyramid maintained at ingest.
+
+Level k holds, for every *completed* absolute-time bucket of width
+`PYRAMID_BASE_SECONDS * PYRAMID_FACTOR**k`, the min/max points and the mean and
+count of the finite samples, built from the level below (level 0 from raw
+samples). Means are combined weighted by count, so every level's mean is exact.
+Buckets are aligned to the epoch, so they never move when a window cutoff
+slides, and a finished bucket is never recomputed.
+
+Any time range can then be drawn in O(pixels): completed buckets of a coarse
+enough level, a short bridge of finer-level buckets, and the few raw samples of
+the bucket still being filled. `render` gives the peak-preserving min/max view,
+`render_means` the averaged one. A pyramid keeps only what its views need:
+the link series are drawn min/max, the station counters of the link-health
+view averaged.
+
+Ping hosts are not fed into a pyramid. They come and go and their per-bucket
+means (and percentile bands) are reduced from raw samples with a cache of
+completed buckets instead (see `controllers.rendering`).
+"""
+
+import numpy as np
+
+from .buffers import GrowableArray
+from .downsample import _runs, downsample_multi_timebucket
+
+PYRAMID_BASE_SECONDS = 4.0
+PYRAMID_FACTOR = 4
+PYRAMID_LEVELS = 9  # 4s .. 4^9s (~3 days per bucket)
+
+
+class _Level:
+    def __init__(self, width, n_series):
+        self.width = float(width)
+        self.time = GrowableArray()
+        self.ys = [GrowableArray() for _ in range(n_series)]
+        # One entry per bucket: start time, mean and count of finite samples.
+        self.bucket_time = GrowableArray()
+        self.means = [GrowableArray() for _ in range(n_series)]
+        self.counts = [GrowableArray(np.int64) for _ in range(n_series)]
+        # Bucket currently being filled, and where it starts in the source
+        # level's min/max points and in its buckets.
+        self.pending_key = None
+        self.pending_from = 0
+        self.pending_bucket_from = 0
+
+    @property
+    def end(self):
+        """Timestamp up to which this level is complete."""
+        if self.pending_key is None:
+            return -np.inf
+        return self.pending_key * self.width
+
+
+def _fold_means(times, means, counts, width):
+    """Count-weighted means per `width` bucket of (time, mean, count) entries.
+
+    `counts` None means raw samples: each finite value counts once.
+    Returns (bucket start times, means, counts), series on the first axis.
+    """
+    means = np.asarray(np.stack(means), dtype=float)
+    counts = np.isfinite(means) if counts is None else np.stack(counts)
+    keys = np.floor(times / width).astype(np.int64)
+    starts, _ = _runs(keys)
+    sums = np.add.reduceat(np.where(counts > 0, means, 0.0) * counts, starts, axis=-1)
+    totals = np.add.reduceat(counts.astype(np.int64), starts, axis=-1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = np.where(totals > 0, sums / totals, np.nan)
+    return keys[starts] * width, out, totals
+
+
+class MinMaxPyramid:
+    """Min/max/mean pyramid over several Y series that share one timebase.
+
+    `minmax` and `means` pick which of `render` and `render_means` it serves;
+    the other kind of bucket is not built.
+    """
+
+    def __init__(self, n_series, levels=PYRAMID_LEVELS, minmax=True, means=True):
+        if not (minmax or means):
+            raise ValueError("a pyramid needs min/max or mean buckets")
+        self.n_series = n_series
+        self.minmax = minmax
+        self.means = means
+        self.levels = [
+            _Level(PYRAMID_BASE_SECONDS * PYRAMID_FACTOR**k, n_series) for k in range(levels)
+        ]
+        self._seen = 0
+
+    def reset(self):
+        self.levels = [_Level(level.width, self.n_series) for level in self.levels]
+        self._seen = 0
+
+    def update(self, time_arr, y_arrays):
+        """Fold samples appended to `time_arr`/`y_arrays` since the last call.
+
+        Usually one sample per tick (O(levels)); bulk loads are handled in one
+        vectorized pass per level.
+        """
+        n = len(time_arr)
+        if n <= self._seen:
+            return
+        self._seen = n
+
+        src_t = time_arr
+        src_ys = y_arrays
+        # Buckets of the level below; raw samples are buckets of one.
+        src_bt = time_arr
+        src_means = y_arrays
+        src_counts = None
+        for level in self.levels:
+            # Both kinds of bucket complete together; either one tells when.
+            lead = src_t if self.minmax else src_bt
+            if len(lead) == 0:
+                break
+            if level.pending_key is None:
+                level.pending_key = int(np.floor(lead[0] / level.width))
+
+            last_key = int(np.floor(lead[-1] / level.width))
+            if last_key == level.pending_key:
+                # Coarser levels cannot have completed a bucket either.
+                break
+
+            split = int(np.searchsorted(src_t, last_key * level.width, side="left")) if self.minmax else 0
+            lo = level.pending_from
+            if split > lo:
+                out_t, out_ys = downsample_multi_timebucket(
+                    src_t[lo:split],
+                    [y[lo:split] for y in src_ys],
+                    level.width,
+                    t0=0.0,
+                    dt=1.0,
+                )
+                level.time.extend(out_t)
+                for buf, y in zip(level.ys, out_ys):
+                    buf.extend(y)
+
+            bsplit = int(np.searchsorted(src_bt, last_key * level.width, side="left")) if self.means else 0
+            blo = level.pending_bucket_from
+            if bsplit > blo:
+                bucket_t, means, counts = _fold_means(
+                    src_bt[blo:bsplit],
+                    [m[blo:bsplit] for m in src_means],
+                    None if src_counts is None else [c[blo:bsplit] for c in src_counts],
+                    level.width,
+                )
+                level.bucket_time.extend(bucket_t)
+                for buf, m in zip(level.means, means):
+                    buf.extend(m)
+                for buf, c in zip(level.counts, counts):
+                    buf.extend(c)
+
+            level.pending_from = split
+            level.pending_bucket_from = bsplit
+            level.pending_key = last_key
+
+            src_t = level.time.view()
+            src_ys = [buf.view() for buf in level.ys]
+            src_bt = level.bucket_time.view()
+            src_means = [buf.view() for buf in level.means]
+            src_counts = [buf.view() for buf in level.counts]
+
+    def pick_level(self, span, max_buckets):
+        """Finest level that covers `span` seconds in at most `max_buckets` buckets."""
+        for k, level in enumerate(self.levels):
+            if span / level.width <= max_buckets:
+                return k
+        return len(self.levels) - 1
+
+    def render(self, time_arr, y_arrays, t_lo, t_hi, max_buckets):
+        """Downsampled (time, [ys]) for [t_lo, t_hi].
+
+        `time_arr`/`y_arrays` are the raw series the pyramid was fed from; only
+        their newest, not yet bucketed samples are read.
+
+        Returns (out_t, out_ys, raw_start, width): `raw_start` is the index in
+        `time_arr` where the raw tail begins and `width` the bucket width used
+        for the bulk of the range.
+        """
+        top = self.pick_level(t_hi - t_lo, max_buckets)
+
+        parts_t = []
+        parts_ys = [[] for _ in range(self.n_series)]
+        lo = t_lo
+        for level in reversed(self.levels[: top + 1]):
+            hi = min(level.end, t_hi)
+            if hi <= lo:
+                continue
+            times = level.time.view()
+            a = int(np.searchsorted(times, lo, side="left"))
+            b = int(np.searchsorted(times, hi, side="left"))
+            parts_t.append(times[a:b])
+            for part, buf in zip(parts_ys, level.ys):
+                part.append(buf.view()[a:b])
+            lo = hi
+
+        raw_start = int(np.searchsorted(time_arr, lo, side="left"))
+        raw_end = int(np.searchsorted(time_arr, t_hi, side="right"))
+        parts_t.append(time_arr[raw_start:raw_end])
+        for part, y in zip(parts_ys, y_arrays):
+            part.append(y[raw_start:raw_end])
+
+        out_t = np.concatenate(parts_t)
+        out_ys = [np.concatenate(part) for part in parts_ys]
+        return out_t, out_ys, raw_start, self.levels[top].width
+
+    def render_means(self, time_arr, y_arrays, t_lo, t_hi, max_buckets):
+        """Bucket means for [t_lo, t_hi], like `render` but one point per bucket.
+
+        Completed buckets come from the pyramid (time = bucket start); the
+        samples after the finest level's end are passed through raw.
+
+        Returns (out_t, out_ys, out_counts, raw_start, width): `out_counts` is
+        the number of finite samples behind each point (0 or 1 for raw ones).
+        """
+        top = self.pick_level(t_hi - t_lo, max_buckets)
+
+        parts_t = []
+        parts_ys = [[] for _ in range(self.n_series)]
+        parts_counts = [[] for _ in range(self.n_series)]
+        lo = t_lo
+        for level in reversed(self.levels[: top + 1]):
+            hi = min(level.end, t_hi)
+            if hi <= lo:
+                continue
+            times = level.bucket_time.view()
+            a = int(np.searchsorted(times, lo, side="left"))
+            b = int(np.searchsorted(times, hi, side="left"))
+            parts_t.append(times[a:b])
+            for part, buf in zip(parts_ys, level.means):
+                part.append(buf.view()[a:b])
+            for part, buf in zip(parts_counts, level.counts):
+                part.append(buf.view()[a:b])
+            lo = hi
+
+        raw_start = int(np.searchsorted(time_arr, lo, side="left"))
+        raw_end = int(np.searchsorted(time_arr, t_hi, side="right"))
+        parts_t.append(time_arr[raw_start:raw_end])
+        for part, counts, y in zip(parts_ys, parts_counts, y_arrays):
+            raw = np.asarray(y[raw_start:raw_end], dtype=float)
+            part.append(raw)
+            counts.append(np.isfinite(raw).astype(np.int64))
+
+        out_t = np.concatenate(parts_t)
+        out_ys = [np.concatenate(part) for part in parts_ys]
+        out_counts = [np.concatenate(part) for part in parts_counts]
+        return out_t, out_ys, out_counts, raw_start, self.levels[top].width
@@ -0,0 +1,148 @@
+"""Link sampling on a dedicated thread.
+
+`iw` and `ip` can stall (a busy driver, a slow netlink reply), and used to do so
+on the Qt main thread, freezing hover and resizing with them. The sampler takes
+samples on a steady schedule off the GUI thread, every command runs with a
+timeout, and finished samples are handed to the GUI through a queue. Each
+sample's `iw link` read also refreshes the shared snapshot in `net`, so the
+heatmap, scanner and storage reuse it instead of running `iw` themselves.
+"""
+
+import math
+import queue
+import threading
+import time
+from collections import namedtuple
+
+from . import constants
+from .net import STATION_FIELDS, get_default_gateway, refresh_link_state
+from .ping import PING_INTERVAL, ping_lock
+from .prober import DEFAULT_TIMEOUT
+from .store import probe_sample, trim_probes
+
+# One tick's worth of data. `station` maps `net.STATION_FIELDS` to the raw
+# counter readings (None if unavailable). `gateway` is the new default gateway
+# on the tick the route changed to it, else None; `pings` holds (host_info, rtt)
+# pairs for the hosts pinged at that time, `rtt` being the mean over every reply
+# since the previous sample (see `store.probe_sample`; None if lost).
+Sample = namedtuple("Sample", ["timestamp", "signal", "rx", "tx", "bw", "station", "gateway", "pings"])
+
+# Every probe is answered or given up within PING_INTERVAL + its timeout, so a
+# host heard from less recently than this has stalled.
+PING_STALE_AFTER = 2 * (PING_INTERVAL + DEFAULT_TIMEOUT)
+
+
+def _sample_interval():
+    return constants.SAMPLE_INTERVAL / 1000.0
+
+
+class Sampler:
+    """Background thread producing `Sample`s every sample interval.
+
+    The sample interval is independent of the GUI's repaint interval; the GUI
+    drains whatever accumulated once per frame. Ticks are scheduled on the
+    monotonic clock. A read that overruns the interval (even with the
+    per-command timeouts) skips the ticks it missed instead of firing them back
+    to back. Nothing is sampled while paused.
+    """
+
+    def __init__(self, read_link=refresh_link_state, read_gateway=get_default_gateway, interval=_sample_interval):
+        self.samples = queue.Queue()
+        self._read_link = read_link
+        self._read_gateway = read_gateway
+        self._interval = interval
+        self._stop = threading.Event()
+        self._reschedule = threading.Event()
+        self._thread = None
+        self._gateway = None  # last gateway read, to report changes only
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._reschedule.clear()
+        self._thread = threading.Thread(target=self._run, name="link-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._reschedule.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def reschedule(self):
+        """Apply a changed interval now rather than after the current wait."""
+        self._reschedule.set()
+
+    def drain(self):
+        """All samples taken since the last call, oldest first."""
+        out = []
+        while True:
+            try:
+                out.append(self.samples.get_nowait())
+            except queue.Empty:
+                return out
+
+    def _sample(self, since):
+        timestamp = time.time()
+        try:
+            link = self._read_link()
+        except Exception:
+            link = None
+        if link is not None:
+            signal, rx, tx, bw = link.signal, link.rx_rate, link.tx_rate, link.width
+            station = {name: getattr(link, name) for name in STATION_FIELDS}
+        else:
+            signal = rx = tx = bw = None
+            station = dict.fromkeys(STATION_FIELDS)
+
+        # The route table is read every tick (no fork), so a roam to a new
+        # gateway shows up on the next sample.
+        gateway = None
+        try:
+            current = self._read_gateway()
+        except Exception:
+            current = self._gateway
+        if current != self._gateway:
+            self._gateway = current
+            gateway = current
+
+        if since is None:
+            since = timestamp - self._interval()
+        with ping_lock:
+            pings = [
+                (host_info, probe_sample(host_info, since, timestamp, PING_STALE_AFTER) if host_info["enabled"] else None)
+                for host_info in list(constants.ping_hosts)
+            ]
+            for host_info, _ in pings:
+                trim_probes(host_info, timestamp)
+        return Sample(timestamp, signal, rx, tx, bw, station, gateway, pings)
+
+    def _run(self):
+        last_timestamp = None
+        next_tick = time.monotonic()
+        while True:
+            delay = next_tick - time.monotonic()
+            if self._reschedule.wait(max(0.0, delay)):
+                self._reschedule.clear()
+                next_tick = time.monotonic()
+            if self._stop.is_set():
+                return
+
+            interval = max(self._interval(), 1e-3)
+            if constants.paused:
+                last_timestamp = None
+                # Pings go on while paused; drop what no sample will read.
+                with ping_lock:
+                    for host_info in list(constants.ping_hosts):
+                        trim_probes(host_info, time.time())
+            else:
+                sample = self._sample(last_timestamp)
+                last_timestamp = sample.timestamp
+                self.samples.put(sample)
+
+            next_tick += interval
+            behind = time.monotonic() - next_tick
+            if behind > 0:
+                next_tick += math.ceil(behind / interval) * interval
@@ -0,0 +1,286 @@
+"""SQLite archive of channel scans.
+
+An optional second home for the scan history next to the day journals of
+`storage`. Every scan is one row in `scans`; its per-channel network counts go
+to `channel_counts` and each access point it saw to `bss_observations`. The
+indexes on (band, timestamp) and (channel, timestamp) make range queries read
+only the rows in range instead of whole days, so long-range analytics (channel
+usage over months, per-channel series, which APs come and go) are single SQL
+aggregates.
+
+The database runs in WAL mode; inserts are batched into one transaction.
+Re-importing a scan is a no-op: scans are unique on (timestamp, band).
+"""
+
+import sqlite3
+from datetime import datetime
+
+import numpy as np
+
+DB_FILE = "scans.sqlite3"
+BATCH_SIZE = 500  # scans per transaction when importing
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    id INTEGER PRIMARY KEY,
+    timestamp REAL NOT NULL,
+    day TEXT NOT NULL,
+    band TEXT,
+    total INTEGER NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS scans_unique ON scans (timestamp, COALESCE(band, ''));
+CREATE INDEX IF NOT EXISTS scans_band_time ON scans (band, timestamp);
+CREATE INDEX IF NOT EXISTS scans_day ON scans (day);
+
+CREATE TABLE IF NOT EXISTS channel_counts (
+    scan_id INTEGER NOT NULL REFERENCES scans (id) ON DELETE CASCADE,
+    timestamp REAL NOT NULL,
+    channel INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (scan_id, channel)
+);
+CREATE INDEX IF NOT EXISTS channel_counts_channel_time ON channel_counts (channel, timestamp);
+
+CREATE TABLE IF NOT EXISTS bss_observations (
+    scan_id INTEGER NOT NULL REFERENCES scans (id) ON DELETE CASCADE,
+    timestamp REAL NOT NULL,
+    channel INTEGER NOT NULL,
+    bssid TEXT,
+    ssid TEXT,
+    signal REAL
+);
+CREATE INDEX IF NOT EXISTS bss_observations_scan ON bss_observations (scan_id);
+CREATE INDEX IF NOT EXISTS bss_observations_channel_time ON bss_observations (channel, timestamp);
+CREATE INDEX IF NOT EXISTS bss_observations_bssid_time ON bss_observations (bssid, timestamp);
+
+CREATE TABLE IF NOT EXISTS imported_days (
+    day TEXT PRIMARY KEY,
+    size INTEGER NOT NULL
+);
+"""
+
+# Best scan of each day for a band: most networks found, earliest first on a
+# tie. For 2.4GHz, scans saved without band info count too, but only on days
+# without a 2.4GHz scan that has it (as in `storage.get_heatmap_data`).
+_BEST_SCANS = """
+SELECT id, day FROM (
+    SELECT id, day, ROW_NUMBER() OVER (
+        PARTITION BY day ORDER BY band IS NULL, total DESC, timestamp
+    ) AS rank
+    FROM scans
+    WHERE day BETWEEN ? AND ? AND (band = ? OR (? = '2.4' AND band IS NULL))
+)
+WHERE rank = 1
+"""
+
+
+def _day_of(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d")
+
+
+def _channel_rows(scan):
+    """(channel, count, networks) for each channel of a scan."""
+    for ch, ch_data in scan.get("channels", {}).items():
+        if isinstance(ch_data, dict):
+            yield int(ch), ch_data.get("count", 0), ch_data.get("networks", [])
+
+
+class ScanArchive:
+    """SQLite scan archive at `path` (":memory:" for a throwaway one)."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def insert_scans(self, scans, day=None):
+        """
+        Insert scans in one transaction.
+
+        `day` is the date the scans are filed under; by default the local
+        date of each scan's timestamp. Returns the number of new scans.
+        """
+        inserted = 0
+        counts = []
+        observations = []
+        with self.conn:
+            for scan in scans:
+                timestamp = scan.get("timestamp")
+                if timestamp is None:
+                    continue
+                band = scan.get("band")
+                rows = list(_channel_rows(scan))
+                cur = self.conn.execute(
+                    "INSERT OR IGNORE INTO scans (timestamp, day, band, total) VALUES (?, ?, ?, ?)",
+                    (timestamp, day or _day_of(timestamp), band, sum(row[1] for row in rows)),
+                )
+                if cur.rowcount == 0:
+                    continue  # already archived
+                scan_id = cur.lastrowid
+                inserted += 1
+                counts.extend((scan_id, timestamp, ch, count) for ch, count, _ in rows)
+                if "bss" in scan:
+                    observations.extend(
+                        (scan_id, timestamp, bss["channel"], bss.get("bssid"), bss.get("ssid"), bss.get("signal"))
+                        for bss in scan["bss"]
+                    )
+                else:
+                    # Scans from before BSS details were kept: one row per network name.
+                    observations.extend(
+                        (scan_id, timestamp, ch, None, ssid, None) for ch, _, networks in rows for ssid in networks
+                    )
+            self.conn.executemany(
+                "INSERT INTO channel_counts (scan_id, timestamp, channel, count) VALUES (?, ?, ?, ?)",
+                counts,
+            )
+            self.conn.executemany(
+                "INSERT INTO bss_observations (scan_id, timestamp, channel, bssid, ssid, signal)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                observations,
+            )
+        return inserted
+
+    def import_json_days(self, dates=None):
+        """
+        Import the day journals of `storage` (all days by default).
+
+        Days whose journal has not changed since their last import are
+        skipped. Returns the number of new scans.
+        """
+        from . import storage
+
+        if dates is None:
+            dates = storage.get_scan_dates()
+        imported = dict(self.conn.execute("SELECT day, size FROM imported_days"))
+
+        inserted = 0
+        for date_str in dates:
+            size = storage._journal_size(date_str)
+            if size is None or imported.get(date_str) == size:
+                continue
+            batch = []
+            for scan in storage.iter_day_scans(date_str):
+                batch.append(scan)
+                if len(batch) >= BATCH_SIZE:
+                    inserted += self.insert_scans(batch, day=date_str)
+                    batch = []
+            inserted += self.insert_scans(batch, day=date_str)
+            with self.conn:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO imported_days (day, size) VALUES (?, ?)",
+                    (date_str, storage._journal_size(date_str)),
+                )
+        return inserted
+
+    def scan_count(self, band=None, start=None, end=None):
+        """Number of scans, optionally of one band and within [start, end] (unix time)."""
+        query = "SELECT COUNT(*) FROM scans WHERE timestamp BETWEEN ? AND ?"
+        params = [start if start is not None else float("-inf"), end if end is not None else float("inf")]
+        if band is not None:
+            query += " AND band = ?"
+            params.append(band)
+        return self.conn.execute(query, params).fetchone()[0]
+
+    def heatmap(self, dates, band, channels):
+        """
+        Network counts of each day's best scan, shaped like `storage.get_heatmap_data`.
+        Returns 2D float32 array (len(dates), len(channels)); NaN for days without a scan.
+        """
+        data = np.full((len(dates), len(channels)), np.nan, dtype=np.float32)
+        if not dates:
+            return data
+        rows = {date_str: i for i, date_str in enumerate(dates)}
+        cols = {ch: i for i, ch in enumerate(channels)}
+        query = f"""
+            SELECT best.day, c.channel, c.count
+            FROM ({_BEST_SCANS}) AS best
+            LEFT JOIN channel_counts AS c ON c.scan_id = best.id
+        """
+        for day, channel, count in self.conn.execute(query, (min(dates), max(dates), band, band)):
+            row = rows.get(day)
+            if row is None:
+                continue
+            if np.isnan(data[row, 0]):
+                data[row, :] = 0
+            col = cols.get(channel)
+            if col is not None:
+                data[row, col] = count
+        return data
+
+    def networks(self, dates, band, channels):
+        """
+        Network names per channel of each day's best scan, like `storage.get_heatmap_networks`.
+        Returns dict: {date_str: {channel: [network_names]}}
+        """
+        if not dates:
+            return {}
+        wanted = set(dates)
+        query = f"""
+            SELECT best.day, o.channel, o.ssid
+            FROM ({_BEST_SCANS}) AS best
+            LEFT JOIN bss_observations AS o ON o.scan_id = best.id
+        """
+        details = {}
+        for day, channel, ssid in self.conn.execute(query, (min(dates), max(dates), band, band)):
+            if day not in wanted:
+                continue
+            day_details = details.setdefault(day, {ch: [] for ch in channels})
+            if ssid and channel in day_details and ssid not in day_details[channel]:
+                day_details[channel].append(ssid)
+        return details
+
+    def channel_usage(self, band, start, end):
+        """
+        Per-channel network counts over [start, end] (unix time).
+        Returns dict: {channel: (mean count, max count, number of scans)}
+        """
+        query = """
+            SELECT c.channel, AVG(c.count), MAX(c.count), COUNT(*)
+            FROM scans AS s
+            JOIN channel_counts AS c ON c.scan_id = s.id
+            WHERE s.band = ? AND s.timestamp BETWEEN ? AND ?
+            GROUP BY c.channel
+        """
+        return {ch: (mean, peak, n) for ch, mean, peak, n in self.conn.execute(query, (band, start, end))}
+
+    def channel_series(self, channel, start, end, bucket):
+        """
+        Mean network count of one channel per `bucket` seconds over [start, end].
+        Returns (bucket start times, means) as float64 arrays.
+        """
+        query = """
+            SELECT CAST(timestamp / ? AS INTEGER) AS slot, AVG(count)
+            FROM channel_counts
+            WHERE channel = ? AND timestamp BETWEEN ? AND ?
+            GROUP BY slot
+            ORDER BY slot
+        """
+        rows = self.conn.execute(query, (bucket, channel, start, end)).fetchall()
+        if not rows:
+            return np.empty(0), np.empty(0)
+        slots, means = np.array(rows, dtype=np.float64).T
+        return slots * bucket, means
+
+    def bss_sightings(self, start, end, channel=None):
+        """
+        Access points seen over [start, end] (unix time), most often seen first.
+        Returns list of (bssid, ssid, channel, scans seen in, first seen,
+        last seen, mean signal dBm or None).
+        """
+        query = """
+            SELECT bssid, ssid, channel, COUNT(*), MIN(timestamp), MAX(timestamp), AVG(signal)
+            FROM bss_observations
+            WHERE timestamp BETWEEN ? AND ?
+        """
+        params = [start, end]
+        if channel is not None:
+            query += " AND channel = ?"
+            params.append(channel)
+        query += " GROUP BY bssid, ssid, channel ORDER BY COUNT(*) DESC, MAX(timestamp) DESC"
+        return self.conn.execute(query, params).fetchall()
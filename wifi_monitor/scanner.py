@@ -78,7 +78,11 @@ def scan_channels(interface=None, refresh_cache=True, band=None):
             "channels": {
                 1: {"count": 4, "networks": ["SSID1", "SSID2", ...]},
                 ...
-            }
+            },
+            "bss": [
+                {"bssid": "aa:bb:...", "ssid": "SSID1", "channel": 1, "signal": -61.0},
+                ...
+            ]
         }
     Returns None if scan fails.
     """
@@ -109,12 +113,14 @@ def scan_channels(interface=None, refresh_cache=True, band=None):
 
     # Initialize channels for the detected band
     channels = {ch: {"count": 0, "networks": []} for ch in channel_list}
+    bss_list = []
 
     # Parse BSS entries
     current_bss = None
     current_channel = None
     current_freq = None
     current_ssid = None
+    current_signal = None
 
     for line in result.split("\n"):
         line = line.strip()
@@ -131,11 +137,18 @@ def scan_channels(interface=None, refresh_cache=True, band=None):
                 channels[final_channel]["count"] += 1
                 if current_ssid:
                     channels[final_channel]["networks"].append(current_ssid)
+                bss_list.append({
+                    "bssid": current_bss,
+                    "ssid": current_ssid,
+                    "channel": final_channel,
+                    "signal": current_signal,
+                })
 
             current_bss = line.split()[1].split("(")[0]
             current_channel = None
             current_freq = None
             current_ssid = None
+            current_signal = None
             continue
 
         # Extract frequency (fallback for channel detection)
@@ -144,6 +157,11 @@ def scan_channels(interface=None, refresh_cache=True, band=None):
             current_freq = float(freq_match.group(1))
             continue
 
+        signal_match = re.match(r"signal: (-?[\d.]+) dBm", line)
+        if signal_match:
+            current_signal = float(signal_match.group(1))
+            continue
+
         # Extract channel from DS Parameter set (preferred)
         channel_match = re.match(r"DS Parameter set: channel (\d+)", line)
         if channel_match:
@@ -167,6 +185,12 @@ def scan_channels(interface=None, refresh_cache=True, band=None):
         channels[final_channel]["count"] += 1
         if current_ssid:
             channels[final_channel]["networks"].append(current_ssid)
+        bss_list.append({
+            "bssid": current_bss,
+            "ssid": current_ssid,
+            "channel": final_channel,
+            "signal": current_signal,
+        })
 
     # Deduplicate networks per channel (same SSID can appear multiple times)
     for ch in channels:
@@ -176,7 +200,8 @@ def scan_channels(interface=None, refresh_cache=True, band=None):
     return {
         "timestamp": int(time.time()),
         "band": band,
-        "channels": channels
+        "channels": channels,
+        "bss": bss_list,
     }
 
 
@@ -1,4 +1,8 @@
 import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from pathlib import Path
 
@@ -9,69 +13,306 @@ from . import constants
 
 STORAGE_DIR = constants.SCAN_STORAGE_PATH
 
+# Each day is an append-only journal: one JSON scan per line. Day files of
+# older versions held a single JSON list; they are converted on first access.
+JOURNAL_SUFFIX = ".jsonl"
+LEGACY_SUFFIX = ".json"
+
+# Best scan per day and band, so views over many days read one small file.
+SUMMARY_FILE = "summary.json"
+# Last scan per band and scan count per day, so the auto-scan decision and
+# the date list never open day files.
+MANIFEST_FILE = "manifest.json"
+UNBANDED = "unknown"  # band key of old scans saved without band info
+
+# Optional SQLite archive (scan_db.ScanArchive); see open_archive().
+archive = None
+
+CACHE_MAX_BYTES = 16 * 1024 * 1024  # on-disk size of the files kept parsed
+
+
+class ParsedFileCache:
+    """
+    LRU cache of parsed files, shared by all storage readers.
+
+    An entry is valid while its file keeps the mtime and size it had when
+    parsed. The bound is the total on-disk size of the cached files; the
+    least recently used entries are evicted past it. Cached values are
+    shared between callers and must not be modified.
+    """
+
+    def __init__(self, max_bytes=CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # path -> (mtime_ns, size, value)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, path, parse):
+        """Parsed contents of `path`, from `parse(path)` on a miss; None if it doesn't exist."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            self.invalidate(path)
+            return None
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+        value = parse(path)
+        self._store(path, st, value)
+        return value
+
+    def peek(self, path):
+        """(size, value) of the entry for `path` without validating it, or None."""
+        with self._lock:
+            entry = self._entries.get(path)
+        return None if entry is None else (entry[1], entry[2])
+
+    def put(self, path, value):
+        """Record `value` as the parsed contents of `path` as it is on disk now."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            self.invalidate(path)
+            return
+        self._store(path, st, value)
+
+    def invalidate(self, path):
+        with self._lock:
+            entry = self._entries.pop(path, None)
+            if entry is not None:
+                self._bytes -= entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _store(self, path, st, value):
+        with self._lock:
+            old = self._entries.pop(path, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[path] = (st.st_mtime_ns, st.st_size, value)
+            self._bytes += st.st_size
+            # The newest entry stays even if it alone exceeds the bound.
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted[1]
+                self.evictions += 1
+
+
+_cache = ParsedFileCache()
+
+
+def cache_stats():
+    """Hit/miss counters and size of the parsed-file cache."""
+    return _cache.stats()
+
 
 def ensure_storage_dir():
     """Create storage directory if it doesn't exist."""
     STORAGE_DIR.mkdir(parents=True, exist_ok=True)
 
 
+def _date_str(date):
+    if isinstance(date, str):
+        return date
+    return date.strftime("%Y-%m-%d")
+
+
+def get_day_file(date):
+    """Get path to the scan journal of a date."""
+    return STORAGE_DIR / f"{_date_str(date)}{JOURNAL_SUFFIX}"
+
+
 def get_today_file():
     """Get path to today's scan file."""
-    return STORAGE_DIR / f"{datetime.now().strftime('%Y-%m-%d')}.json"
+    return get_day_file(datetime.now())
+
+
+def _migrate_legacy_day(date_str):
+    """
+    Convert a legacy `YYYY-MM-DD.json` list into the day's journal.
+
+    The new journal is written next to the old file and renamed into place,
+    so an interrupted migration leaves the legacy file intact. Scans already
+    appended to a journal of the same day are kept after the legacy ones.
+    An unreadable legacy file is left alone.
+    """
+    legacy = STORAGE_DIR / f"{date_str}{LEGACY_SUFFIX}"
+    if not legacy.exists():
+        return
+
+    try:
+        with open(legacy, "r") as f:
+            scans = json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return
+    if not isinstance(scans, list):
+        return
+
+    journal = get_day_file(date_str)
+    lines = [json.dumps(scan, separators=(",", ":")) + "\n" for scan in scans]
+    lines.extend(json.dumps(scan, separators=(",", ":")) + "\n" for scan in _read_journal(journal))
+    if _write_atomic(journal, "".join(lines)):
+        try:
+            legacy.unlink()
+        except OSError:
+            pass
+
+
+def _write_atomic(filepath, text):
+    """Write a file via a synced temporary file and a rename. Returns success."""
+    tmp = filepath.with_name(filepath.name + ".tmp")
+    try:
+        with open(tmp, "w") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, filepath)
+        return True
+    except OSError:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        return False
+
+
+def _read_journal(filepath):
+    """
+    Yield the scans of a journal file one line at a time.
+
+    Lines that do not decode (a write cut short by a crash or power loss)
+    are skipped, so a corrupt tail costs at most the scan being written.
+    """
+    try:
+        f = open(filepath, "rb")
+    except OSError:
+        return
+    with f:
+        for line in f:
+            try:
+                scan = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(scan, dict):
+                yield scan
 
 
 def save_scan(scan_data):
     """
     Save a scan to today's file.
-    Appends to existing scans if file exists.
+    Appends one line to the day's journal and syncs it to disk.
     """
     if scan_data is None:
         return False
 
     ensure_storage_dir()
     filepath = get_today_file()
+    _migrate_legacy_day(filepath.stem)
+    # Loaded (or rebuilt from the day files) before the scan is appended.
+    manifest = _load_manifest()
 
-    # Load existing scans for today
-    scans = []
-    if filepath.exists():
-        try:
-            with open(filepath, "r") as f:
-                scans = json.load(f)
-        except (json.JSONDecodeError, IOError):
-            scans = []
-
-    # Append new scan
-    scans.append(scan_data)
-
-    # Save back
+    line = json.dumps(scan_data, separators=(",", ":")).encode() + b"\n"
     try:
-        with open(filepath, "w") as f:
-            json.dump(scans, f, indent=2)
-        return True
+        with open(filepath, "ab+") as f:
+            old_size = f.tell()
+            # Start on a fresh line if the previous append was cut short.
+            if old_size > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    line = b"\n" + line
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+            new_size = f.tell()
     except IOError:
         return False
 
+    # Extend a cached parse of the day instead of decoding it again.
+    cached = _cache.peek(filepath)
+    if cached is not None:
+        size, scans = cached
+        if size == old_size:
+            _cache.put(filepath, scans + (scan_data,))
+        else:
+            _cache.invalidate(filepath)
 
-def load_day_scans(date):
+    _update_summary(filepath.stem, scan_data, old_size, new_size)
+    _record_in_manifest(manifest, filepath.stem, scan_data)
+    _save_manifest(manifest)
+
+    if archive is not None:
+        try:
+            archive.insert_scans([scan_data], day=filepath.stem)
+        except sqlite3.Error:
+            pass  # the journal has the scan; the next import picks it up
+    return True
+
+
+def open_archive(path=None):
     """
-    Load all scans for a specific date.
-    Returns list of scan dicts, or empty list if no data.
+    Enable the SQLite scan archive (default: scans.sqlite3 in the storage dir).
+
+    Days not yet archived are imported from their journals. From then on
+    save_scan also writes to the archive, and the heatmap reads from it.
     """
-    if isinstance(date, str):
-        date_str = date
-    else:
-        date_str = date.strftime("%Y-%m-%d")
+    global archive
+    from .scan_db import DB_FILE, ScanArchive
 
-    filepath = STORAGE_DIR / f"{date_str}.json"
+    ensure_storage_dir()
+    archive = ScanArchive(path or STORAGE_DIR / DB_FILE)
+    archive.import_json_days()
+    return archive
 
-    if not filepath.exists():
-        return []
 
-    try:
-        with open(filepath, "r") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError):
-        return []
+def close_archive():
+    global archive
+    if archive is not None:
+        archive.close()
+        archive = None
+
+
+def iter_day_scans(date):
+    """
+    Iterate the scans of a specific date, oldest first.
+    Yields scan dicts; yields nothing if there is no data.
+    The dicts are shared with the cache and must not be modified.
+    """
+    yield from _day_scans(_date_str(date))
+
+
+def _day_scans(date_str):
+    """The day's scans as a tuple, parsed through the cache."""
+    _migrate_legacy_day(date_str)
+    scans = _cache.get(get_day_file(date_str), lambda path: tuple(_read_journal(path)))
+    return scans or ()
+
+
+def load_day_scans(date):
+    """
+    Load all scans for a specific date.
+    Returns list of scan dicts, or empty list if no data.
+    """
+    return list(_day_scans(_date_str(date)))
 
 
 def load_scans(days=7):
@@ -92,23 +333,85 @@ def load_scans(days=7):
     return result
 
 
-def get_last_scan_time():
+def _empty_manifest():
+    return {"last_scan": {}, "counts": {}}
+
+
+def _record_in_manifest(manifest, date_str, scan):
+    manifest["counts"][date_str] = manifest["counts"].get(date_str, 0) + 1
+    timestamp = scan.get("timestamp")
+    if timestamp is not None:
+        key = _band_key(scan)
+        manifest["last_scan"][key] = max(timestamp, manifest["last_scan"].get(key, timestamp))
+
+
+def _parse_manifest(path):
+    try:
+        with open(path, "r") as f:
+            manifest = json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return None
+    if not isinstance(manifest, dict):
+        return None
+    manifest.setdefault("last_scan", {})
+    manifest.setdefault("counts", {})
+    return manifest
+
+
+def _rebuild_manifest():
+    """Build the manifest from the day files (first run, or after it was lost)."""
+    manifest = _empty_manifest()
+    if not STORAGE_DIR.exists():
+        return manifest
+    dates = set()
+    for filepath in _day_files():
+        try:
+            datetime.strptime(filepath.stem, "%Y-%m-%d")
+        except ValueError:
+            continue
+        dates.add(filepath.stem)
+    for date_str in sorted(dates):
+        for scan in _day_scans(date_str):
+            _record_in_manifest(manifest, date_str, scan)
+    _save_manifest(manifest)
+    return manifest
+
+
+def _load_manifest():
     """
-    Get timestamp of the most recent scan.
-    Returns datetime or None if no scans exist.
+    Read the manifest.
+
+    {"last_scan": {band: timestamp}, "counts": {date: number of scans}};
+    the dates with scans are the keys of "counts".
     """
-    today = datetime.now().date()
+    manifest = _cache.get(STORAGE_DIR / MANIFEST_FILE, _parse_manifest)
+    if manifest is None:
+        manifest = _rebuild_manifest()
+    return manifest
 
-    # Check today first
-    for i in range(30):  # Look back up to 30 days
-        date = today - timedelta(days=i)
-        scans = load_day_scans(date)
-        if scans:
-            # Get the latest scan from this day
-            latest = max(scans, key=lambda s: s.get("timestamp", 0))
-            return datetime.fromtimestamp(latest["timestamp"])
 
-    return None
+def _save_manifest(manifest):
+    path = STORAGE_DIR / MANIFEST_FILE
+    if STORAGE_DIR.exists() and _write_atomic(path, json.dumps(manifest, separators=(",", ":"))):
+        _cache.put(path, manifest)
+        return True
+    _cache.invalidate(path)
+    return False
+
+
+def get_last_scan_time(band=None):
+    """
+    Get timestamp of the most recent scan, of `band` if given.
+    Returns datetime or None if no scans exist.
+    """
+    last_scan = _load_manifest()["last_scan"]
+    if band is not None:
+        latest = last_scan.get(band)
+    else:
+        latest = max(last_scan.values(), default=None)
+    if latest is None:
+        return None
+    return datetime.fromtimestamp(latest)
 
 
 def _scan_total_networks(scan):
@@ -121,6 +424,162 @@ def _scan_total_networks(scan):
     return total
 
 
+def _band_key(scan):
+    return scan.get("band") or UNBANDED
+
+
+def _summarize_scan(scan):
+    """Reduce a scan to what the heatmap shows: per-channel counts and networks."""
+    channels = {}
+    for ch, ch_data in scan.get("channels", {}).items():
+        if isinstance(ch_data, dict):
+            channels[str(ch)] = {
+                "count": ch_data.get("count", 0),
+                "networks": ch_data.get("networks", []),
+            }
+    return {
+        "timestamp": scan.get("timestamp", 0),
+        "total": _scan_total_networks(scan),
+        "channels": channels,
+    }
+
+
+def _merge_scan(day, scan):
+    """Keep the scan with most networks found per band (cache freshness varies)."""
+    key = _band_key(scan)
+    total = _scan_total_networks(scan)
+    best = day.get(key)
+    if best is None or total > best["total"]:
+        day[key] = _summarize_scan(scan)
+
+
+def _summarize_day(date_str):
+    day = {}
+    for scan in iter_day_scans(date_str):
+        _merge_scan(day, scan)
+    return day
+
+
+def _journal_size(date_str):
+    """Size of a day's journal; None if there is none, -1 if it still needs migrating."""
+    try:
+        return get_day_file(date_str).stat().st_size
+    except OSError:
+        pass
+    if (STORAGE_DIR / f"{date_str}{LEGACY_SUFFIX}").exists():
+        return -1
+    return None
+
+
+def _load_summary():
+    """
+    Read the summary index.
+
+    {"days": {date: {band: summary}}, "sizes": {date: journal size}}; each
+    day's entry is valid while its journal still has the recorded size.
+    """
+    summary = _cache.get(STORAGE_DIR / SUMMARY_FILE, _parse_summary)
+    if summary is None:
+        return {"days": {}, "sizes": {}}
+    return summary
+
+
+def _parse_summary(path):
+    try:
+        with open(path, "r") as f:
+            summary = json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return {"days": {}, "sizes": {}}
+    if not isinstance(summary, dict):
+        return {"days": {}, "sizes": {}}
+    summary.setdefault("days", {})
+    summary.setdefault("sizes", {})
+    return summary
+
+
+def _save_summary(summary):
+    ensure_storage_dir()
+    path = STORAGE_DIR / SUMMARY_FILE
+    if _write_atomic(path, json.dumps(summary, separators=(",", ":"))):
+        _cache.put(path, summary)
+        return True
+    # The cached copy may hold changes that did not reach the disk.
+    _cache.invalidate(path)
+    return False
+
+
+def _update_summary(date_str, scan, old_size, new_size):
+    """Fold a freshly appended scan into the index."""
+    summary = _load_summary()
+    if summary["sizes"].get(date_str, 0) == old_size:
+        _merge_scan(summary["days"].setdefault(date_str, {}), scan)
+        summary["sizes"][date_str] = new_size
+    else:
+        # The index missed earlier changes to this day; rebuild it on next read.
+        summary["days"].pop(date_str, None)
+        summary["sizes"].pop(date_str, None)
+    _save_summary(summary)
+
+
+def get_day_summaries(dates):
+    """
+    Best scan per band for each date, from the summary index.
+
+    Days whose journal changed behind the index's back (or that predate it)
+    are summarized from their journal and written back.
+    Returns dict: {date_str: {band: {"timestamp", "total", "channels"}}}
+    """
+    summary = _load_summary()
+    days, sizes = summary["days"], summary["sizes"]
+    changed = False
+    result = {}
+
+    for date_str in dates:
+        size = _journal_size(date_str)
+        if size is None:
+            if date_str in days or date_str in sizes:
+                days.pop(date_str, None)
+                sizes.pop(date_str, None)
+                changed = True
+            continue
+        if sizes.get(date_str) != size or date_str not in days:
+            days[date_str] = _summarize_day(date_str)
+            sizes[date_str] = _journal_size(date_str)
+            changed = True
+        if days[date_str]:
+            result[date_str] = days[date_str]
+
+    if changed:
+        _save_summary(summary)
+    return result
+
+
+def best_band_summary(day, band):
+    """A day's best scan for `band`; old scans without band info count as 2.4GHz."""
+    best = day.get(band)
+    if best is None and band == "2.4":
+        best = day.get(UNBANDED)
+    return best
+
+
+def get_heatmap_networks(dates, channels, band):
+    """
+    Network names per channel of each day's best scan, for tooltips.
+    Returns dict: {date_str: {channel: [network_names]}}
+    """
+    if archive is not None:
+        return archive.networks(dates, band, channels)
+
+    details = {}
+    for date_str, day in get_day_summaries(dates).items():
+        best = best_band_summary(day, band)
+        if best is None:
+            continue
+        channels_data = best["channels"]
+        details[date_str] = {ch: (channels_data.get(str(ch)) or {}).get("networks", []) for ch in channels}
+    return details
+
+
 def get_heatmap_data(days=7, band=None):
     """
     Build 2D numpy array for heatmap display.
@@ -151,57 +610,42 @@ def get_heatmap_data(days=7, band=None):
         date = today - timedelta(days=i)
         dates.append(date.strftime("%Y-%m-%d"))
 
+    if archive is not None:
+        return archive.heatmap(dates, band, channels), dates, channels, band
+
     # Build data array
     data = np.zeros((len(dates), len(channels)), dtype=np.float32)
 
+    summaries = get_day_summaries(dates)
     for row_idx, date_str in enumerate(dates):
-        scans = load_day_scans(date_str)
-        if not scans:
+        best = best_band_summary(summaries.get(date_str, {}), band)
+        if best is None:
             # No data for this day - use NaN to distinguish from 0
             data[row_idx, :] = np.nan
             continue
 
-        # Filter scans by band, fall back to all if none match
-        band_scans = [s for s in scans if s.get("band") == band]
-        if not band_scans:
-            # Old scans without band info - assume 2.4GHz
-            if band == "2.4":
-                band_scans = [s for s in scans if s.get("band") is None]
-
-        if not band_scans:
-            data[row_idx, :] = np.nan
-            continue
-
-        # Use the scan with most networks found (cache freshness varies)
-        best_scan = max(band_scans, key=_scan_total_networks)
-        channels_data = best_scan.get("channels", {})
-
+        channels_data = best["channels"]
         for col_idx, ch in enumerate(channels):
-            ch_data = channels_data.get(str(ch)) or channels_data.get(ch)
+            ch_data = channels_data.get(str(ch))
             if ch_data:
-                data[row_idx, col_idx] = ch_data.get("count", 0)
+                data[row_idx, col_idx] = ch_data["count"]
 
     return data, dates, channels, band
 
 
+def _day_files():
+    """Journals and not yet migrated legacy day files."""
+    yield from STORAGE_DIR.glob(f"*{JOURNAL_SUFFIX}")
+    yield from STORAGE_DIR.glob(f"*{LEGACY_SUFFIX}")
+
+
 def get_scan_dates():
     """
     Get list of dates that have scan data.
     Returns list of date strings, newest first.
     """
-    if not STORAGE_DIR.exists():
-        return []
-
-    dates = []
-    for filepath in STORAGE_DIR.glob("*.json"):
-        date_str = filepath.stem
-        try:
-            datetime.strptime(date_str, "%Y-%m-%d")
-            dates.append(date_str)
-        except ValueError:
-            continue
-
-    return sorted(dates, reverse=True)
+    counts = _load_manifest()["counts"]
+    return sorted((d for d, n in counts.items() if n), reverse=True)
 
 
 def cleanup_old_scans(keep_days=90):
@@ -213,10 +657,26 @@ def cleanup_old_scans(keep_days=90):
 
     cutoff = datetime.now().date() - timedelta(days=keep_days)
 
-    for filepath in STORAGE_DIR.glob("*.json"):
+    for filepath in _day_files():
         try:
             date = datetime.strptime(filepath.stem, "%Y-%m-%d").date()
             if date < cutoff:
                 filepath.unlink()
         except (ValueError, OSError):
             continue
+
+    summary = _load_summary()
+    cutoff_str = cutoff.strftime("%Y-%m-%d")
+    stale = [d for d in set(summary["days"]) | set(summary["sizes"]) if d < cutoff_str]
+    if stale:
+        for date_str in stale:
+            summary["days"].pop(date_str, None)
+            summary["sizes"].pop(date_str, None)
+        _save_summary(summary)
+
+    manifest = _load_manifest()
+    stale = [d for d in manifest["counts"] if d < cutoff_str]
+    if stale:
+        for date_str in stale:
+            del manifest["counts"][date_str]
+        _save_manifest(manifest)
@@ -0,0 +1,268 @@
+"""Columnar time-series storage with amortized O(1) appends.
+
+`collect_data` used to grow every series with `np.append`, which copies the
+whole history on each tick. Columns here are capacity-doubling buffers; readers
+get zero-copy views of the filled prefix.
+"""
+
+import numpy as np
+
+from . import constants
+from .buffers import GrowableArray
+from .failures import FailureRuns
+from .pyramid import MinMaxPyramid
+
+
+# Link metrics in `constants`, name -> dtype.
+LINK_COLUMNS = {
+    "time_data": float,
+    "signal_data": float,
+    "rx_rate_data": float,
+    "tx_rate_data": float,
+    "bandwidth_data": float,
+    "signal_failed": bool,
+    "rates_failed": bool,
+    "bandwidth_failed": bool,
+}
+
+# Station counters and gauges (see `net.STATION_FIELDS`), aligned with the
+# link timeline by index. Cumulative counters are stored as per-sample deltas.
+STATION_COLUMNS = {
+    "tx_retries": float,
+    "tx_failed": float,
+    "beacon_loss": float,
+    "beacon_signal": float,
+    "expected_throughput": float,
+    "inactive_time": float,
+    "connected_time": float,
+}
+STATION_COUNTERS = ("tx_retries", "tx_failed", "beacon_loss")
+
+# Per ping host series stored in the host_info dict, name -> dtype.
+PING_COLUMNS = {
+    "data": float,
+    "failed": bool,
+}
+
+# Every probe of a ping host at its own rate, in host_info["probes"]; `data`
+# above is these aggregated per link sample. Probes are dropped once sampled
+# (see `trim_probes`), so only the last few seconds are kept.
+PROBE_COLUMNS = {
+    "time": float,
+    "rtt": float,
+    "lost": bool,
+}
+
+
+class MetricsStore:
+    """A set of equally long named columns."""
+
+    def __init__(self, columns):
+        self.columns = {name: GrowableArray(dtype) for name, dtype in columns.items()}
+
+    def __len__(self):
+        first = next(iter(self.columns.values()), None)
+        return len(first) if first is not None else 0
+
+    def append(self, **values):
+        for name, column in self.columns.items():
+            column.append(values[name])
+
+    def extend(self, **arrays):
+        for name, column in self.columns.items():
+            column.extend(arrays[name])
+
+    def drop_front(self, n):
+        """Drop the first `n` rows (see `GrowableArray.drop_front`)."""
+        for column in self.columns.values():
+            column.drop_front(n)
+
+    def load(self, **arrays):
+        """Replace the contents of every column (e.g. synthetic test data)."""
+        for column in self.columns.values():
+            column.clear()
+        self.extend(**arrays)
+
+    def view(self, name):
+        return self.columns[name].view()
+
+    def views(self):
+        return {name: column.view() for name, column in self.columns.items()}
+
+
+# Link series folded into the min/max pyramid, in rendering order.
+PYRAMID_SERIES = ("signal_data", "rx_rate_data", "tx_rate_data", "bandwidth_data")
+
+# Station columns folded into the mean pyramid of the link-health view.
+STATION_PYRAMID_SERIES = (
+    "tx_retries",
+    "tx_failed",
+    "beacon_loss",
+    "beacon_signal",
+    "expected_throughput",
+    "inactive_time",
+)
+
+# Link failure masks mirrored by a run index.
+FAILURE_SERIES = ("signal_failed", "rates_failed", "bandwidth_failed")
+
+metrics = MetricsStore(LINK_COLUMNS)
+link_pyramid = MinMaxPyramid(len(PYRAMID_SERIES), means=False)
+station_pyramid = MinMaxPyramid(len(STATION_PYRAMID_SERIES), minmax=False)
+link_failures = {name: FailureRuns() for name in FAILURE_SERIES}
+station_metrics = MetricsStore(STATION_COLUMNS)
+# Last raw reading of each cumulative station counter.
+_last_counters = dict.fromkeys(STATION_COUNTERS)
+
+
+def publish_link_metrics():
+    """Point `constants.*` at the current column views.
+
+    Rendering and hover code still read `constants.time_data` etc.; this keeps
+    that access working without copying.
+    """
+    for name, arr in metrics.views().items():
+        setattr(constants, name, arr)
+
+
+def append_link_sample(timestamp, signal, rx, tx, bw, station=None):
+    failed = {
+        "signal_failed": signal is None,
+        "rates_failed": rx is None and tx is None,
+        "bandwidth_failed": bw is None,
+    }
+    metrics.append(
+        time_data=timestamp,
+        signal_data=signal if signal is not None else np.nan,
+        rx_rate_data=rx if rx is not None else np.nan,
+        tx_rate_data=tx if tx is not None else np.nan,
+        bandwidth_data=bw if bw is not None else np.nan,
+        **failed,
+    )
+    for name, runs in link_failures.items():
+        runs.append(timestamp, failed[name])
+    _append_station_sample(station or {})
+    _update_pyramid()
+    publish_link_metrics()
+
+
+def _append_station_sample(station):
+    values = {}
+    for name in STATION_COLUMNS:
+        value = station.get(name)
+        if name in STATION_COUNTERS:
+            previous, _last_counters[name] = _last_counters[name], value
+            # No delta across a gap or a reset (counters restart on reassociation).
+            if value is None or previous is None or value < previous:
+                value = None
+            else:
+                value -= previous
+        values[name] = value if value is not None else np.nan
+    station_metrics.append(**values)
+
+
+def load_link_metrics(**arrays):
+    """Replace all link metrics (e.g. synthetic test data) and rebuild the pyramid.
+
+    Station columns missing from `arrays` are filled with NaN.
+    """
+    metrics.load(**arrays)
+    n = len(metrics)
+    station_metrics.load(**{name: arrays.get(name, np.full(n, np.nan)) for name in STATION_COLUMNS})
+    _last_counters.update(dict.fromkeys(STATION_COUNTERS))
+    link_pyramid.reset()
+    station_pyramid.reset()
+    _update_pyramid()
+    for name, runs in link_failures.items():
+        runs.load(metrics.view("time_data"), metrics.view(name))
+    publish_link_metrics()
+
+
+def _update_pyramid():
+    time_data = metrics.view("time_data")
+    link_pyramid.update(time_data, [metrics.view(name) for name in PYRAMID_SERIES])
+    station_pyramid.update(time_data, [station_metrics.view(name) for name in STATION_PYRAMID_SERIES])
+
+
+def create_host_store(length):
+    """Store for a newly added ping host, back-filled as failed up to `length`.
+
+    The back-fill is not entered in the host's `FailureRuns`: the host was not
+    being pinged then, so no failure region is drawn for it.
+    """
+    host_store = MetricsStore(PING_COLUMNS)
+    host_store.extend(data=np.full(length, np.nan), failed=np.ones(length, dtype=bool))
+    return host_store
+
+
+def append_host_sample(host_info, value):
+    host_store = host_info["store"]
+    host_store.append(data=value if value is not None else np.nan, failed=value is None)
+    # Host samples line up with the link timeline by index.
+    time_data = metrics.view("time_data")
+    if len(host_store) <= len(time_data):
+        host_info["failure_runs"].append(time_data[len(host_store) - 1], value is None)
+    host_info.update(host_store.views())
+
+
+def load_host_metrics(host_info, data, failed):
+    """Replace a host's series (e.g. synthetic test data) and rebuild its run index."""
+    host_store = host_info["store"]
+    host_store.load(data=data, failed=failed)
+    time_data = metrics.view("time_data")
+    n = min(len(time_data), len(host_store))
+    host_info["failure_runs"].load(time_data[:n], host_store.view("failed")[:n])
+    host_info.update(host_store.views())
+
+
+def create_probe_store():
+    return MetricsStore(PROBE_COLUMNS)
+
+
+def append_probe(host_info, timestamp, rtt):
+    """Record one probe (`rtt` None if lost). Called by ping workers under `ping_lock`."""
+    host_info["probes"].append(time=timestamp, rtt=rtt if rtt is not None else np.nan, lost=rtt is None)
+
+
+def probe_mean(host_info, t_lo, t_hi):
+    """Mean RTT of the replies received in (t_lo, t_hi], or None if there were none."""
+    probes = host_info["probes"]
+    times = probes.view("time")
+    a = int(np.searchsorted(times, t_lo, side="right"))
+    b = int(np.searchsorted(times, t_hi, side="right"))
+    rtt = probes.view("rtt")[a:b]
+    rtt = rtt[~np.isnan(rtt)]
+    return float(rtt.mean()) if len(rtt) else None
+
+
+def probe_sample(host_info, t_lo, t_hi, max_age):
+    """RTT of a sample taken over (t_lo, t_hi].
+
+    The mean of the replies received in the interval (None if every probe in
+    it was lost). Sampling faster than the probe rate leaves intervals in which
+    no probe completed; those carry the last probe forward instead of counting
+    as a failure, so they only read None once that probe was lost, or once
+    nothing was heard for `max_age` seconds.
+    """
+    probes = host_info["probes"]
+    times = probes.view("time")
+    a = int(np.searchsorted(times, t_lo, side="right"))
+    b = int(np.searchsorted(times, t_hi, side="right"))
+    if b > a:
+        return probe_mean(host_info, t_lo, t_hi)
+    if b == 0 or times[b - 1] < t_hi - max_age:
+        return None
+    rtt = probes.view("rtt")[b - 1]
+    return None if np.isnan(rtt) else float(rtt)
+
+
+def trim_probes(host_info, before):
+    """Drop the probes up to `before` that a later `probe_sample` cannot need.
+
+    Samples only look at probes after the previous sample time, so once a
+    sample up to `before` was taken only the last probe up to then is kept
+    (it is carried forward into sampling intervals with no probe).
+    """
+    times = host_info["probes"].view("time")
+    b = int(np.searchsorted(times, before, side="right"))
+    host_info["probes"].drop_front(b - 1)
@@ -240,22 +240,8 @@ class ChannelHeatmap(QWidget):
         # Update channel axis labels
         self.channel_axis.set_channels(channels)
 
-        # Load scan details for tooltips (network names per channel per day)
-        self.scan_details = {}
-        for date_str in dates:
-            scans = storage.load_day_scans(date_str)
-            if scans:
-                # Filter by band and use the best scan (most networks) for this day
-                band_scans = [s for s in scans if s.get("band") == band]
-                if not band_scans and band == "2.4":
-                    band_scans = [s for s in scans if s.get("band") is None]
-                if band_scans:
-                    best_scan = max(band_scans, key=storage._scan_total_networks)
-                    channels_data = best_scan.get("channels", {})
-                    self.scan_details[date_str] = {}
-                    for ch in channels:
-                        ch_data = channels_data.get(str(ch)) or channels_data.get(ch) or {}
-                        self.scan_details[date_str][ch] = ch_data.get("networks", [])
+        # Network names per channel per day for tooltips, from the summary index
+        self.scan_details = storage.get_heatmap_networks(dates, channels, band)
 
         # Update date axis labels
         self.date_axis.set_dates(dates)
@@ -305,11 +291,10 @@ class ChannelHeatmap(QWidget):
         self._last_detected_band = current_band
 
         # Check if we have any data for current band today
-        today_scans = storage.load_day_scans(datetime.now().strftime("%Y-%m-%d"))
-        band_scans = [s for s in today_scans if s.get("band") == current_band]
+        last_band_scan = storage.get_last_scan_time(current_band)
 
         needs_scan = False
-        if not band_scans:
+        if last_band_scan is None or last_band_scan.date() != datetime.now().date():
             # No data for current band - scan now
             needs_scan = True
         else:
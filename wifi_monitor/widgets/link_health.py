@@ -0,0 +1,111 @@
+import time
+
+import numpy as np
+import pyqtgraph as pg
+from PyQt5.QtWidgets import QHBoxLayout, QLabel, QVBoxLayout, QWidget
+
+from .. import constants, store
+from ..plot_items import TimeAxisItem, setup_legend
+
+# (title, unit, [(column, legend name, color)]) per plot, top to bottom.
+HEALTH_PLOTS = [
+    (
+        "TX Retries / Failures (per sample)",
+        "count",
+        [("tx_retries", "Retries", "#FFA500"), ("tx_failed", "Failed", "r"), ("beacon_loss", "Beacon loss", "m")],
+    ),
+    ("Beacon Signal", "dBm", [("beacon_signal", "Beacon avg", "b")]),
+    ("Expected Throughput", "Mbps", [("expected_throughput", "Expected", "g")]),
+    ("Inactive Time", "ms", [("inactive_time", "Inactive", "#808080")]),
+]
+
+
+def _format_duration(seconds):
+    seconds = int(seconds)
+    hours, rem = divmod(seconds, 3600)
+    minutes, secs = divmod(rem, 60)
+    if hours:
+        return f"{hours}h {minutes:02d}m"
+    return f"{minutes}m {secs:02d}s"
+
+
+class LinkHealthWidget(QWidget):
+    """Per-station counters of the associated AP over the current time window."""
+
+    def __init__(self, antialias=False, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(5)
+
+        status_layout = QHBoxLayout()
+        self.status_label = QLabel("No station data")
+        self.status_label.setStyleSheet("color: gray;")
+        status_layout.addWidget(self.status_label)
+        status_layout.addStretch()
+        layout.addLayout(status_layout)
+
+        self.plots = []
+        self.curves = {}
+        for title, unit, series in HEALTH_PLOTS:
+            plot = pg.PlotWidget(axisItems={"bottom": TimeAxisItem(orientation="bottom")})
+            plot.setMenuEnabled(False)
+            plot.setLabel("left", unit)
+            plot.setTitle(title, anchor="w")
+            plot.showGrid(x=True, y=True, alpha=0.15)
+            plot.setMouseEnabled(x=False, y=False)
+            plot.hideButtons()
+            plot.setClipToView(True)
+            plot.setDownsampling(auto=False)
+            legend = setup_legend(plot) if len(series) > 1 else None
+            for column, name, color in series:
+                curve = plot.plot(pen=pg.mkPen(color, width=2), antialias=antialias, connect="finite")
+                if legend is not None:
+                    legend.addItem(curve, name)
+                self.curves[column] = curve
+            if self.plots:
+                plot.setXLink(self.plots[0])
+            layout.addWidget(plot)
+            self.plots.append(plot)
+
+    def refresh(self):
+        """Redraw the current time window from the station columns."""
+        time_data = constants.time_data
+        columns = store.station_metrics.views()
+        n = min(len(time_data), len(store.station_metrics))
+        if n == 0:
+            return
+
+        now = time.time()
+        if constants.current_window is None:
+            start_idx = 0
+        else:
+            start_idx = int(np.searchsorted(time_data[:n], now - constants.current_window, side="left"))
+        vis_time = time_data[start_idx:n]
+        names = store.STATION_PYRAMID_SERIES
+        series = [columns[name][:n] for name in names]
+
+        # Long windows are averaged into at most one bucket per pixel, read
+        # from the mean pyramid maintained at ingest.
+        max_points = max(200, self.plots[0].viewport().width())
+        if len(vis_time) > max_points:
+            vis_time, series, _, _, _ = store.station_pyramid.render_means(
+                time_data[:n], series, float(vis_time[0]), float(vis_time[-1]), max_points
+            )
+        else:
+            series = [values[start_idx:] for values in series]
+
+        for name, values in zip(names, series):
+            self.curves[name].setData(vis_time, values, connect="finite")
+
+        if len(vis_time) > 0:
+            if constants.current_window is not None:
+                self.plots[0].setXRange(now - constants.current_window, now, padding=0.02)
+            else:
+                self.plots[0].setXRange(vis_time[0], vis_time[-1], padding=0.02)
+
+        connected = columns["connected_time"][n - 1]
+        if np.isfinite(connected):
+            self.status_label.setText(f"Connected for {_format_duration(connected)}")
+        else:
+            self.status_label.setText("No station data")
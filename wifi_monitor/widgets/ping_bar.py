@@ -1,3 +1,5 @@
+import time
+
 from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import QHBoxLayout, QLabel, QLineEdit, QPushButton
 
@@ -12,6 +14,12 @@ def build_ping_bar(window, parent_layout):
     ping_bar.addLayout(window.ping_labels_layout)
     ping_bar.addStretch()
 
+    bands_btn = QPushButton("Bands")
+    bands_btn.setCheckable(True)
+    bands_btn.setToolTip("Show min/p25/median/p75/max bands and loss-colored medians for long windows")
+    bands_btn.toggled.connect(window.toggle_ping_bands)
+    ping_bar.addWidget(bands_btn)
+
     window.host_entry = QLineEdit()
     window.host_entry.setPlaceholderText("type IP or domain")
     window.host_entry.setFixedWidth(150)
@@ -33,6 +41,7 @@ def refresh_ping_host_buttons(window):
         item = window.ping_labels_layout.takeAt(0)
         if item.widget():
             item.widget().deleteLater()
+    window.ping_stat_labels = []
 
     for i, host_info in enumerate(constants.ping_hosts):
         color = PING_COLORS[i % len(PING_COLORS)]
@@ -46,3 +55,39 @@ def refresh_ping_host_buttons(window):
         btn.setCursor(Qt.PointingHandCursor)
         btn.clicked.connect(lambda checked, idx=i: window.remove_host(idx))
         window.ping_labels_layout.addWidget(btn)
+        stats = QLabel()
+        stats.setStyleSheet("color: gray;")
+        window.ping_labels_layout.addWidget(stats)
+        window.ping_stat_labels.append(stats)
+
+    update_ping_stats(window)
+
+
+def _fmt_ms(value):
+    return "–" if value is None else f"{value:.0f}" if value >= 10 else f"{value:.1f}"
+
+
+def update_ping_stats(window):
+    """Show each host's rolling latency statistics for the selected time window."""
+    from .. import constants
+    from ..latency import window_label
+    from ..ping import ping_lock
+
+    label = window_label(constants.current_window)
+    now = time.time()
+    for host_info, stats_label in zip(constants.ping_hosts, getattr(window, "ping_stat_labels", [])):
+        with ping_lock:
+            summary = host_info["stats"].summary(label, now)
+        if summary.sent == 0:
+            stats_label.setText("")
+            stats_label.setToolTip("")
+            continue
+        stats_label.setText(
+            f"p50 {_fmt_ms(summary.p50)} · p95 {_fmt_ms(summary.p95)} ms · loss {summary.loss:.1%}"
+        )
+        stats_label.setToolTip(
+            f"Last {label}: {summary.sent} probes, {summary.lost} lost"
+            f" (longest burst {summary.max_burst})\n"
+            f"p50 {_fmt_ms(summary.p50)} / p95 {_fmt_ms(summary.p95)} / p99 {_fmt_ms(summary.p99)} ms\n"
+            f"jitter (RFC 3550) {_fmt_ms(summary.jitter)} ms"
+        )
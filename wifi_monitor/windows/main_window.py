@@ -15,12 +15,28 @@ from PyQt5.QtWidgets import (
 )
 
 from .. import constants
+from ..buffers import CurveBuffer
 from ..controllers import collection, interaction, rendering
+from ..data import EmaSmoother
+from ..frames import FrameScheduler
 from ..overlays import FailureOverlay, HoverOverlay, SelectionOverlay
 from ..ping import remove_ping_host
 from ..plot_items import TimeAxisItem, setup_legend
+from ..sampler import Sampler
 from ..widgets.heatmap import ChannelHeatmap
-from ..widgets.ping_bar import build_ping_bar, refresh_ping_host_buttons
+from ..widgets.link_health import LinkHealthWidget
+from ..widgets.ping_bar import build_ping_bar, refresh_ping_host_buttons, update_ping_stats
+
+
+# Sample combo label -> link sampling interval (ms).
+SAMPLE_INTERVALS = {
+    "100ms": 100,
+    "250ms": 250,
+    "500ms": 500,
+    "1 sec": 1000,
+    "2 sec": 2000,
+    "5 sec": 5000,
+}
 
 
 class WifiMonitor(QMainWindow):
@@ -33,6 +49,16 @@ class WifiMonitor(QMainWindow):
 
         self.last_drawn_index = 0
         self.needs_full_redraw = True
+        # Times every frame and degrades/skips frames that run over budget.
+        self.frames = FrameScheduler()
+
+        # Per-series EMA state, shared by full redraws and live appends.
+        self.signal_smoother = EmaSmoother(alpha=0.3)
+        self.rx_smoother = EmaSmoother(alpha=0.3)
+        self.tx_smoother = EmaSmoother(alpha=0.3)
+        self.bw_smoother = EmaSmoother(alpha=0.3)
+        # Visible window of the link curves, appended to by the live path.
+        self.link_buffer = CurveBuffer(4)
 
         central = QWidget()
         self.setCentralWidget(central)
@@ -56,6 +82,14 @@ class WifiMonitor(QMainWindow):
         top_bar.addWidget(self.reset_btn)
 
         top_bar.addSpacing(20)
+        top_bar.addWidget(QLabel("Sample:"))
+        self.sample_combo = QComboBox()
+        self.sample_combo.addItems(list(SAMPLE_INTERVALS))
+        self.sample_combo.setCurrentText("1 sec")
+        self.sample_combo.currentTextChanged.connect(self.on_sample_rate_change)
+        top_bar.addWidget(self.sample_combo)
+
+        top_bar.addSpacing(10)
         top_bar.addWidget(QLabel("Refresh:"))
         self.refresh_combo = QComboBox()
         self.refresh_combo.addItems(["500ms", "1 sec", "2 sec", "3 sec", "5 sec"])
@@ -69,6 +103,9 @@ class WifiMonitor(QMainWindow):
         top_bar.addWidget(self.pause_btn)
 
         top_bar.addStretch()
+        self.frame_label = QLabel()
+        self.frame_label.setStyleSheet("color: gray;")
+        top_bar.addWidget(self.frame_label)
         layout.addLayout(top_bar)
 
         # Create tab widget
@@ -76,7 +113,7 @@ class WifiMonitor(QMainWindow):
         layout.addWidget(self.tabs)
 
         # Tab 0: Live Monitor
-        live_monitor = QWidget()
+        self.live_monitor = live_monitor = QWidget()
         live_layout = QVBoxLayout(live_monitor)
         live_layout.setContentsMargins(0, 0, 0, 0)
         live_layout.setSpacing(5)
@@ -86,6 +123,11 @@ class WifiMonitor(QMainWindow):
         self.heatmap_widget = ChannelHeatmap()
         self.tabs.addTab(self.heatmap_widget, "Channel Heatmap")
 
+        # Tab 2: Link Health (station counters)
+        self.link_health_widget = LinkHealthWidget(antialias=self.antialias_default)
+        self.tabs.addTab(self.link_health_widget, "Link Health")
+        self.tabs.currentChanged.connect(self._on_tab_changed)
+
         self.signal_plot = pg.PlotWidget(axisItems={"bottom": TimeAxisItem(orientation="bottom")})
         self.signal_plot.setMenuEnabled(False)
         self.signal_plot.setLabel("left", "dBm")
@@ -111,6 +153,11 @@ class WifiMonitor(QMainWindow):
         self.ping_plot.showGrid(x=True, y=True, alpha=0.15)
         self.ping_legend = setup_legend(self.ping_plot)
         self.ping_curves = []
+        self.ping_smoothers = []
+        self.ping_buffers = []
+        self.ping_bands = []
+        # Draw downsampled ping as percentile bands instead of bucket means.
+        self.ping_bands_enabled = False
         self.ping_plot.setMouseEnabled(x=False, y=False)
         self.ping_plot.wheelEvent = lambda evt: None
         self.ping_plot.hideButtons()
@@ -205,6 +252,13 @@ class WifiMonitor(QMainWindow):
 
         self.refresh_host_list()
 
+        # `iw`/`ip` run on the sampler thread at the sample rate; the timer
+        # only drains its queue and repaints, at the (independent) refresh rate.
+        self.sampler = Sampler()
+        self.sampler.start()
+        # Samples folded into the store but not drawn yet (e.g. while hidden).
+        self.frame_pending = False
+
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_data)
         self.timer.start(constants.REFRESH_INTERVAL)
@@ -252,6 +306,7 @@ class WifiMonitor(QMainWindow):
         self.is_zoomed = False
         self.reset_btn.hide()
         QTimer.singleShot(0, self.draw_charts)
+        self.refresh_link_health()
 
     def reset_zoom(self):
         self.is_zoomed = False
@@ -270,6 +325,15 @@ class WifiMonitor(QMainWindow):
         constants.REFRESH_INTERVAL = mapping.get(text, 1000)
         self.timer.setInterval(constants.REFRESH_INTERVAL)
 
+    def on_sample_rate_change(self, text):
+        constants.SAMPLE_INTERVAL = SAMPLE_INTERVALS.get(text, constants.DEFAULT_SAMPLE_INTERVAL_MS)
+        self.sampler.reschedule()
+
+    def toggle_ping_bands(self, enabled):
+        self.ping_bands_enabled = enabled
+        self.needs_full_redraw = True
+        self.draw_charts()
+
     def toggle_pause(self):
         constants.paused = not constants.paused
         self.pause_btn.setText("Resume" if constants.paused else "Pause")
@@ -314,13 +378,48 @@ class WifiMonitor(QMainWindow):
     # ---- Data + rendering ----
 
     def update_data(self):
-        if not constants.paused:
-            collection.collect_data(self)
+        """One frame: fold in every sample taken since the last frame, then draw once."""
+        if constants.paused:
+            return
+        frames = self.frames
+        frames.begin_frame()
+        with frames.phase("collect"):
+            if collection.collect_data(self):
+                self.frame_pending = True
+        # Nothing is painted while minimized; the first visible frame catches up.
+        if not self.frame_pending or self.isMinimized() or not self.isVisible():
+            return
+        # After a slow frame, ticks are merged into the next drawn one.
+        if not frames.should_render():
+            return
+        self.frame_pending = False
+        with frames.phase("render"):
+            if self.tabs.currentWidget() is self.live_monitor:
+                self.draw_charts()
+                update_ping_stats(self)
+            self.refresh_link_health()
+        if frames.end_frame():
+            rendering.apply_frame_quality(self)
+        self.frame_label.setText(frames.report())
+        self.frame_label.setToolTip(
+            "Last frame: " + ", ".join(f"{name} {sec * 1000:.1f} ms" for name, sec in frames.last_phases.items())
+        )
+
+    def _on_tab_changed(self, index):
+        # Hidden tabs are not repainted, so bring the new one up to date.
+        if self.tabs.currentWidget() is self.live_monitor:
             self.draw_charts()
+            update_ping_stats(self)
+        self.refresh_link_health()
 
     def draw_charts(self):
         return rendering.draw_charts(self)
 
+    def refresh_link_health(self):
+        # Only redrawn while visible; switching to the tab redraws it.
+        if self.tabs.currentWidget() is self.link_health_widget:
+            self.link_health_widget.refresh()
+
     def _full_redraw(self):
         return rendering.full_redraw(self)
 